@@ -1,12 +1,18 @@
 from django.contrib import admin
-from .models import Grid, CrosswordClue, CrosswordPuzzle
+from .models import Grid, GridTemplate, CrosswordClue, CrosswordPuzzle
 
 
 class GridAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'width', 'height', 'cells', 'created_on', 'creator',)
+    list_display = ('pk', 'width', 'height', 'cells', 'cell_concentration',
+                    'rotational_symmetry', 'created_on', 'creator',)
     list_editable = ('width', 'height', 'cells',)
 
 
+class GridTemplateAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'width', 'height', 'word_count', 'min_slot_length',
+                    'cell_concentration', 'mirror_symmetry', 'created_on',)
+
+
 class CrosswordPuzzleAdmin(admin.ModelAdmin):
     list_display = ('pk', 'grid', 'created_on', 'creator', 'last_edited',
                     'complete', 'reviewed', 'released', 'puzzle_type',)
@@ -23,5 +29,6 @@ class CrosswordClueAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Grid, GridAdmin)
+admin.site.register(GridTemplate, GridTemplateAdmin)
 admin.site.register(CrosswordPuzzle, CrosswordPuzzleAdmin)
 admin.site.register(CrosswordClue, CrosswordClueAdmin)
\ No newline at end of file
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CrosswordsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'crosswords'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,237 @@
+import time
+from collections import deque
+
+from .utils import get_slots, get_slot_pattern, OPEN
+from .word_index import count_bits
+
+
+class SlotProblem:
+    """
+    The slots of a grid, the crossings between them, and the domain of each
+    slot, which is a WordIndex bitmap of the words that still fit it.
+
+    Slots without any empty cell are fixed: their letters constrain the
+    slots that cross them, but they are never filled.
+    """
+
+    def __init__(self, cells, width, height, index):
+        self.cells = cells
+        self.index = index
+        self.slots = get_slots(cells, width, height)
+        self.patterns = [get_slot_pattern(cells, slot) for slot in self.slots]
+        self.open_slots = [i for i, slot in enumerate(self.slots)
+                           if any(cells[c] == OPEN for c in slot['cells'])]
+        self.domains = [index.pattern_bits(pattern)
+                        for pattern in self.patterns]
+
+        # For each slot, a list of (position, other slot, other position)
+        # tuples, one per cell shared with a crossing slot.
+        cell_slots = {}
+        for i, slot in enumerate(self.slots):
+            for position, cell in enumerate(slot['cells']):
+                cell_slots.setdefault(cell, []).append((i, position))
+        self.crossings = [[] for _ in self.slots]
+        for occupants in cell_slots.values():
+            if len(occupants) == 2:
+                (a, pos_a), (b, pos_b) = occupants
+                self.crossings[a].append((pos_a, b, pos_b))
+                self.crossings[b].append((pos_b, a, pos_a))
+
+    def length(self, slot_index):
+        return self.slots[slot_index]['length']
+
+    def candidate_count(self, slot_index, domains=None):
+        domains = self.domains if domains is None else domains
+        return count_bits(domains[slot_index])
+
+    def dead_slots(self, domains=None):
+        """ Returns the indices of open slots that no word can fill """
+        domains = self.domains if domains is None else domains
+        return [i for i in self.open_slots if not domains[i]]
+
+    def supported_bits(self, domains, slot_index, position, other,
+                       other_position):
+        """
+        Returns the bitmap of words for slot_index whose letter at position
+        is one that some word left in the domain of the crossing slot other
+        has at other_position, the cell they share.
+        """
+        length = self.length(slot_index)
+        other_length = self.length(other)
+        supported = 0
+        for letter in self.index.letters_at(other_length, other_position):
+            if domains[other] & self.index.letter_bits(
+                    other_length, other_position, letter):
+                supported |= self.index.letter_bits(length, position, letter)
+        return supported
+
+    def arc_consistent(self, domains=None):
+        """
+        AC-3: narrows the domain of each open slot to the words whose letter
+        in every crossing cell is still possible for the crossing slot,
+        repeating for the crossings of each slot narrowed until nothing
+        changes. Returns the new list of domains, in which the open slots
+        that cannot be filled are left empty.
+
+        An emptied domain is not used to narrow others, so that one dead
+        slot does not empty its whole region of the grid, and the slots
+        that really have no words can be told apart.
+        """
+        domains = list(self.domains if domains is None else domains)
+        open_slots = set(self.open_slots)
+        queue = deque(
+            (slot_index, position, other, other_position)
+            for slot_index in self.open_slots
+            for position, other, other_position in self.crossings[slot_index]
+            if other in open_slots)
+        queued = set(queue)
+        while queue:
+            arc = queue.popleft()
+            queued.discard(arc)
+            slot_index, position, other, other_position = arc
+            if not domains[slot_index] or not domains[other]:
+                continue
+            narrowed = domains[slot_index] & self.supported_bits(
+                domains, slot_index, position, other, other_position)
+            if narrowed == domains[slot_index]:
+                continue
+            domains[slot_index] = narrowed
+            for crossing_position, neighbour, neighbour_position \
+                    in self.crossings[slot_index]:
+                next_arc = (neighbour, neighbour_position,
+                            slot_index, crossing_position)
+                if neighbour != other and neighbour in open_slots \
+                        and next_arc not in queued:
+                    queue.append(next_arc)
+                    queued.add(next_arc)
+        return domains
+
+    def restrict(self, domains, slot_index, word):
+        """
+        Forward checking: narrows the domains of the open slots crossing this
+        one to the words that agree with the letters of word. Returns the new
+        list of domains, or None if any crossing slot is left with no words.
+        """
+        domains = domains[:]
+        domains[slot_index] = 0
+        for position, other, other_position in self.crossings[slot_index]:
+            if not domains[other]:
+                continue
+            domains[other] &= self.index.letter_bits(
+                self.length(other), other_position, word[position])
+            if not domains[other]:
+                return None
+        return domains
+
+    def render(self, fills):
+        """ Returns the cell string with the given slot fills applied """
+        cells = list(self.cells)
+        for slot_index, word in fills.items():
+            for cell, letter in zip(self.slots[slot_index]['cells'], word):
+                cells[cell] = letter
+        return ''.join(cells)
+
+
+class Autofill:
+    """
+    Fills the open slots of a SlotProblem by backtracking search. The most
+    constrained slot is filled next, candidate words are tried in descending
+    order of frequency, each choice is forward-checked against the crossing
+    slots, and no word is used twice in the grid.
+
+    run() is a generator of progress events, so that partial fills can be
+    streamed to the client while the search continues. The search stops when
+    the grid is full, when every possibility has been tried, or when the time
+    budget (in seconds) runs out.
+    """
+
+    def __init__(self, problem, time_budget):
+        self.problem = problem
+        self.time_budget = time_budget
+        self.started = None
+        self.deadline = None
+        self.timed_out = False
+        self.best_fills = {}
+        self.nodes = 0
+
+    def run(self):
+        problem = self.problem
+        self.started = time.monotonic()
+        self.deadline = self.started + self.time_budget
+        open_slots = set(problem.open_slots)
+        used = {problem.patterns[i] for i in range(len(problem.slots))
+                if i not in open_slots}
+
+        dead_slots = problem.dead_slots()
+        if dead_slots:
+            yield self._event('exhausted', {}, dead_slots=dead_slots)
+            return
+
+        # Fixed slots take no further part in the search, so they are given
+        # empty domains, which restrict() skips over.
+        domains = [domain if i in open_slots else 0
+                   for i, domain in enumerate(problem.domains)]
+        solution = yield from self._search(domains, {}, used)
+        if solution is not None:
+            yield self._event('complete', solution)
+        elif self.timed_out:
+            yield self._event('timeout', self.best_fills)
+        else:
+            yield self._event('exhausted', self.best_fills)
+
+    def _search(self, domains, fills, used):
+        problem = self.problem
+        self.nodes += 1
+        if time.monotonic() > self.deadline:
+            self.timed_out = True
+            return None
+
+        unfilled = [i for i in problem.open_slots if i not in fills]
+        if not unfilled:
+            return fills
+        slot_index = min(unfilled,
+                         key=lambda i: problem.candidate_count(i, domains))
+        length = problem.length(slot_index)
+
+        bits = domains[slot_index]
+        while bits:
+            # The budget is checked for each candidate as well as for each
+            # node, as a slot can have thousands of candidates to try
+            if time.monotonic() > self.deadline:
+                self.timed_out = True
+                return None
+            lowest = bits & -bits
+            bits ^= lowest
+            word = problem.index.words_for(length, lowest)[0]
+            if word in used:
+                continue
+            narrowed = problem.restrict(domains, slot_index, word)
+            if narrowed is None:
+                continue
+
+            fills[slot_index] = word
+            used.add(word)
+            if len(fills) > len(self.best_fills):
+                self.best_fills = dict(fills)
+                yield self._event('partial', fills)
+            solution = yield from self._search(narrowed, fills, used)
+            if solution is not None:
+                return solution
+            del fills[slot_index]
+            used.discard(word)
+            if self.timed_out:
+                return None
+        return None
+
+    def _event(self, status, fills, dead_slots=None):
+        problem = self.problem
+        event = {
+            'status': status,
+            'filled': len(fills),
+            'total': len(problem.open_slots),
+            'cells': problem.render(fills),
+            'elapsed': round(time.monotonic() - self.started, 3),
+        }
+        if dead_slots is not None:
+            event['dead_slots'] = [problem.slots[i] for i in dead_slots]
+        return event
@@ -0,0 +1,154 @@
+"""
+Generates block patterns for new crossword grids, and stores them as
+GridTemplates so that the builder can look them up by their dimensions,
+word count and shortest slot rather than generating them again.
+
+A pattern is a cell string in which '#' is an open cell and '-' a closed
+one, as taken by CreateNewPuzzle. Every pattern generated has 180 degree
+rotational symmetry (and left-right mirror symmetry too if asked for),
+its open cells are connected, each open cell lies in at least one slot,
+and no slot is shorter than the minimum slot length.
+"""
+import random
+
+from .models import GridTemplate
+from .utils import CLOSED, OPEN, get_grid_metadata, get_slots
+
+
+def is_valid_pattern(cells, width, height, min_slot_length):
+    """
+    Returns True if every slot of a pattern is at least min_slot_length
+    long, every open cell is in a slot, and the open cells are connected.
+    """
+    slots = get_slots(cells, width, height)
+    if any(slot['length'] < min_slot_length for slot in slots):
+        return False
+    open_cells = {index for index, cell in enumerate(cells) if cell != CLOSED}
+    if not open_cells:
+        return False
+    if {cell for slot in slots for cell in slot['cells']} != open_cells:
+        return False
+
+    start = next(iter(open_cells))
+    reached = {start}
+    stack = [start]
+    while stack:
+        cell = stack.pop()
+        row, col = divmod(cell, width)
+        for neighbour, inside in ((cell - width, row > 0),
+                                  (cell + width, row < height - 1),
+                                  (cell - 1, col > 0),
+                                  (cell + 1, col < width - 1)):
+            if inside and neighbour in open_cells and neighbour not in reached:
+                reached.add(neighbour)
+                stack.append(neighbour)
+    return len(reached) == len(open_cells)
+
+
+def _symmetric_groups(width, height, mirror):
+    """
+    Returns the groups of cells that must be open or closed together for a
+    pattern to keep its symmetry.
+    """
+    size = width * height
+    groups = set()
+    for cell in range(size):
+        group = {cell, size - 1 - cell}
+        if mirror:
+            row, col = divmod(cell, width)
+            group |= {row * width + width - 1 - col,
+                      size - 1 - (row * width + width - 1 - col)}
+        groups.add(tuple(sorted(group)))
+    return sorted(groups)
+
+
+def _generate_pattern(width, height, min_slot_length, max_words,
+                      min_concentration, mirror, rng):
+    # Closes symmetric groups of cells in a random order, keeping each
+    # closure that leaves a valid pattern, until no more can be closed
+    # without the open cells falling below min_concentration percent
+    size = width * height
+    groups = _symmetric_groups(width, height, mirror)
+    cells = [OPEN] * size
+    open_count = size
+    for group in rng.sample(groups, len(groups)):
+        if (open_count - len(group)) * 100 < min_concentration * size:
+            continue
+        for cell in group:
+            cells[cell] = CLOSED
+        if is_valid_pattern(cells, width, height, min_slot_length):
+            open_count -= len(group)
+        else:
+            for cell in group:
+                cells[cell] = OPEN
+    pattern = ''.join(cells)
+    if max_words is not None and \
+            len(get_slots(pattern, width, height)) > max_words:
+        return None
+    return pattern
+
+
+def generate_patterns(width, height, count, min_slot_length=3,
+                      max_words=None, min_concentration=75, mirror=False,
+                      seed=None, attempts=None):
+    """
+    Returns a list of up to count distinct patterns of the given size,
+    making up to attempts (by default 5 * count) random patterns. With
+    mirror set, the patterns have left-right mirror symmetry too.
+    """
+    rng = random.Random(seed)
+    patterns = []
+    for _ in range(attempts or count * 5):
+        if len(patterns) >= count:
+            break
+        pattern = _generate_pattern(width, height, min_slot_length,
+                                    max_words, min_concentration, mirror,
+                                    rng)
+        if pattern is not None and pattern not in patterns:
+            patterns.append(pattern)
+    return patterns
+
+
+def template_from_pattern(pattern, width, height):
+    """ Returns an unsaved GridTemplate for a pattern """
+    metadata = get_grid_metadata(pattern, width, height)
+    return GridTemplate(
+        width=width,
+        height=height,
+        cells=pattern,
+        word_count=len(metadata['slots']),
+        min_slot_length=min((slot['length'] for slot in metadata['slots']),
+                            default=0),
+        cell_concentration=metadata['cell_concentration'],
+        rotational_symmetry=metadata['rotational_symmetry'],
+        mirror_symmetry=metadata['mirror_symmetry'],
+    )
+
+
+def store_patterns(patterns, width, height):
+    """
+    Saves patterns as GridTemplates, skipping any already stored, and
+    returns the number of patterns given.
+    """
+    GridTemplate.objects.bulk_create(
+        [template_from_pattern(pattern, width, height)
+         for pattern in patterns],
+        ignore_conflicts=True)
+    return len(patterns)
+
+
+def find_templates(width, height, min_slot_length=None, max_words=None,
+                   mirror_symmetry=None):
+    """
+    Returns a queryset of the stored templates of a size, with no slot
+    shorter than min_slot_length and no more than max_words words.
+    """
+    templates = GridTemplate.objects.filter(
+        width=width, height=height, rotational_symmetry=True)
+    if min_slot_length is not None:
+        templates = templates.filter(min_slot_length__gte=min_slot_length)
+    if max_words is not None:
+        templates = templates.filter(word_count__lte=max_words)
+    if mirror_symmetry is not None:
+        templates = templates.filter(mirror_symmetry=mirror_symmetry)
+    return templates.order_by('word_count', 'id')
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import CrosswordInstance
+from .serializers import CrosswordInstanceSerializer
+
+# The number of leading instances cached per puzzle; requests for a longer
+# top n are capped at this.
+MAX_TOP_N = 50
+
+
+def _cache_key(puzzle_id):
+    return f'crossword_leaderboard_{puzzle_id}'
+
+
+def get_top_n(puzzle_id, top_n):
+    """
+    Returns the serialized top_n fastest verified instances of a crossword
+    puzzle, from a per-puzzle cache of the MAX_TOP_N fastest.
+    """
+    top = cache.get(_cache_key(puzzle_id))
+    if top is None:
+        instances = CrosswordInstance.objects.select_related('owner') \
+            .filter(crossword_puzzle=puzzle_id, verified=True) \
+            .order_by('time_taken', 'id')[:MAX_TOP_N]
+        top = CrosswordInstanceSerializer(instances, many=True).data
+        cache.set(_cache_key(puzzle_id), top,
+                  settings.CROSSWORD_LEADERBOARD_CACHE_TIMEOUT)
+    return top[:top_n]
+
+
+def invalidate_top_n(puzzle_id):
+    cache.delete(_cache_key(puzzle_id))
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from crosswords.grid_templates import generate_patterns, store_patterns
+from crosswords.models import GridTemplate
+
+
+class Command(BaseCommand):
+    help = ('Generate rotationally symmetric block patterns for crossword '
+            'grids of the given sizes, and store them as grid templates for '
+            'the builder to look up.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('sizes', nargs='+', type=int,
+                            help='grid sizes, each giving a square grid')
+        parser.add_argument('--count', type=int, default=50,
+                            help='patterns to generate for each size')
+        parser.add_argument('--min-slot-length', type=int, default=3,
+                            help='the shortest slot a pattern may have')
+        parser.add_argument('--max-words', type=int,
+                            help='the most slots a pattern may have')
+        parser.add_argument('--min-concentration', type=int, default=75,
+                            help='the lowest percentage of open cells')
+        parser.add_argument('--mirror', action='store_true',
+                            help='give the patterns left-right mirror '
+                                 'symmetry as well')
+        parser.add_argument('--seed', type=int,
+                            help='random seed, for repeatable patterns')
+
+    def handle(self, *args, **kwargs):
+        for size in kwargs['sizes']:
+            started = time.monotonic()
+            stored_before = GridTemplate.objects.filter(
+                width=size, height=size).count()
+            patterns = generate_patterns(
+                size, size, kwargs['count'],
+                min_slot_length=kwargs['min_slot_length'],
+                max_words=kwargs['max_words'],
+                min_concentration=kwargs['min_concentration'],
+                mirror=kwargs['mirror'],
+                seed=kwargs['seed'],
+            )
+            store_patterns(patterns, size, size)
+            added = GridTemplate.objects.filter(
+                width=size, height=size).count() - stored_before
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'{size}x{size}: {len(patterns)} patterns generated, '
+                f'{added} new templates stored in {elapsed:.1f}s')
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crosswords', '0006_dictionaryword_crosswords__length_153860_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='crosswordinstance',
+            index=models.Index(fields=['crossword_puzzle', 'time_taken'], name='crosswords__crosswo_85eb48_idx'),
+        ),
+    ]
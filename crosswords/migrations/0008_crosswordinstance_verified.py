@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 15:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crosswords', '0007_crosswordinstance_puzzle_time_taken_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crosswordinstance',
+            name='verified',
+            field=models.BooleanField(default=False),
+        ),
+    ]
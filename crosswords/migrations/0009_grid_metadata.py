@@ -0,0 +1,142 @@
+# Generated by Django 4.2 on 2026-10-18 15:35
+
+import math
+
+from django.db import migrations, models
+
+# A frozen copy of crosswords.utils.get_slots and get_grid_metadata as they
+# stood when this migration was written, so that later changes to them do
+# not change what it computes.
+CLOSED = '-'
+
+
+def get_slots(cells, width, height):
+    slots = []
+    for row in range(height):
+        col = 0
+        while col < width:
+            start = col
+            while col < width and cells[row * width + col] != CLOSED:
+                col += 1
+            if col - start > 1:
+                slots.append({
+                    'orientation': 'AC',
+                    'start_row': row,
+                    'start_col': start,
+                    'length': col - start,
+                    'cells': [row * width + c for c in range(start, col)],
+                })
+            col += 1
+    for col in range(width):
+        row = 0
+        while row < height:
+            start = row
+            while row < height and cells[row * width + col] != CLOSED:
+                row += 1
+            if row - start > 1:
+                slots.append({
+                    'orientation': 'DN',
+                    'start_row': start,
+                    'start_col': col,
+                    'length': row - start,
+                    'cells': [r * width + col for r in range(start, row)],
+                })
+            row += 1
+    return slots
+
+
+def get_grid_metadata(cells, width, height):
+    slots = get_slots(cells, width, height)
+    slots_by_cell = {}
+    for index, slot in enumerate(slots):
+        for cell in slot['cells']:
+            slots_by_cell.setdefault(cell, []).append(index)
+    for index, slot in enumerate(slots):
+        slot['crossings'] = [other for cell in slot['cells']
+                             for other in slots_by_cell[cell]
+                             if other != index]
+
+    histogram = {}
+    for slot in slots:
+        histogram[str(slot['length'])] = \
+            histogram.get(str(slot['length']), 0) + 1
+
+    closed = [cell == CLOSED for cell in cells]
+    open_count = closed.count(False)
+    checked_count = sum(1 for indices in slots_by_cell.values()
+                        if len(indices) > 1)
+
+    def percentage(count, total):
+        return math.floor(count / total * 100) if total else 0
+
+    return {
+        'cell_concentration': percentage(open_count, len(cells)),
+        'slots': slots,
+        'slot_lengths': dict(sorted(histogram.items(),
+                                    key=lambda item: int(item[0]))),
+        'checked_percentage': percentage(checked_count, open_count),
+        'rotational_symmetry': closed == closed[::-1],
+        'mirror_symmetry': all(
+            closed[row * width:(row + 1) * width]
+            == closed[row * width:(row + 1) * width][::-1]
+            for row in range(height)),
+    }
+
+
+def fill_grid_metadata(apps, schema_editor):
+    # Historical models do not run Grid.save(), so the metadata is set here
+    Grid = apps.get_model('crosswords', 'Grid')
+    grids = list(Grid.objects.only('cells', 'width', 'height'))
+    fields = set()
+    for grid in grids:
+        metadata = get_grid_metadata(grid.cells, grid.width, grid.height)
+        for field, value in metadata.items():
+            setattr(grid, field, value)
+        fields.update(metadata)
+    if grids:
+        Grid.objects.bulk_update(grids, fields, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crosswords', '0008_crosswordinstance_verified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='grid',
+            name='cell_concentration',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='grid',
+            name='checked_percentage',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='grid',
+            name='mirror_symmetry',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='grid',
+            name='rotational_symmetry',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='grid',
+            name='slot_lengths',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='grid',
+            name='slots',
+            field=models.JSONField(default=list),
+        ),
+        migrations.RunPython(fill_grid_metadata, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='grid',
+            index=models.Index(fields=['width', 'height', 'cell_concentration'], name='crosswords__width_a81087_idx'),
+        ),
+    ]
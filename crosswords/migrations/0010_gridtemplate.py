@@ -0,0 +1,36 @@
+# Generated by Django 4.2 on 2026-10-18 15:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crosswords', '0009_grid_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GridTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+                ('width', models.IntegerField()),
+                ('height', models.IntegerField()),
+                ('cells', models.CharField(max_length=625)),
+                ('word_count', models.IntegerField()),
+                ('min_slot_length', models.IntegerField()),
+                ('cell_concentration', models.IntegerField()),
+                ('rotational_symmetry', models.BooleanField()),
+                ('mirror_symmetry', models.BooleanField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='gridtemplate',
+            index=models.Index(fields=['width', 'height', 'rotational_symmetry', 'word_count', 'min_slot_length'], name='crosswords__width_4a4d3e_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='gridtemplate',
+            constraint=models.UniqueConstraint(fields=('width', 'height', 'cells'), name='unique_grid_template'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crosswords', '0010_gridtemplate'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dictionaryword',
+            index=models.Index(fields=['string'], name='crosswords__string_807e3b_idx'),
+        ),
+    ]
@@ -4,6 +4,7 @@ from django.contrib.auth.models import User
 from django.utils.translation import gettext_lazy as _
 
 from sudoku.models import PlayerProfile
+from fruzzled_backend.counters import increment
 
 
 class Orientation(models.TextChoices):
@@ -28,10 +29,69 @@ class Grid(models.Model):
     height = models.IntegerField(default=12)
     cells = models.TextField(max_length=625)
 
+    # Metadata worked out from the cells each time the grid is saved
+    cell_concentration = models.IntegerField(default=0)
+    slots = models.JSONField(default=list)
+    slot_lengths = models.JSONField(default=dict)
+    checked_percentage = models.IntegerField(default=0)
+    rotational_symmetry = models.BooleanField(default=False)
+    mirror_symmetry = models.BooleanField(default=False)
+
+    METADATA_FIELDS = ['cell_concentration', 'slots', 'slot_lengths',
+                       'checked_percentage', 'rotational_symmetry',
+                       'mirror_symmetry']
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['width', 'height', 'cell_concentration']),
+        ]
+
     def __str__(self):
         return (f'Grid ({self.width}x{self.height}), created on '
                 f'{self.created_on} by {self.creator}.')
 
+    def save(self, *args, **kwargs):
+        # utils imports this module, so it can only be imported here
+        from .utils import get_grid_metadata
+        metadata = get_grid_metadata(self.cells, self.width, self.height)
+        for field, value in metadata.items():
+            setattr(self, field, value)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = \
+                set(update_fields) | set(self.METADATA_FIELDS)
+        super().save(*args, **kwargs)
+
+
+class GridTemplate(models.Model):
+    """
+    A reusable pattern of open ('#') and closed ('-') cells for a new grid,
+    with the numbers by which the builder looks it up.
+    """
+    created_on = models.DateTimeField(auto_now_add=True)
+    width = models.IntegerField()
+    height = models.IntegerField()
+    cells = models.CharField(max_length=625)
+    word_count = models.IntegerField()
+    min_slot_length = models.IntegerField()
+    cell_concentration = models.IntegerField()
+    rotational_symmetry = models.BooleanField()
+    mirror_symmetry = models.BooleanField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['width', 'height', 'cells'],
+                                    name='unique_grid_template'),
+        ]
+        indexes = [
+            models.Index(fields=['width', 'height', 'rotational_symmetry',
+                                 'word_count', 'min_slot_length']),
+        ]
+
+    def __str__(self):
+        return (f'Grid template ({self.width}x{self.height}), '
+                f'{self.word_count} words')
+
 
 class CrosswordPuzzle(models.Model):
     """
@@ -72,10 +132,14 @@ class CrosswordInstance(models.Model):
     time_taken = models.DurationField(null=True)
     percent_complete = models.FloatField()
     percent_correct = models.FloatField()
+    # True if the percentages were worked out from the submitted cells,
+    # rather than taken from the client
+    verified = models.BooleanField(default=False)
 
     class Meta:
         indexes = [
-            models.Index(fields=["time_taken"])
+            models.Index(fields=["time_taken"]),
+            models.Index(fields=["crossword_puzzle", "time_taken"]),
         ]
 
     def __str__(self):
@@ -84,12 +148,13 @@ class CrosswordInstance(models.Model):
     def save(self, *args, **kwargs):
         timedelta = self.completed_at - self.started_on
         self.time_taken = timedelta
+        adding = self._state.adding
         super().save(*args, **kwargs)
 
-        # Update the Puzzle model
-        puzzle = CrosswordPuzzle.objects.get(id=self.crossword_puzzle.id)
-        puzzle.instances_completed += 1
-        puzzle.save()
+        # Update the Puzzle model's counter when the instance is first saved
+        if adding:
+            increment(CrosswordPuzzle, self.crossword_puzzle_id,
+                      'instances_completed')
 
 
 class DictionaryWord(models.Model):
@@ -100,7 +165,8 @@ class DictionaryWord(models.Model):
 
     class Meta: 
         indexes = [
-            models.Index(fields=['length'])
+            models.Index(fields=['length']),
+            models.Index(fields=['string']),
         ]
 
     def get_frequency(self):
@@ -0,0 +1,80 @@
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import CrosswordClue
+from .serializers import CrosswordPuzzleSerializer, CrosswordClueSerializer
+from .utils import get_cell_concentration
+
+START_TIME_PLACEHOLDER = '__fruzzled_start_time__'
+
+
+def get_puzzle_data(puzzle):
+    """
+    Returns the puzzle, its clues, and a summary of how many of the clues
+    and solutions have been filled in, as sent to the puzzle interface.
+    """
+    clues = list(CrosswordClue.objects.filter(puzzle=puzzle))
+    clue_count = 0
+    solution_count = 0
+    for clue in clues:
+        if len(clue.clue) > 0:
+            clue_count += 1
+        if '#' not in clue.solution:
+            solution_count += 1
+    puzzle_serializer = CrosswordPuzzleSerializer(puzzle)
+    clue_serializer = CrosswordClueSerializer(clues, many=True)
+    return {
+        'puzzle': puzzle_serializer.data,
+        'clues': clue_serializer.data,
+        'cell_concentration': get_cell_concentration(puzzle),
+        'clues_present': clue_count,
+        'solutions_present': solution_count,
+        'total_clues': len(clues)
+    }
+
+
+def _cache_key(puzzle_id):
+    return f'crossword_payload_{puzzle_id}'
+
+
+def get_cached_payload(puzzle_id):
+    """
+    Returns the rendered JSON body for a puzzle, with the current time
+    spliced in as its start_time, or None if it has not been cached.
+    """
+    parts = cache.get(_cache_key(puzzle_id))
+    if parts is None:
+        return None
+    return _splice(parts)
+
+
+def cache_payload(puzzle):
+    """
+    Renders the JSON body for a puzzle, caches it, and returns it with the
+    current time spliced in as its start_time.
+
+    The body is cached as the two strings either side of the start_time
+    value, so that serving it again needs no serialization.
+    """
+    data = get_puzzle_data(puzzle)
+    data['puzzle']['start_time'] = START_TIME_PLACEHOLDER
+    body = JSONRenderer().render({'puzzle': data}).decode()
+    parts = tuple(body.rsplit(json.dumps(START_TIME_PLACEHOLDER), 1))
+    cache.set(_cache_key(puzzle.id), parts,
+              settings.PUZZLE_PAYLOAD_CACHE_TIMEOUT)
+    return _splice(parts)
+
+
+def invalidate_payload(puzzle_id):
+    cache.delete(_cache_key(puzzle_id))
+
+
+def _splice(parts):
+    head, tail = parts
+    start_time = json.dumps(datetime.now(), cls=JSONEncoder)
+    return head + start_time + tail
@@ -0,0 +1,26 @@
+from django.conf import settings
+
+from fruzzled_backend.id_pool import IdPool
+from .models import CrosswordPuzzle
+
+released_puzzles = IdPool(
+    lambda: CrosswordPuzzle.objects.filter(released=True)
+                                   .values_list('id', flat=True),
+    ttl=settings.PUZZLE_POOL_TTL,
+)
+
+
+def choose_unseen_puzzle_id(seen_ids):
+    """
+    Returns the id of a random released puzzle that is not among seen_ids.
+    If the player has seen them all, the first (least recently seen) id in
+    seen_ids is returned instead, as long as that puzzle is still released.
+    Returns None if there are no released puzzles.
+    """
+    puzzle_id = released_puzzles.choose(exclude=seen_ids)
+    if puzzle_id is None and seen_ids:
+        if seen_ids[0] in released_puzzles:
+            puzzle_id = seen_ids[0]
+        else:
+            puzzle_id = released_puzzles.choose()
+    return puzzle_id
@@ -1,12 +1,19 @@
 from rest_framework import serializers
+from fruzzled_backend.play_times import validate_play_times
 from .models import CrosswordClue, CrosswordPuzzle, Grid, CrosswordInstance
+from .verification import get_solution_map, score_cells
 from datetime import datetime
 
 
 class GridSerializer(serializers.ModelSerializer):
     class Meta:
         model = Grid
-        fields = ['width', 'height', 'cells']
+        fields = ['width', 'height', 'cells', 'cell_concentration', 'slots',
+                  'slot_lengths', 'checked_percentage', 'rotational_symmetry',
+                  'mirror_symmetry']
+        read_only_fields = ['cell_concentration', 'slots', 'slot_lengths',
+                            'checked_percentage', 'rotational_symmetry',
+                            'mirror_symmetry']
 
 
 class CrosswordClueSerializer(serializers.ModelSerializer):
@@ -37,13 +44,41 @@ class CrosswordInstanceSerializer(serializers.ModelSerializer):
     owner_nickname = serializers.ReadOnlyField(source='owner.nickname')
     owner_country = serializers.ReadOnlyField(source='owner.country')
 
+    # The player's final grid. If sent, the percentages are worked out from
+    # it against the puzzle's solution, rather than taken from the client.
+    cells = serializers.CharField(write_only=True, required=False)
+
     duration = serializers.SerializerMethodField()
     def get_duration(self, obj):
         return int(obj.time_taken.total_seconds() * 1000)
 
+    def validate(self, data):
+        validate_play_times(data['started_on'], data['completed_at'],
+                            data['crossword_puzzle'].created_on)
+        cells = data.pop('cells', None)
+        if cells is not None:
+            solution = get_solution_map(data['crossword_puzzle'])
+            try:
+                complete, correct = score_cells(solution, cells)
+            except ValueError as e:
+                raise serializers.ValidationError({'cells': str(e)})
+            data['percent_complete'] = complete
+            data['percent_correct'] = correct
+            data['verified'] = True
+        elif 'percent_complete' not in data or 'percent_correct' not in data:
+            raise serializers.ValidationError(
+                'Either cells or percent_complete and percent_correct '
+                'are required')
+        return data
+
     class Meta:
         model = CrosswordInstance
         fields = ['id', 'crossword_puzzle', 'owner', 'started_on',
                   'completed_at', 'time_taken', 'percent_complete',
-                  'percent_correct', 'owner_nickname', 'owner_country',
-                  'duration']
\ No newline at end of file
+                  'percent_correct', 'verified', 'owner_nickname',
+                  'owner_country', 'duration', 'cells']
+        read_only_fields = ['verified']
+        extra_kwargs = {
+            'percent_complete': {'required': False},
+            'percent_correct': {'required': False},
+        }
\ No newline at end of file
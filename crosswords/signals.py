@@ -0,0 +1,80 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import CrosswordClue, CrosswordInstance, CrosswordPuzzle, \
+    DictionaryWord, Grid
+from .leaderboard import invalidate_top_n
+from .payloads import invalidate_payload
+from .puzzle_pool import released_puzzles
+from .verification import invalidate_solution_map
+from .word_index import invalidate_word_index
+
+
+@receiver(post_save, sender=DictionaryWord)
+@receiver(post_delete, sender=DictionaryWord)
+def dictionary_word_changed(sender, **kwargs):
+    """ Any change to the dictionary invalidates the positional word index """
+    invalidate_word_index()
+
+
+def _invalidate_caches(puzzle_id):
+    """ Discards the cached payload and solution of a puzzle """
+    invalidate_payload(puzzle_id)
+    invalidate_solution_map(puzzle_id)
+
+
+@receiver(post_save, sender=CrosswordPuzzle)
+def crossword_puzzle_saved(sender, instance, **kwargs):
+    """
+    Keeps the pool of released puzzle ids in step with the puzzle, and
+    discards its cached payload and solution, once the save is committed.
+    SavePuzzle always ends by saving the puzzle, so this also covers its
+    bulk clue writes.
+    """
+    puzzle_id, released = instance.id, instance.released
+
+    def update_caches():
+        _invalidate_caches(puzzle_id)
+        if released:
+            released_puzzles.add(puzzle_id)
+        else:
+            released_puzzles.discard(puzzle_id)
+
+    transaction.on_commit(update_caches)
+
+
+@receiver(post_delete, sender=CrosswordPuzzle)
+def crossword_puzzle_deleted(sender, instance, **kwargs):
+    puzzle_id = instance.id
+
+    def update_caches():
+        _invalidate_caches(puzzle_id)
+        released_puzzles.discard(puzzle_id)
+
+    transaction.on_commit(update_caches)
+
+
+@receiver(post_save, sender=CrosswordClue)
+@receiver(post_delete, sender=CrosswordClue)
+def crossword_clue_changed(sender, instance, **kwargs):
+    if instance.puzzle_id:
+        transaction.on_commit(partial(_invalidate_caches, instance.puzzle_id))
+
+
+@receiver(post_save, sender=Grid)
+def grid_saved(sender, instance, **kwargs):
+    puzzle_id = CrosswordPuzzle.objects.filter(grid=instance) \
+        .values_list('id', flat=True).first()
+    if puzzle_id:
+        transaction.on_commit(partial(_invalidate_caches, puzzle_id))
+
+
+@receiver(post_save, sender=CrosswordInstance)
+@receiver(post_delete, sender=CrosswordInstance)
+def crossword_instance_changed(sender, instance, **kwargs):
+    """ Discards the puzzle's cached top n once the change is committed """
+    transaction.on_commit(
+        partial(invalidate_top_n, instance.crossword_puzzle_id))
@@ -1,13 +1,25 @@
 import json
+from datetime import timedelta
 
 from django.contrib.auth.models import User
 from django.shortcuts import get_object_or_404
 from django.core.cache import cache
 from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework.test import APITestCase
 
 from crosswords.models import (CrosswordPuzzle, CrosswordInstance,
-    DictionaryWord, DictionaryDefinition, Grid)
+    CrosswordClue, DictionaryWord, DictionaryDefinition, Grid, GridTemplate)
+from crosswords.grid_templates import (generate_patterns, is_valid_pattern,
+    store_patterns)
+from crosswords.payloads import get_cached_payload
+from crosswords.puzzle_pool import released_puzzles
+from crosswords.verification import get_solution_map
+from crosswords.word_index import invalidate_word_index
+from player_profile.models import PlayerProfile
 
 
 class TestPuzzleListView(APITestCase):
@@ -148,6 +160,23 @@ class TestGetMatchingWordView(APITestCase):
         content = json.loads(response.content)
         self.assertEqual(content['results'][0], 'behemoth')
 
+    def test_matches_are_returned_in_descending_order_of_frequency(self):
+        DictionaryWord.objects.create(string='bedstead', length=8, frequency=5)
+        DictionaryWord.objects.create(string='bedrocks', length=8, frequency=3)
+        DictionaryWord.objects.create(string='carousel', length=8, frequency=9)
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        response = self.client.get(f'{self.ROOT_URL}query/be______/')
+        content = json.loads(response.content)
+        self.assertEqual(content['results'], ['bedstead', 'bedrocks', 'behemoth'])
+
+    def test_word_added_after_first_query_is_matched(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        self.client.get(f'{self.ROOT_URL}query/________/')
+        DictionaryWord.objects.create(string='elephant', length=8, frequency=2)
+        response = self.client.get(f'{self.ROOT_URL}query/e_e_____/')
+        content = json.loads(response.content)
+        self.assertEqual(content['results'], ['elephant'])
+
 
 class TestGetDefinitionView(APITestCase):
 
@@ -213,6 +242,86 @@ class TestGetDefinitionView(APITestCase):
         response_string = json.loads(response.content)
         self.assertEqual(len(response_string['results']), 0)
 
+    def test_query_takes_one_query_for_all_definitions(self):
+        DictionaryDefinition.objects.create(
+            word=self.example_word_1, definition='a big beast')
+        DictionaryDefinition.objects.create(
+            word=DictionaryWord.objects.create(
+                string='behemoth', length=8, frequency=2),
+            definition='something huge')
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'{self.ROOT_URL}get_definition/behemoth/')
+        definition_queries = [query for query in queries.captured_queries
+                              if 'definition' in query['sql']]
+        self.assertEqual(len(definition_queries), 1)
+        self.assertEqual(json.loads(response.content)['results'],
+                         ['a large yoke', 'a big beast', 'something huge'])
+
+
+class TestBatchDefinitionsView(APITestCase):
+
+    ROOT_URL = '/api/crossword_builder/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ADMIN_USERNAME = 'test_admin'
+        cls.ADMIN_PASSWORD = 'top_secret'
+        cls.admin_user = User.objects.create_superuser(
+            username=cls.ADMIN_USERNAME,
+            password=cls.ADMIN_PASSWORD,
+        )
+        cls.standard_user = User.objects.create_user(
+            username='joe_soap',
+            password='monkey123'
+        )
+        for string, definitions in [('behemoth', ['a large yoke',
+                                                  'a big beast']),
+                                    ('cat', ['a small feline']),
+                                    ('ore', [])]:
+            word = DictionaryWord.objects.create(
+                string=string, length=len(string), frequency=1)
+            for definition in definitions:
+                DictionaryDefinition.objects.create(
+                    word=word, definition=definition)
+
+    def tearDown(self):
+        self.client.logout()
+        cache.clear()
+
+    def post_words(self, words):
+        return self.client.post(
+            f'{self.ROOT_URL}batch_definitions/',
+            {'words': json.dumps(words)},
+        )
+
+    def test_standard_user_cannot_request(self):
+        self.client.login(username='joe_soap', password='monkey123')
+        self.assertEqual(self.post_words(['cat']).status_code, 403)
+
+    def test_definitions_are_grouped_by_word_in_two_queries(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_words(['CAT', 'behemoth', 'ore', 'zzz', 'cat'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['results'], [
+            {'word': 'cat', 'definitions': ['a small feline']},
+            {'word': 'behemoth', 'definitions': ['a large yoke', 'a big beast']},
+            {'word': 'ore', 'definitions': []},
+            {'word': 'zzz', 'definitions': []},
+        ])
+        dictionary_queries = [query for query in queries.captured_queries
+                              if 'crosswords_dictionary' in query['sql']]
+        self.assertEqual(len(dictionary_queries), 2)
+
+    def test_words_should_be_a_list_of_strings(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        self.assertEqual(self.post_words({'cat': 1}).status_code, 400)
+        self.assertEqual(self.post_words([1, 2]).status_code, 400)
+        response = self.client.post(
+            f'{self.ROOT_URL}batch_definitions/', {'words': 'not json'})
+        self.assertEqual(response.status_code, 400)
+
 
 class TestDeletePuzzleView(APITestCase):
 
@@ -361,6 +470,33 @@ class TestSavePuzzleView(APITestCase):
         saved_puzzle = get_object_or_404(CrosswordPuzzle, pk=id)
         self.assertFalse(saved_puzzle.complete)
 
+    def test_only_changed_clues_are_written(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        url = f'{self.ROOT_URL}save_puzzle/'
+        data = dict(self.request_data)
+        response = self.client.post(url, data)
+        changed = json.loads(response.content)['changed_clues']
+        self.assertEqual(changed['created'], [{'orientation': 'AC', 'clue_number': 1}])
+        clue_id = CrosswordClue.objects.get(puzzle=self.test_puzzle).id
+
+        response = self.client.post(url, data)
+        changed = json.loads(response.content)['changed_clues']
+        self.assertEqual(changed, {'created': [], 'updated': [], 'deleted': []})
+
+        data['clues'] = self.clue_string.replace('No clue yet', 'A clue')
+        response = self.client.post(url, data)
+        changed = json.loads(response.content)['changed_clues']
+        self.assertEqual(changed['updated'], [{'orientation': 'AC', 'clue_number': 1}])
+        clue = CrosswordClue.objects.get(puzzle=self.test_puzzle)
+        self.assertEqual(clue.id, clue_id)
+        self.assertEqual(clue.clue, 'A clue')
+
+        data['clues'] = '[]'
+        response = self.client.post(url, data)
+        changed = json.loads(response.content)['changed_clues']
+        self.assertEqual(changed['deleted'], [{'orientation': 'AC', 'clue_number': 1}])
+        self.assertFalse(CrosswordClue.objects.filter(puzzle=self.test_puzzle).exists())
+
 
 class TestCreateNewPuzzleView(APITestCase):
 
@@ -454,6 +590,109 @@ class TestCreateNewPuzzleView(APITestCase):
         self.assertEqual(response.status_code, 400)
 
 
+class TestGridTemplatesView(APITestCase):
+
+    ROOT_URL = '/api/crossword_builder/'
+
+    def tearDown(self):
+        self.client.logout()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ADMIN_USERNAME = 'test_admin'
+        cls.ADMIN_PASSWORD = 'top_secret'
+        cls.admin_user = User.objects.create_superuser(
+            username=cls.ADMIN_USERNAME,
+            password=cls.ADMIN_PASSWORD,
+        )
+        cls.standard_user = User.objects.create_user(
+            username='joe_soap',
+            password='monkey123'
+        )
+
+    def get_templates(self, query):
+        return self.client.get(f'{self.ROOT_URL}grid_templates/?{query}')
+
+    def test_generated_patterns_meet_their_constraints(self):
+        patterns = generate_patterns(9, 9, 3, min_slot_length=4, seed=1)
+        self.assertTrue(patterns)
+        for pattern in patterns:
+            self.assertEqual(pattern, pattern[::-1])
+            self.assertTrue(is_valid_pattern(pattern, 9, 9, 4))
+
+    def test_mirror_patterns_are_stored_and_found(self):
+        store_patterns(generate_patterns(9, 9, 3, mirror=True, seed=1), 9, 9)
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        templates = self.get_templates(
+            'width=9&height=9&mirror_symmetry=true').json()['templates']
+        self.assertTrue(templates)
+        self.assertTrue(all(template['mirror_symmetry']
+                            for template in templates))
+
+    def test_a_miss_returns_no_templates_without_generating_any(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        response = self.get_templates('width=7&height=7')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['templates'], [])
+        self.assertFalse(GridTemplate.objects.exists())
+
+    def test_stored_templates_are_looked_up(self):
+        store_patterns(generate_patterns(7, 7, 5, seed=1), 7, 7)
+        stored = GridTemplate.objects.count()
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        with self.assertNumQueries(3):
+            # The session, the user and the template lookup
+            response = self.get_templates('width=7&height=7')
+        data = response.json()
+        self.assertEqual(len(data['templates']), stored)
+        for template in data['templates']:
+            self.assertGreaterEqual(template['min_slot_length'], 3)
+            self.assertTrue(template['rotational_symmetry'])
+
+    def test_templates_are_filtered_by_word_count(self):
+        store_patterns(generate_patterns(7, 7, 5, seed=2), 7, 7)
+        fewest = GridTemplate.objects.order_by('word_count').first()
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        response = self.get_templates(
+            f'width=7&height=7&max_words={fewest.word_count}')
+        self.assertTrue(all(template['word_count'] <= fewest.word_count
+                            for template in response.json()['templates']))
+
+    def test_bad_dimensions_are_rejected(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        self.assertEqual(self.get_templates('width=7').status_code, 400)
+        self.assertEqual(
+            self.get_templates('width=7&height=99').status_code, 400)
+
+    def test_standard_user_cannot_get_templates(self):
+        self.client.login(username='joe_soap', password='monkey123')
+        response = self.get_templates('width=7&height=7')
+        self.assertEqual(response.status_code, 403)
+
+    def test_puzzle_can_be_created_from_a_template(self):
+        store_patterns(generate_patterns(7, 7, 1, seed=3), 7, 7)
+        template = GridTemplate.objects.get()
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        response = self.client.post(
+            self.ROOT_URL + 'create_new_puzzle/',
+            {'puzzle_type': 'CROSSWORD', 'template_id': template.id}
+        )
+        self.assertEqual(response.status_code, 200)
+        puzzle = CrosswordPuzzle.objects.get(
+            id=response.json()['new_puzzle_id'])
+        self.assertEqual(puzzle.grid.cells, template.cells)
+        self.assertEqual(puzzle.grid.width, 7)
+
+    def test_non_integer_template_id_is_rejected(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        response = self.client.post(
+            self.ROOT_URL + 'create_new_puzzle/',
+            {'puzzle_type': 'CROSSWORD', 'template_id': 'abc'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
 class TestGetPuzzleView(APITestCase):
 
     ROOT_URL = '/api/crossword_builder/'
@@ -512,6 +751,56 @@ class TestGetPuzzleView(APITestCase):
         response = self.client.get(f'{self.ROOT_URL}get_puzzle/{id}/')
         self.assertEqual(response.status_code, 404)
 
+    def test_puzzle_includes_stored_grid_metadata(self):
+        id = self.test_puzzle.pk
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        response = self.client.get(f'{self.ROOT_URL}get_puzzle/{id}/')
+        puzzle = response.data['puzzle']
+        self.assertEqual(puzzle['cell_concentration'], 100)
+        self.assertEqual(puzzle['puzzle']['grid']['slot_lengths'], {'2': 4})
+        self.assertEqual(len(puzzle['puzzle']['grid']['slots']), 4)
+
+
+class TestGridMetadata(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='joe', password='x')
+        cls.grid = Grid.objects.create(
+            creator=cls.user,
+            width=3,
+            height=3,
+            cells='####-####',
+        )
+
+    def test_metadata_is_computed_on_save(self):
+        grid = Grid.objects.get(id=self.grid.id)
+        self.assertEqual(grid.cell_concentration, 88)
+        self.assertEqual(grid.slot_lengths, {'3': 4})
+        self.assertEqual(grid.checked_percentage, 50)
+        self.assertTrue(grid.rotational_symmetry)
+        self.assertTrue(grid.mirror_symmetry)
+        self.assertEqual(
+            [(slot['orientation'], slot['start_row'], slot['start_col'],
+              slot['crossings']) for slot in grid.slots],
+            [('AC', 0, 0, [2, 3]), ('AC', 2, 0, [2, 3]),
+             ('DN', 0, 0, [0, 1]), ('DN', 0, 2, [0, 1])])
+
+    def test_letters_count_as_open_cells(self):
+        self.grid.cells = 'ab#-#####'
+        self.grid.save()
+        grid = Grid.objects.get(id=self.grid.id)
+        self.assertEqual(grid.cell_concentration, 88)
+        self.assertFalse(grid.rotational_symmetry)
+        self.assertFalse(grid.mirror_symmetry)
+
+    def test_metadata_is_saved_with_update_fields(self):
+        self.grid.cells = '#########'
+        self.grid.save(update_fields=['cells'])
+        grid = Grid.objects.get(id=self.grid.id)
+        self.assertEqual(grid.cell_concentration, 100)
+        self.assertEqual(grid.checked_percentage, 100)
+
 
 class TestGetUnseenPuzzleView(APITestCase):
     ROOT_URL = '/api/crossword_builder/'
@@ -519,6 +808,7 @@ class TestGetUnseenPuzzleView(APITestCase):
     def tearDown(self):
         self.client.logout()
         cache.clear()
+        released_puzzles.invalidate()
 
     @classmethod
     def setUpTestData(cls):
@@ -569,7 +859,7 @@ class TestGetUnseenPuzzleView(APITestCase):
         id_2 = self.test_puzzle_2.pk
         url = f'{self.ROOT_URL}get_unseen_puzzle/?seen_crosswords={id_1}'
         response = self.client.get(url)
-        response_puzzle_id = response.data['puzzle']['puzzle']['id']
+        response_puzzle_id = json.loads(response.content)['puzzle']['puzzle']['id']
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response_puzzle_id, id_2)
 
@@ -578,10 +868,62 @@ class TestGetUnseenPuzzleView(APITestCase):
         id_2 = self.test_puzzle_2.pk
         url = f'{self.ROOT_URL}get_unseen_puzzle/?seen_crosswords={id_2},{id_1}'
         response = self.client.get(url)
-        response_puzzle_id = response.data['puzzle']['puzzle']['id']
+        response_puzzle_id = json.loads(response.content)['puzzle']['puzzle']['id']
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response_puzzle_id, id_2)
 
+    def test_unreleased_puzzle_is_not_returned(self):
+        self.test_puzzle_1.released = False
+        self.test_puzzle_1.save()
+        for _ in range(2):
+            response = self.client.get(f'{self.ROOT_URL}get_unseen_puzzle/')
+            response_puzzle_id = json.loads(response.content)['puzzle']['puzzle']['id']
+            self.assertEqual(response_puzzle_id, self.test_puzzle_2.pk)
+
+    def test_no_released_puzzles_returns_404(self):
+        CrosswordPuzzle.objects.filter(released=True).delete()
+        response = self.client.get(f'{self.ROOT_URL}get_unseen_puzzle/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_cached_puzzle_is_served_without_crossword_queries(self):
+        url = f'{self.ROOT_URL}get_unseen_puzzle/?seen_crosswords={self.test_puzzle_1.pk}'
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        # The only queries left are those logging the request
+        for query in queries.captured_queries:
+            self.assertNotIn('crosswords_', query['sql'])
+        content = json.loads(response.content)
+        self.assertEqual(content['puzzle']['puzzle']['id'], self.test_puzzle_2.pk)
+        self.assertIn('start_time', content['puzzle']['puzzle'])
+
+    def test_cached_puzzle_is_refreshed_when_a_clue_changes(self):
+        url = f'{self.ROOT_URL}get_unseen_puzzle/?seen_crosswords={self.test_puzzle_1.pk}'
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            CrosswordClue.objects.create(
+                puzzle=self.test_puzzle_2, clue='A clue', solution='ab')
+        response = self.client.get(url)
+        content = json.loads(response.content)
+        self.assertEqual(content['puzzle']['total_clues'], 1)
+        self.assertEqual(content['puzzle']['clues'][0]['clue'], 'A clue')
+
+    def test_cached_puzzle_is_kept_until_a_change_is_committed(self):
+        url = f'{self.ROOT_URL}get_unseen_puzzle/?seen_crosswords={self.test_puzzle_1.pk}'
+        self.client.get(url)
+        with self.captureOnCommitCallbacks() as callbacks:
+            CrosswordClue.objects.create(
+                puzzle=self.test_puzzle_2, clue='A clue', solution='ab')
+            self.test_puzzle_2.released = False
+            self.test_puzzle_2.save()
+        self.assertTrue(callbacks)
+        self.assertIsNotNone(get_cached_payload(self.test_puzzle_2.pk))
+        self.assertIn(self.test_puzzle_2.pk, released_puzzles)
+        for callback in callbacks:
+            callback()
+        self.assertIsNone(get_cached_payload(self.test_puzzle_2.pk))
+        self.assertNotIn(self.test_puzzle_2.pk, released_puzzles)
+
     def test_anonymous_user_requests_are_throttled_correctly(self):
         id_1 = self.test_puzzle_1.pk
         id_2 = self.test_puzzle_2.pk
@@ -592,3 +934,453 @@ class TestGetUnseenPuzzleView(APITestCase):
         self.assertEqual(response.status_code, 429)
 
 
+
+
+class TestAutofillGridView(APITestCase):
+
+    ROOT_URL = '/api/crossword_builder/'
+
+    def tearDown(self):
+        self.client.logout()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ADMIN_USERNAME = 'test_admin'
+        cls.ADMIN_PASSWORD = 'top_secret'
+        cls.STD_USER = 'joe_soap'
+        cls.STD_USER_PASSWORD = 'monkey123'
+        cls.admin_user = User.objects.create_superuser(
+            username=cls.ADMIN_USERNAME,
+            password=cls.ADMIN_PASSWORD,
+        )
+        cls.standard_user = User.objects.create_user(
+            username=cls.STD_USER,
+            password=cls.STD_USER_PASSWORD
+        )
+        # A 3x3 word square : cat/ore/wed across, cow/are/ted down
+        for frequency, string in enumerate(
+                ['cat', 'ore', 'wed', 'cow', 'are', 'ted', 'cab', 'oaf']):
+            DictionaryWord.objects.create(
+                string=string, length=3, frequency=frequency)
+
+    def get_events(self, cells, width=3, height=3):
+        response = self.client.post(
+            f'{self.ROOT_URL}autofill/',
+            {'cells': cells, 'width': width, 'height': height},
+        )
+        self.assertEqual(response.status_code, 200)
+        content = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_authenticated_standard_user_cannot_autofill(self):
+        self.client.login(username=self.STD_USER, password=self.STD_USER_PASSWORD)
+        response = self.client.post(
+            f'{self.ROOT_URL}autofill/',
+            {'cells': '#########', 'width': 3, 'height': 3},
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_autofill_not_run_with_non_matching_cell_string_length(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        response = self.client.post(
+            f'{self.ROOT_URL}autofill/',
+            {'cells': '####', 'width': 3, 'height': 3},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_autofill_not_run_with_non_finite_time_budget(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        for time_budget in ['nan', 'inf', '-inf']:
+            response = self.client.post(
+                f'{self.ROOT_URL}autofill/',
+                {'cells': '#########', 'width': 3, 'height': 3,
+                 'time_budget': time_budget},
+            )
+            self.assertEqual(response.status_code, 400)
+
+    def test_empty_grid_is_filled_completely(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        events = self.get_events('#########')
+        final = events[-1]
+        self.assertEqual(final['status'], 'complete')
+        self.assertEqual(final['filled'], 6)
+        self.assertIn(final['cells'], ['catorewed', 'cowareted'])
+        self.assertTrue(all(e['status'] == 'partial' for e in events[:-1]))
+
+    def test_filled_letters_are_kept(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        events = self.get_events('c##o#####')
+        self.assertEqual(events[-1]['status'], 'complete')
+        self.assertEqual(events[-1]['cells'], 'catorewed')
+
+    def test_unfillable_slot_is_reported(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        events = self.get_events('q##------')
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['status'], 'exhausted')
+        self.assertEqual(events[0]['dead_slots'][0]['start_col'], 0)
+
+
+class TestCheckFillabilityView(APITestCase):
+
+    ROOT_URL = '/api/crossword_builder/'
+
+    def tearDown(self):
+        self.client.logout()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ADMIN_USERNAME = 'test_admin'
+        cls.ADMIN_PASSWORD = 'top_secret'
+        cls.admin_user = User.objects.create_superuser(
+            username=cls.ADMIN_USERNAME,
+            password=cls.ADMIN_PASSWORD,
+        )
+        cls.standard_user = User.objects.create_user(
+            username='joe_soap',
+            password='monkey123'
+        )
+        # A 3x3 word square : cat/ore/wed across, cow/are/ted down
+        for frequency, string in enumerate(
+                ['cat', 'ore', 'wed', 'cow', 'are', 'ted', 'cab', 'oaf']):
+            DictionaryWord.objects.create(
+                string=string, length=3, frequency=frequency)
+
+    def check(self, cells, width=3, height=3):
+        return self.client.post(
+            f'{self.ROOT_URL}check_fillability/',
+            {'cells': cells, 'width': width, 'height': height},
+        )
+
+    def test_standard_user_cannot_check_fillability(self):
+        self.client.login(username='joe_soap', password='monkey123')
+        self.assertEqual(self.check('#########').status_code, 403)
+
+    def test_check_not_run_with_non_matching_cell_string_length(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        self.assertEqual(self.check('####').status_code, 400)
+
+    def test_crossings_narrow_the_candidates(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        response = self.check('c########')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data['fillable'])
+        self.assertEqual(data['dead_slots'], [])
+        first_across = data['slots'][0]
+        self.assertEqual(first_across['pattern'], 'c__')
+        # cat, cow and cab match, but the down slots rule out cab
+        self.assertEqual(first_across['matches'], 3)
+        self.assertEqual(first_across['candidates'], 2)
+
+    def test_dead_slots_are_reported(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        data = self.check('q##------').json()
+        self.assertFalse(data['fillable'])
+        self.assertEqual(data['dead_slots'], [0])
+        self.assertEqual(data['slots'][0]['matches'], 0)
+
+    def test_slot_emptied_by_its_crossings_is_dead(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        # ore and oaf match the first row, but no word starts with e or f
+        # to cross them in the last column
+        data = self.check('o########').json()
+        self.assertFalse(data['fillable'])
+        self.assertIn(0, data['dead_slots'])
+        self.assertEqual(data['slots'][0]['matches'], 2)
+        self.assertEqual(data['slots'][0]['candidates'], 0)
+
+
+class TestBatchMatchingWordsView(APITestCase):
+
+    ROOT_URL = '/api/crossword_builder/'
+
+    def tearDown(self):
+        self.client.logout()
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ADMIN_USERNAME = 'test_admin'
+        cls.ADMIN_PASSWORD = 'top_secret'
+        cls.STD_USER = 'joe_soap'
+        cls.STD_USER_PASSWORD = 'monkey123'
+        cls.admin_user = User.objects.create_superuser(
+            username=cls.ADMIN_USERNAME,
+            password=cls.ADMIN_PASSWORD,
+        )
+        cls.standard_user = User.objects.create_user(
+            username=cls.STD_USER,
+            password=cls.STD_USER_PASSWORD
+        )
+        for frequency, string in enumerate(['cat', 'cot', 'cut', 'ore']):
+            DictionaryWord.objects.create(
+                string=string, length=3, frequency=frequency)
+
+    def test_authenticated_standard_user_cannot_request(self):
+        self.client.login(username=self.STD_USER, password=self.STD_USER_PASSWORD)
+        response = self.client.post(
+            f'{self.ROOT_URL}batch_query/', {'patterns': '["c_t"]'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_patterns_return_counts_and_top_candidates(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        response = self.client.post(
+            f'{self.ROOT_URL}batch_query/',
+            {'patterns': '["c_t", "__e", "zzz"]', 'limit': 2},
+        )
+        results = json.loads(response.content)['results']
+        self.assertEqual(results[0]['count'], 3)
+        self.assertEqual(results[0]['candidates'], ['cut', 'cot'])
+        self.assertEqual(results[1]['candidates'], ['ore'])
+        self.assertEqual(results[2]['count'], 0)
+
+    def test_grid_returns_a_result_per_slot(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        response = self.client.post(
+            f'{self.ROOT_URL}batch_query/',
+            {'cells': 'c#t-#--#-', 'width': 3, 'height': 3},
+        )
+        results = json.loads(response.content)['results']
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]['orientation'], 'AC')
+        self.assertEqual(results[0]['pattern'], 'c_t')
+        self.assertEqual(results[0]['count'], 3)
+        self.assertEqual(results[1]['orientation'], 'DN')
+        self.assertEqual(results[1]['pattern'], '___')
+        self.assertEqual(results[1]['count'], 4)
+
+    def test_word_index_is_rebuilt_once_stale(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        self.addCleanup(invalidate_word_index)
+
+        def count():
+            response = self.client.post(
+                f'{self.ROOT_URL}batch_query/', {'patterns': '["d_g"]'})
+            return json.loads(response.content)['results'][0]['count']
+
+        self.assertEqual(count(), 0)
+        # bulk_create sends no signals, like a change made by another process
+        DictionaryWord.objects.bulk_create(
+            [DictionaryWord(string='dog', length=3, frequency=9)])
+        self.assertEqual(count(), 0)
+        with override_settings(WORD_INDEX_TTL=0):
+            self.assertEqual(count(), 1)
+
+    def test_malformed_requests_are_rejected(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        url = f'{self.ROOT_URL}batch_query/'
+        for data in [{'patterns': 'not json'},
+                     {'patterns': [1, 2]},
+                     {'patterns': {'c_t': 1}},
+                     {'patterns': ['c_t'], 'limit': None},
+                     {'patterns': ['c_t'] * 501},
+                     {'width': 3, 'height': 3},
+                     {'cells': '#########'}]:
+            response = self.client.post(url, data, format='json')
+            self.assertEqual(response.status_code, 400, data)
+
+
+class TestGetCrosswordLeaderboardView(APITestCase):
+
+    ROOT_URL = '/api/crossword_builder/'
+
+    def tearDown(self):
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(
+            username='test_admin',
+            password='top_secret',
+        )
+        cls.puzzles = [
+            CrosswordPuzzle.objects.create(
+                grid=Grid.objects.create(
+                    creator=cls.admin_user, width=2, height=2, cells='####'),
+                creator=cls.admin_user,
+                released=True,
+            )
+            for _ in range(2)
+        ]
+        now = timezone.now()
+        cls.instances = {}
+        for minutes, puzzle in [(1, cls.puzzles[1]), (2, cls.puzzles[0]),
+                                (3, cls.puzzles[0]), (4, cls.puzzles[0])]:
+            cls.instances[minutes] = CrosswordInstance.objects.create(
+                crossword_puzzle=puzzle,
+                owner=PlayerProfile.objects.create(nickname=f'player_{minutes}'),
+                started_on=now - timedelta(minutes=minutes),
+                completed_at=now,
+                percent_complete=100,
+                percent_correct=100,
+                verified=True,
+            )
+
+    def get_leaderboard(self, minutes, query=''):
+        response = self.client.get(
+            f'{self.ROOT_URL}get_crossword_leaderboard/'
+            f'{self.instances[minutes].id}/{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_ranking_is_scoped_to_the_puzzle(self):
+        data = self.get_leaderboard(3)
+        self.assertEqual(data['ranking'], 1)
+        self.assertEqual([i['id'] for i in data['top_n']],
+                         [self.instances[m].id for m in (2, 3, 4)])
+        self.assertEqual(data['above'][0]['id'], self.instances[2].id)
+        self.assertEqual(data['below'][0]['id'], self.instances[4].id)
+
+    def test_cached_top_n_is_refreshed_by_a_new_instance(self):
+        self.get_leaderboard(3)
+        now = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            fastest = CrosswordInstance.objects.create(
+                crossword_puzzle=self.puzzles[0],
+                owner=PlayerProfile.objects.create(nickname='speedy'),
+                started_on=now - timedelta(seconds=30),
+                completed_at=now,
+                percent_complete=100,
+                percent_correct=100,
+                verified=True,
+            )
+        data = self.get_leaderboard(3, '?top_n=1')
+        self.assertEqual(data['ranking'], 2)
+        self.assertEqual([i['id'] for i in data['top_n']], [fastest.id])
+
+    def test_unverified_instance_does_not_rank(self):
+        now = timezone.now()
+        CrosswordInstance.objects.create(
+            crossword_puzzle=self.puzzles[0],
+            owner=PlayerProfile.objects.create(nickname='claimant'),
+            started_on=now - timedelta(seconds=1),
+            completed_at=now,
+            percent_complete=100,
+            percent_correct=100,
+        )
+        data = self.get_leaderboard(2)
+        self.assertEqual(data['ranking'], 0)
+        self.assertEqual([i['id'] for i in data['top_n']],
+                         [self.instances[m].id for m in (2, 3, 4)])
+        self.assertEqual(data['above'], [])
+
+    def test_unknown_instance_returns_404(self):
+        response = self.client.get(
+            f'{self.ROOT_URL}get_crossword_leaderboard/99999/')
+        self.assertEqual(response.status_code, 404)
+
+
+class TestCreateCrosswordInstanceView(APITestCase):
+
+    ROOT_URL = '/api/crossword_builder/'
+
+    def tearDown(self):
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(
+            username='test_admin',
+            password='top_secret',
+        )
+        cls.puzzle = CrosswordPuzzle.objects.create(
+            grid=Grid.objects.create(
+                creator=cls.admin_user, width=2, height=2, cells='####'),
+            creator=cls.admin_user,
+            released=True,
+        )
+        CrosswordPuzzle.objects.filter(id=cls.puzzle.id).update(
+            created_on=timezone.now() - timedelta(days=1))
+        cls.profile = PlayerProfile.objects.create(nickname='joe')
+        for orientation, number, solution, row, col in [
+                ('AC', 1, 'ab', 0, 0), ('AC', 2, 'cd', 1, 0),
+                ('DN', 1, 'ac', 0, 0), ('DN', 2, 'bd', 0, 1)]:
+            CrosswordClue.objects.create(
+                puzzle=cls.puzzle, orientation=orientation,
+                clue_number=number, solution=solution,
+                start_row=row, start_col=col)
+        now = timezone.now()
+        cls.request_data = {
+            'crossword_puzzle': cls.puzzle.id,
+            'started_on': (now - timedelta(minutes=5)).isoformat(),
+            'completed_at': now.isoformat(),
+            'percent_complete': 100,
+            'percent_correct': 100,
+        }
+
+    def test_instance_is_created_for_the_cookie_profile(self):
+        self.client.cookies[settings.PLAYER_PROFILE_COOKIE] = self.profile.uuid
+        response = self.client.post(
+            f'{self.ROOT_URL}create_crossword_instance/', self.request_data)
+        self.assertEqual(response.status_code, 201)
+        instance = CrosswordInstance.objects.get(id=response.data['id'])
+        self.assertEqual(instance.owner, self.profile)
+
+    def test_instance_is_not_created_without_a_profile_cookie(self):
+        response = self.client.post(
+            f'{self.ROOT_URL}create_crossword_instance/', self.request_data)
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(CrosswordInstance.objects.exists())
+
+    def submit_cells(self, cells):
+        self.client.cookies[settings.PLAYER_PROFILE_COOKIE] = self.profile.uuid
+        data = {key: value for key, value in self.request_data.items()
+                if not key.startswith('percent')}
+        data['cells'] = cells
+        return self.client.post(
+            f'{self.ROOT_URL}create_crossword_instance/', data)
+
+    def test_percentages_are_worked_out_from_submitted_cells(self):
+        response = self.submit_cells('abCx')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['percent_complete'], 100)
+        self.assertEqual(response.data['percent_correct'], 75)
+        self.assertTrue(response.data['verified'])
+        self.assertNotIn('cells', response.data)
+
+        response = self.submit_cells('ab##')
+        self.assertEqual(response.data['percent_complete'], 50)
+        self.assertEqual(response.data['percent_correct'], 50)
+
+    def test_client_percentages_are_not_verified(self):
+        self.client.cookies[settings.PLAYER_PROFILE_COOKIE] = self.profile.uuid
+        response = self.client.post(
+            f'{self.ROOT_URL}create_crossword_instance/', self.request_data)
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.data['verified'])
+
+    def test_impossible_times_are_rejected(self):
+        self.client.cookies[settings.PLAYER_PROFILE_COOKIE] = self.profile.uuid
+        now = timezone.now()
+        for started_on, completed_at in [
+                (now, now - timedelta(minutes=1)),
+                (now, now + timedelta(hours=1)),
+                (now - timedelta(days=2), now)]:
+            data = dict(self.request_data,
+                        started_on=started_on.isoformat(),
+                        completed_at=completed_at.isoformat())
+            response = self.client.post(
+                f'{self.ROOT_URL}create_crossword_instance/', data)
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(CrosswordInstance.objects.exists())
+
+    def test_cells_of_the_wrong_size_are_rejected(self):
+        response = self.submit_cells('abc')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('cells', response.data)
+
+    def test_solution_is_cached_until_a_clue_changes(self):
+        self.submit_cells('abcd')
+        with self.assertNumQueries(0):
+            get_solution_map(self.puzzle)
+        with self.captureOnCommitCallbacks(execute=True):
+            for orientation, number, solution in [('AC', 2, 'cx'),
+                                                  ('DN', 2, 'bx')]:
+                clue = CrosswordClue.objects.get(
+                    orientation=orientation, clue_number=number)
+                clue.solution = solution
+                clue.save()
+        self.assertEqual(get_solution_map(self.puzzle), 'abcx')
@@ -4,7 +4,16 @@ from django.urls import path
 urlpatterns = [
     path('puzzles/', views.PuzzleList.as_view()),
     path('query/<str:query>/', views.GetMatchingWord.as_view()),
+    path('batch_query/', views.BatchMatchingWords.as_view(),
+         name='batch_query'),
     path('get_definition/<str:query>/', views.GetDefinition.as_view()),
+    path('batch_definitions/', views.BatchDefinitions.as_view(),
+         name='batch_definitions'),
+    path('autofill/', views.AutofillGrid.as_view(), name='autofill'),
+    path('check_fillability/', views.CheckFillability.as_view(),
+         name='check_fillability'),
+    path('grid_templates/', views.GetGridTemplates.as_view(),
+         name='grid_templates'),
     path('save_puzzle/', views.SavePuzzle.as_view(), name='save_puzzle'),
     path('get_puzzle/<int:puzzle_id>/',
          views.GetPuzzle.as_view(),
@@ -19,5 +28,8 @@ urlpatterns = [
          name='delete_puzzle'),
     path('create_crossword_instance/',
          views.CreateCrosswordInstance.as_view(),
-         name='create_crossword_instance')
+         name='create_crossword_instance'),
+    path('get_crossword_leaderboard/<int:instance_id>/',
+         views.GetCrosswordLeaderboard.as_view(),
+         name='get_crossword_leaderboard'),
 ]
\ No newline at end of file
@@ -1,14 +1,175 @@
 import math
 
+from .models import CrosswordClue, Orientation
+
+OPEN = '#'
+CLOSED = '-'
+
 
 def get_cell_concentration(puzzle):
     """
-    Method calculates the percentage of cells in a puzzle that are open - i.e.
-    that can contain a letter.
+    Method returns the percentage of cells in a puzzle that are open - i.e.
+    that can contain a letter - as stored on its grid when it was saved.
+    """
+    return puzzle.grid.cell_concentration
+
+
+def get_grid_metadata(cells, width, height):
+    """
+    Method works out the metadata stored with a grid from its cell string:
+    the percentage of cells that are open, its slots, each listing the
+    indices of the slots that cross it, a histogram of slot lengths, the
+    percentage of open cells checked by both an across and a down slot, and
+    whether its pattern of closed cells has 180 degree rotational or
+    left-right mirror symmetry. Returns a dict keyed by Grid field name.
+    """
+    slots = get_slots(cells, width, height)
+    slots_by_cell = {}
+    for index, slot in enumerate(slots):
+        for cell in slot['cells']:
+            slots_by_cell.setdefault(cell, []).append(index)
+    for index, slot in enumerate(slots):
+        slot['crossings'] = [other for cell in slot['cells']
+                             for other in slots_by_cell[cell]
+                             if other != index]
+
+    histogram = {}
+    for slot in slots:
+        histogram[str(slot['length'])] = \
+            histogram.get(str(slot['length']), 0) + 1
+
+    closed = [cell == CLOSED for cell in cells]
+    open_count = closed.count(False)
+    checked_count = sum(1 for indices in slots_by_cell.values()
+                        if len(indices) > 1)
+
+    def percentage(count, total):
+        return math.floor(count / total * 100) if total else 0
+
+    return {
+        'cell_concentration': percentage(open_count, len(cells)),
+        'slots': slots,
+        'slot_lengths': dict(sorted(histogram.items(),
+                                    key=lambda item: int(item[0]))),
+        'checked_percentage': percentage(checked_count, open_count),
+        'rotational_symmetry': closed == closed[::-1],
+        'mirror_symmetry': all(
+            closed[row * width:(row + 1) * width]
+            == closed[row * width:(row + 1) * width][::-1]
+            for row in range(height)),
+    }
+
+
+def get_slots(cells, width, height):
+    """
+    Method extracts the across and down slots from a grid's cell string, in
+    which '-' is a closed cell and any other character is an open cell. Only
+    runs of two or more open cells are slots. Each slot is returned as a dict
+    holding its orientation, start row and column, length and the indices of
+    the cells it occupies. Across slots come first, then down slots, each in
+    reading order.
     """
-    cells = puzzle.grid.cells
-    open_cell_count = 0
-    for cell in cells:
-        if cell == '#':
-            open_cell_count += 1
-    return math.floor(open_cell_count / len(cells) * 100)
\ No newline at end of file
+    slots = []
+    for row in range(height):
+        col = 0
+        while col < width:
+            start = col
+            while col < width and cells[row * width + col] != CLOSED:
+                col += 1
+            if col - start > 1:
+                slots.append(_make_slot(
+                    Orientation.ACROSS, row, start, col - start,
+                    [row * width + c for c in range(start, col)]))
+            col += 1
+    for col in range(width):
+        row = 0
+        while row < height:
+            start = row
+            while row < height and cells[row * width + col] != CLOSED:
+                row += 1
+            if row - start > 1:
+                slots.append(_make_slot(
+                    Orientation.DOWN, start, col, row - start,
+                    [r * width + col for r in range(start, row)]))
+            row += 1
+    return slots
+
+
+def _make_slot(orientation, start_row, start_col, length, cell_indices):
+    return {
+        'orientation': orientation.value,
+        'start_row': start_row,
+        'start_col': start_col,
+        'length': length,
+        'cells': cell_indices,
+    }
+
+
+def get_slot_pattern(cells, slot):
+    """
+    Method returns the query pattern for a slot, with a '_' wildcard for each
+    empty cell and the lower-cased letter for each filled one.
+    """
+    return ''.join(
+        '_' if cells[i] == OPEN else cells[i].lower() for i in slot['cells'])
+
+
+CLUE_FIELDS = ['clue', 'solution', 'word_lengths', 'start_row', 'start_col']
+
+
+def save_clues(puzzle, clues_data, creator):
+    """
+    Method brings the stored clues of a puzzle into line with clues_data, a
+    list of clue dicts as sent by the builder. Clues are matched with the
+    stored ones by (orientation, clue_number), and only the differences are
+    written, with one bulk statement each for the created, updated and
+    deleted clues. Should be called inside a transaction.
+
+    Returns a dict listing the (orientation, clue_number) keys of the clues
+    created, updated and deleted.
+    """
+    stored = {}
+    stale = []
+    for clue in CrosswordClue.objects.filter(puzzle=puzzle).order_by('id'):
+        key = (clue.orientation, clue.clue_number)
+        if key in stored:
+            stale.append(clue)
+        else:
+            stored[key] = clue
+
+    to_create = []
+    to_update = []
+    for item in clues_data:
+        key = (item['orientation'], item['clue_number'])
+        clue = stored.pop(key, None)
+        if clue is None:
+            to_create.append(CrosswordClue(
+                puzzle=puzzle,
+                creator=creator,
+                orientation=item['orientation'],
+                clue_number=item['clue_number'],
+                **{field: item[field] for field in CLUE_FIELDS},
+            ))
+        elif any(getattr(clue, field) != item[field] for field in CLUE_FIELDS):
+            for field in CLUE_FIELDS:
+                setattr(clue, field, item[field])
+            to_update.append(clue)
+    to_delete = stale + list(stored.values())
+
+    if to_delete:
+        CrosswordClue.objects.filter(
+            id__in=[clue.id for clue in to_delete]).delete()
+    if to_update:
+        CrosswordClue.objects.bulk_update(to_update, CLUE_FIELDS)
+    if to_create:
+        CrosswordClue.objects.bulk_create(to_create)
+
+    def keys(clues):
+        return [{'orientation': clue.orientation,
+                 'clue_number': clue.clue_number} for clue in clues]
+
+    return {
+        'created': keys(to_create),
+        'updated': keys(to_update),
+        'deleted': keys(to_delete),
+    }
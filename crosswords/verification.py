@@ -0,0 +1,78 @@
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import CrosswordClue, Orientation
+from .utils import CLOSED, OPEN
+
+# Characters the puzzle interface uses for a cell not yet filled
+EMPTY_CHARS = frozenset((OPEN, ' ', '_'))
+
+
+def _cache_key(puzzle_id):
+    return f'crossword_solution_{puzzle_id}'
+
+
+def build_solution_map(grid, clues):
+    """
+    Returns the solution of a grid as a cell string, with each clue's
+    solution laid onto the grid from its start cell. Closed cells are '-',
+    and open cells whose letter no clue gives are '#'.
+    """
+    cells = [CLOSED if cell == CLOSED else OPEN for cell in grid.cells]
+    for clue in clues:
+        if clue.start_row is None or clue.start_col is None:
+            continue
+        step = 1 if clue.orientation == Orientation.ACROSS else grid.width
+        index = clue.start_row * grid.width + clue.start_col
+        for letter in clue.solution:
+            if not 0 <= index < len(cells):
+                break
+            if cells[index] != CLOSED and letter != OPEN:
+                cells[index] = letter.lower()
+            index += step
+    return ''.join(cells)
+
+
+def get_solution_map(puzzle):
+    """
+    Returns the cached solution map of a puzzle, building it from its grid
+    and clues the first time it is needed.
+    """
+    key = _cache_key(puzzle.id)
+    solution = cache.get(key)
+    if solution is None:
+        clues = CrosswordClue.objects.filter(puzzle=puzzle).only(
+            'solution', 'orientation', 'start_row', 'start_col')
+        solution = build_solution_map(puzzle.grid, clues)
+        cache.set(key, solution, settings.PUZZLE_SOLUTION_CACHE_TIMEOUT)
+    return solution
+
+
+def invalidate_solution_map(puzzle_id):
+    cache.delete(_cache_key(puzzle_id))
+
+
+def score_cells(solution, cells):
+    """
+    Compares the cells a player submitted with a solution map, in one pass,
+    and returns the percentages of the open cells they filled and filled
+    correctly, rounded down as the puzzle interface does. Raises ValueError
+    if the cells do not fit the grid.
+    """
+    if len(cells) != len(solution):
+        raise ValueError('The cells do not match the size of the grid')
+    open_count = filled = correct = 0
+    for expected, submitted in zip(solution, cells):
+        if expected == CLOSED:
+            continue
+        open_count += 1
+        if submitted not in EMPTY_CHARS:
+            filled += 1
+            if submitted.lower() == expected:
+                correct += 1
+    if not open_count:
+        return 0, 0
+    return (math.floor(filled / open_count * 100),
+            math.floor(correct / open_count * 100))
@@ -1,20 +1,30 @@
 from django.shortcuts import get_object_or_404
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions, generics
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from .models import DictionaryWord, DictionaryDefinition, Grid
-from .models import CrosswordPuzzle, CrosswordClue, PuzzleType
-from player_profile.models import PlayerProfile
-from usage_stats.models import CrosswordPuzzleRequest
+from .models import CrosswordPuzzle, CrosswordInstance, GridTemplate, \
+    PuzzleType
+from player_profile.utils import get_request_profile
+from usage_stats.event_sink import record_crossword_request
 from .serializers import CrosswordPuzzleSerializer, \
-                         CrosswordClueSerializer, CrosswordInstanceSerializer
+                         CrosswordInstanceSerializer
 from fruzzled_backend.permissions import HasPlayerProfileCookie
-from .utils import get_cell_concentration
+from fruzzled_backend.leaderboards import get_leaderboard, get_int_param
+from .utils import get_slots, get_slot_pattern, save_clues
+from .word_index import get_word_index, count_bits
+from .autofill import Autofill, SlotProblem
+from .grid_templates import find_templates
+from .puzzle_pool import released_puzzles, choose_unseen_puzzle_id
+from .payloads import get_puzzle_data, get_cached_payload, cache_payload
+from .leaderboard import get_top_n, MAX_TOP_N
 from django_filters.rest_framework import DjangoFilterBackend
-from random import choice
 import json
+import math
 
 
 class PuzzleList(generics.ListCreateAPIView):
@@ -25,12 +35,21 @@ class PuzzleList(generics.ListCreateAPIView):
 
     Authenticated superusers only
     """
-    queryset = CrosswordPuzzle.objects.all().order_by('-created_on')
+    queryset = CrosswordPuzzle.objects.select_related('grid') \
+        .order_by('-created_on')
     permission_classes = [permissions.IsAdminUser]
     serializer_class = CrosswordPuzzleSerializer
 
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['complete', 'reviewed', 'released',]
+    filterset_fields = {
+        'complete': ['exact'],
+        'reviewed': ['exact'],
+        'released': ['exact'],
+        'grid__width': ['exact'],
+        'grid__height': ['exact'],
+        'grid__cell_concentration': ['gte', 'lte'],
+        'grid__rotational_symmetry': ['exact'],
+    }
 
     def list(self, request, *args, **kwargs):
         response = super().list(request, args, kwargs)
@@ -50,7 +69,10 @@ class GetMatchingWord(APIView):
     Returns a response with a list of word matching the query string in length.
     The request supplies a query string with a mix of letters and '_' wildcard
     characters, and the response list consists of all DictionaryWord instances
-    that match that definition.
+    that match that definition, most frequent first.
+
+    Matching is done against the in-memory positional word index, so no
+    database query is made once the index has been built.
 
     Authenticated superusers only
     """
@@ -58,31 +80,218 @@ class GetMatchingWord(APIView):
     permission_classes = [permissions.IsAdminUser]
 
     def get(self, request, query):
-        query = query.lower()
-        known_chars = []
-        for i, char in enumerate(query):
-            if char != '_':
-                known_chars.append((i, char))
-        length = len(query)
-        result_list = []
-        full_list = DictionaryWord.objects.filter(length=length) \
-            .order_by('frequency')
-        for candidate in full_list:
-            match = True
-            for tup in known_chars:
-                index = tup[0]
-                char = tup[1]
-                if candidate.string[index] != char:
-                    match = False
-                    break
-            if match:
-                result_list.append(candidate)
-        result_list.sort(key=DictionaryWord.get_frequency, reverse=True)
-        words = [d_word.string for d_word in result_list]
-
+        words = get_word_index().match(query)
         return JsonResponse({'results': words})
 
 
+class BatchMatchingWords(APIView):
+    """
+    Returns the number of matching words, and the most frequent matches, for
+    many query patterns at once. The request supplies either a list of
+    patterns (as a list, or a JSON-encoded string), or a width, height and
+    cell string, in which case a pattern is taken from every across and down
+    slot of the grid and the slot's position is included in its result.
+
+    The number of candidates returned per pattern is set by 'limit'. No
+    more than max_patterns patterns, or a grid of more than max_cells
+    cells, are looked up in one request.
+
+    Authenticated superusers only
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+    default_limit = 10
+    max_limit = 100
+    max_patterns = 500
+    max_cells = 625
+
+    def post(self, request):
+        try:
+            limit = int(request.data.get('limit', self.default_limit))
+        except (TypeError, ValueError):
+            return JsonResponse(
+                {'message': 'limit should be an integer'},
+                status=400
+            )
+        limit = min(max(limit, 0), self.max_limit)
+
+        if 'patterns' in request.data:
+            patterns = request.data['patterns']
+            if isinstance(patterns, str):
+                try:
+                    patterns = json.loads(patterns)
+                except ValueError:
+                    patterns = None
+            if not isinstance(patterns, list) \
+                    or not all(isinstance(pattern, str)
+                               for pattern in patterns):
+                return JsonResponse(
+                    {'message': 'patterns should be a list of strings'},
+                    status=400
+                )
+            if len(patterns) > self.max_patterns:
+                return JsonResponse(
+                    {'message': (f'no more than {self.max_patterns} '
+                                 'patterns at a time')},
+                    status=400
+                )
+            results = [{'pattern': pattern} for pattern in patterns]
+        else:
+            try:
+                width = int(request.data['width'])
+                height = int(request.data['height'])
+                cells = request.data['cells']
+            except (KeyError, TypeError, ValueError):
+                return JsonResponse(
+                    {'message': ('patterns, or an integer width and height '
+                                 'and cells, should be given')},
+                    status=400
+                )
+            if not isinstance(cells, str) or len(cells) > self.max_cells:
+                return JsonResponse(
+                    {'message': (f'cells should be a string of no more than '
+                                 f'{self.max_cells} characters')},
+                    status=400
+                )
+            if width * height != len(cells):
+                return JsonResponse(
+                    {'message': 'len(cells) does not match width * height'},
+                    status=400
+                )
+            results = []
+            for slot in get_slots(cells, width, height):
+                slot['pattern'] = get_slot_pattern(cells, slot)
+                del slot['cells']
+                results.append(slot)
+
+        # Identical patterns (common among the short slots of a grid) are
+        # only looked up once.
+        index = get_word_index()
+        matches = {}
+        for result in results:
+            pattern = result['pattern']
+            if pattern not in matches:
+                bits = index.pattern_bits(pattern)
+                matches[pattern] = (
+                    count_bits(bits),
+                    index.words_for(len(pattern), bits, limit),
+                )
+            result['count'], result['candidates'] = matches[pattern]
+
+        return JsonResponse({'results': results})
+
+
+class AutofillGrid(APIView):
+    """
+    Fills the open cells of a grid with dictionary words. The request should
+    contain a width, height and cell string, in which '-' is a closed cell,
+    '#' an empty open cell and a letter a filled one, and optionally a
+    time_budget in seconds.
+
+    The response is streamed as newline-delimited JSON: a 'partial' event
+    each time the search fills more slots than it has before, then a single
+    final event whose status is 'complete', 'timeout' or 'exhausted'.
+
+    Authenticated superusers only
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        try:
+            width = int(request.data['width'])
+            height = int(request.data['height'])
+            time_budget = float(request.data.get(
+                'time_budget', settings.AUTOFILL_TIME_BUDGET))
+        except ValueError:
+            return JsonResponse(
+                {'message': 'width, height and time_budget should be numbers'},
+                status=400
+            )
+        if not math.isfinite(time_budget):
+            return JsonResponse(
+                {'message': 'time_budget should be a finite number'},
+                status=400
+            )
+
+        cells = request.data['cells']
+
+        if width * height != len(cells):
+            return JsonResponse(
+                {'message': 'len(cells) does not match width * height'},
+                status=400
+            )
+
+        time_budget = min(max(time_budget, 0), settings.AUTOFILL_MAX_TIME_BUDGET)
+        problem = SlotProblem(cells, width, height, get_word_index())
+        events = Autofill(problem, time_budget).run()
+        return StreamingHttpResponse(
+            (json.dumps(event) + '\n' for event in events),
+            content_type='application/x-ndjson',
+        )
+
+
+class CheckFillability(APIView):
+    """
+    Checks whether the open slots of a partially filled grid can all be
+    filled from the dictionary. The request should contain a width, height
+    and cell string, as for AutofillGrid.
+
+    Each open slot's words are narrowed by arc consistency with the slots
+    crossing it, and the response lists every slot with its pattern, the
+    number of words matching the pattern alone ('matches') and the number
+    left once the crossings are taken into account ('candidates'), along
+    with the indices of the dead slots, those left with no candidates.
+    A grid with no dead slots may still not be fillable as a whole, but a
+    grid with one certainly is not.
+
+    Authenticated superusers only
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        try:
+            width = int(request.data['width'])
+            height = int(request.data['height'])
+        except ValueError:
+            return JsonResponse(
+                {'message': 'width and height should be integers'},
+                status=400
+            )
+
+        cells = request.data['cells']
+
+        if width * height != len(cells):
+            return JsonResponse(
+                {'message': 'len(cells) does not match width * height'},
+                status=400
+            )
+
+        problem = SlotProblem(cells, width, height, get_word_index())
+        domains = problem.arc_consistent()
+        open_slots = set(problem.open_slots)
+        slots = []
+        for i, slot in enumerate(problem.slots):
+            slots.append({
+                'orientation': slot['orientation'],
+                'start_row': slot['start_row'],
+                'start_col': slot['start_col'],
+                'length': slot['length'],
+                'pattern': problem.patterns[i],
+                'fixed': i not in open_slots,
+                'matches': problem.candidate_count(i),
+                'candidates': problem.candidate_count(i, domains),
+            })
+        dead_slots = problem.dead_slots(domains)
+
+        return JsonResponse({
+            'fillable': not dead_slots,
+            'slots': slots,
+            'dead_slots': dead_slots,
+        })
+
+
 class GetDefinition(APIView):
     """
     Takes a query string representing a word, and returns a JsonResponse
@@ -94,15 +303,67 @@ class GetDefinition(APIView):
     permission_classes = [permissions.IsAdminUser]
 
     def get(self, request, query):
-        words = DictionaryWord.objects.filter(string=query.lower())
-        def_list = []
-        for word in words:
-            definitions = DictionaryDefinition.objects.filter(word=word)
-            for defn in definitions:
-                def_list.append(defn.definition)
+        def_list = list(
+            DictionaryDefinition.objects
+            .filter(word__string=query.lower())
+            .order_by('word_id', 'id')
+            .values_list('definition', flat=True)
+        )
         return JsonResponse({'results': def_list})
 
 
+class BatchDefinitions(APIView):
+    """
+    Returns the definitions of many words at once, grouped by word in the
+    order the words were given. The request supplies a list of words (as a
+    list, or a JSON-encoded string). Words not in the dictionary are
+    returned with an empty list. The lookup takes two queries however many
+    words are asked for: one for the words and one for their definitions.
+
+    Authenticated superusers only
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+    max_words = 500
+
+    def post(self, request):
+        words = request.data.get('words', [])
+        if isinstance(words, str):
+            try:
+                words = json.loads(words)
+            except ValueError:
+                words = None
+        if not isinstance(words, list) \
+                or not all(isinstance(word, str) for word in words):
+            return JsonResponse(
+                {'message': 'words should be a list of strings'},
+                status=400
+            )
+        if len(words) > self.max_words:
+            return JsonResponse(
+                {'message': f'no more than {self.max_words} words at a time'},
+                status=400
+            )
+
+        strings = list(dict.fromkeys(word.lower() for word in words))
+        definitions = {string: [] for string in strings}
+        entries = DictionaryWord.objects.filter(string__in=strings) \
+            .order_by('id').prefetch_related(Prefetch(
+                'definitions',
+                queryset=DictionaryDefinition.objects.order_by('id')
+                .only('word_id', 'definition'),
+            )).only('string')
+        for entry in entries:
+            definitions[entry.string].extend(
+                definition.definition
+                for definition in entry.definitions.all())
+
+        return JsonResponse({'results': [
+            {'word': string, 'definitions': definitions[string]}
+            for string in strings
+        ]})
+
+
 class DeletePuzzle(APIView):
 
     """
@@ -128,13 +389,15 @@ class DeletePuzzle(APIView):
 
 class SavePuzzle(APIView):
     """
-    Saves an existing puzzle. This operation is destructive - any previous 
-    clues associated with this puzzle are deleted before the clues included 
-    in the POST request are added. For an existing puzzle, the grid field can
-    be changed (cells can be opened/closed) but the original dimensions of 
-    the grid are preserved.
+    Saves an existing puzzle. The clues included in the POST request replace
+    any previous clues associated with this puzzle: clues are matched with
+    the stored ones by orientation and clue number, and only those that have
+    been added, changed or removed are written. For an existing puzzle, the
+    grid field can be changed (cells can be opened/closed) but the original
+    dimensions of the grid are preserved.
 
     The list of clues is included in the request as a JSON-encoded string.
+    The response lists the clues that were created, updated and deleted.
 
     The complete flag on the crossword will be set to False irrespective of the
     request value, if any cell is still blank or if any clue has a string
@@ -146,6 +409,7 @@ class SavePuzzle(APIView):
 
     permission_classes = [permissions.IsAdminUser]
 
+    @transaction.atomic
     def post(self, request, *args, **kwargs):
         allow_complete = True
         clues_data = json.loads(request.data['clues'])
@@ -158,9 +422,6 @@ class SavePuzzle(APIView):
             grid_data = request.data['grid']
             puzzle.grid.cells = grid_data
             puzzle.grid.save()
-
-            # Remove any clues previously associated with this puzzle.
-            CrosswordClue.objects.filter(puzzle=puzzle).delete()
         else:
 
             grid_data = request.data['grid']
@@ -177,25 +438,15 @@ class SavePuzzle(APIView):
             puzzle = CrosswordPuzzle.objects.create(
                 grid=grid,
                 creator=request.user,
-                commit=False,
             )
 
-        # In both cases, we need to create new clues from the api call data
+        # In both cases, bring the stored clues into line with the api call
+        # data
+        changed_clues = save_clues(puzzle, clues_data, request.user)
         for item in clues_data:
-            new_clue = CrosswordClue.objects.create(
-                puzzle=puzzle,
-                creator=request.user,
-                clue=item['clue'],
-                clue_number=item['clue_number'],
-                solution=item['solution'],
-                word_lengths=item['word_lengths'],
-                orientation=item['orientation'],
-                start_row=item['start_row'],
-                start_col=item['start_col'],
-            )
-            if (len(new_clue.clue) == 0 
-                or new_clue.clue.lower() == 'no clue yet'
-                    or '#' in new_clue.solution):
+            if (len(item['clue']) == 0
+                or item['clue'].lower() == 'no clue yet'
+                    or '#' in item['solution']):
                 allow_complete = False
 
         # Save the crossword puzzle
@@ -208,7 +459,10 @@ class SavePuzzle(APIView):
             puzzle.released = request.POST['released'] == 'true'
         puzzle.save()
 
-        return JsonResponse({'puzzle_id': puzzle.id})
+        return JsonResponse({
+            'puzzle_id': puzzle.id,
+            'changed_clues': changed_clues,
+        })
 
 
 class CreateNewPuzzle(APIView):
@@ -216,7 +470,8 @@ class CreateNewPuzzle(APIView):
     """
     Creates a new Crossword or Crannagram puzzle (same model). The request
     should contain a width, height, cell string and the puzzle type, 
-    CROSSWORD or CRANNAGRAM.
+    CROSSWORD or CRANNAGRAM. A template_id may be sent in place of the
+    width, height and cells, to start from a stored GridTemplate.
 
     The view performs a validation check to ensure that the width multiplied by
     the height equals the length of the cell string, and also checks that
@@ -231,16 +486,28 @@ class CreateNewPuzzle(APIView):
         else:
             puzzle_type = PuzzleType.CRANAGRAM
 
-        try:
-            width = int(request.data['width'])
-            height = int(request.data['height'])
-        except ValueError:
-            return JsonResponse(
-                {'message': 'width and height should be integers'},
-                status=400
-            )
-        
-        cells = request.data['cells']
+        if request.data.get('template_id'):
+            try:
+                template_id = int(request.data['template_id'])
+            except ValueError:
+                return JsonResponse(
+                    {'message': 'template_id should be an integer'},
+                    status=400
+                )
+            template = get_object_or_404(GridTemplate, pk=template_id)
+            width = template.width
+            height = template.height
+            cells = template.cells
+        else:
+            try:
+                width = int(request.data['width'])
+                height = int(request.data['height'])
+            except ValueError:
+                return JsonResponse(
+                    {'message': 'width and height should be integers'},
+                    status=400
+                )
+            cells = request.data['cells']
 
         if width * height != len(cells):
             return JsonResponse(
@@ -263,91 +530,107 @@ class CreateNewPuzzle(APIView):
         return JsonResponse({'new_puzzle_id': puzzle.id})
 
 
+class GetGridTemplates(APIView):
+    """
+    Returns stored grid templates of the width and height given in the
+    query string, optionally with no slot shorter than min_slot_length, at
+    most max_words words, and mirror symmetry or not. Templates are looked
+    up by an index on these columns, and never generated here: if none are
+    stored the list is empty, and the library is filled by the
+    generate_grid_templates command.
+
+    Authenticated superusers only
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        try:
+            width = int(request.GET['width'])
+            height = int(request.GET['height'])
+            min_slot_length = int(request.GET.get('min_slot_length', 3))
+            max_words = request.GET.get('max_words')
+            max_words = int(max_words) if max_words else None
+        except (KeyError, ValueError):
+            return JsonResponse(
+                {'message': ('width and height are required, and they, '
+                             'min_slot_length and max_words should be '
+                             'integers')},
+                status=400
+            )
+        if not (2 <= width <= 25 and 2 <= height <= 25):
+            return JsonResponse(
+                {'message': 'width and height should be from 2 to 25'},
+                status=400
+            )
+        mirror = request.GET.get('mirror_symmetry')
+        mirror = None if mirror is None else mirror == 'true'
+
+        templates = find_templates(width, height, min_slot_length,
+                                   max_words, mirror)
+        fields = ['id', 'width', 'height', 'cells', 'word_count',
+                  'min_slot_length', 'cell_concentration',
+                  'rotational_symmetry', 'mirror_symmetry']
+        results = list(templates.values(*fields)[
+            :settings.GRID_TEMPLATE_MAX_RESULTS])
+        return JsonResponse({'templates': results})
+
+
 class GetPuzzle(APIView):
 
     permission_classes = [permissions.IsAdminUser]
 
     def get(self, request, puzzle_id):
         puzzle = get_object_or_404(CrosswordPuzzle, pk=puzzle_id)
-        cell_concentration = get_cell_concentration(puzzle)
-
-        # Retrieve the clues for this crossword, and count the
-        # number of them that have a non-empty clue string. Also count the
-        # number of them that have a complete solution
-        clues = CrosswordClue.objects.filter(puzzle=puzzle)
-        if not clues:
-            clue_count = 0
-            solution_count = 0
-        else:
-            clue_count = 0
-            solution_count = 0
-            for clue in clues:
-                if len(clue.clue) > 0:
-                    clue_count += 1
-                if '#' not in clue.solution:
-                    solution_count += 1
-        puzzle_serializer = CrosswordPuzzleSerializer(puzzle)
-        clue_serialzer = CrosswordClueSerializer(clues, many=True)
-        data = {
-            'puzzle': puzzle_serializer.data,
-            'clues': clue_serialzer.data,
-            'cell_concentration': cell_concentration,
-            'clues_present': clue_count,
-            'solutions_present': solution_count,
-            'total_clues': len(clues)
-        }
-        return Response({'puzzle': data})
+        return Response({'puzzle': get_puzzle_data(puzzle)})
 
 
 class GetUnseenPuzzle(APIView):
+    """
+    Returns a random released crossword that the player has not seen, as
+    listed in the comma-separated seen_crosswords query parameter. If every
+    released crossword has been seen, the least recently seen one is
+    returned.
+
+    The choice is made from an in-memory pool of released puzzle ids, and
+    the rendered response body for each puzzle is cached, so serving a
+    cached puzzle needs no database query, the request being logged in the
+    background.
+    """
 
     throttle_scope = 'get_unseen_puzzle'
 
     def get(self, request):
-        puzzles = CrosswordPuzzle.objects.filter(released=True)
-        if puzzles:
-            query = request.GET['seen_crosswords'] if request.GET else None
-            seen_crosswords = query.split(',') if query else []
-            choices = puzzles.exclude(id__in=seen_crosswords)
-
-            if choices:
-                crossword = choice(choices)
-            elif seen_crosswords:
-                crossword = puzzles.filter(id=seen_crosswords[0]).first()
-            else:
-                crossword = choice(puzzles)
-            
-            puzzle_serializer = CrosswordPuzzleSerializer(crossword)
-            clues = CrosswordClue.objects.filter(puzzle=crossword)
-            if not clues:
-                clue_count = 0
-                solution_count = 0
-            else:
-                clue_count = 0
-                solution_count = 0
-                for clue in clues:
-                    if len(clue.clue) > 0:
-                        clue_count += 1
-                    if '#' not in clue.solution:
-                        solution_count += 1
-            clue_serialzer = CrosswordClueSerializer(clues, many=True)
-
+        query = request.GET.get('seen_crosswords')
+        seen_crosswords = [int(id) for id in query.split(',')
+                           if id.isdigit()] if query else []
+
+        # The pool can briefly be out of date if another process has
+        # unreleased or deleted a puzzle, so reload it and choose again
+        # if the chosen puzzle is no longer available.
+        body = None
+        for _ in range(2):
+            puzzle_id = choose_unseen_puzzle_id(seen_crosswords)
+            if puzzle_id is None:
+                break
+            body = get_cached_payload(puzzle_id)
+            if body:
+                break
+            crossword = CrosswordPuzzle.objects.select_related('grid') \
+                .filter(id=puzzle_id, released=True).first()
+            if crossword:
+                body = cache_payload(crossword)
+                break
+            released_puzzles.invalidate()
+
+        if body:
             # Record the crossword puzzle request by the player
             profile_cookie = request.COOKIES.get(settings.PLAYER_PROFILE_COOKIE, None)
-            CrosswordPuzzleRequest.objects.create(
-                puzzle=crossword,
-                player_uuid = profile_cookie
+            record_crossword_request(
+                puzzle_id=puzzle_id,
+                player_uuid=profile_cookie
             )
-            
-            data = {
-                'puzzle': puzzle_serializer.data,
-                'clues': clue_serialzer.data,
-                'cell_concentration': get_cell_concentration(crossword),
-                'clues_present': clue_count,
-                'solutions_present': solution_count,
-                'total_clues': len(clues)
-            }
-            return Response({'puzzle': data})
+            return HttpResponse(body, content_type='application/json')
         else:
             return Response(
                 status=status.HTTP_404_NOT_FOUND,
@@ -357,14 +640,47 @@ class GetUnseenPuzzle(APIView):
 
 class CreateCrosswordInstance(generics.CreateAPIView):
     serializer_class = CrosswordInstanceSerializer
-    permissions_classes = [HasPlayerProfileCookie]
+    permission_classes = [HasPlayerProfileCookie]
     authentication_classes = []
 
     def perform_create(self, serializer):
-        request = self.request
-        profile_cookie = request.COOKIES.get(
-            settings.PLAYER_PROFILE_COOKIE, '')
-        profile = PlayerProfile.objects.filter(uuid=profile_cookie).first()
-        serializer.save(owner=profile)
+        serializer.save(owner=get_request_profile(self.request))
 
 
+class GetCrosswordLeaderboard(APIView):
+    """
+    Returns a crossword instance's position in the rankings for its puzzle,
+    the top n in the rankings, the instances either side of it, and the
+    instance itself. The 'top_n' and 'around' query parameters set the
+    number of leading and neighbouring instances returned.
+
+    Only verified instances, whose percentages the server worked out from
+    the submitted cells, are ranked. The top n are served from a per-puzzle
+    cache, and the ranking and neighbours are range queries on the
+    (crossword_puzzle, time_taken) index.
+    """
+
+    def get(self, request, instance_id):
+        instance = get_object_or_404(
+            CrosswordInstance.objects.select_related('owner'),
+            id=instance_id)
+        queryset = CrosswordInstance.objects.select_related('owner') \
+            .filter(crossword_puzzle=instance.crossword_puzzle_id,
+                    verified=True)
+        leaderboard = get_leaderboard(
+            queryset,
+            instance,
+            top_n=0,
+            around=get_int_param(request, 'around', 2, 25),
+        )
+        top_n = get_int_param(request, 'top_n', 5, MAX_TOP_N)
+        data = {
+            'crossword_instance': CrosswordInstanceSerializer(instance).data,
+            'ranking': leaderboard['ranking'],
+            'top_n': get_top_n(instance.crossword_puzzle_id, top_n),
+            'above': CrosswordInstanceSerializer(
+                leaderboard['above'], many=True).data,
+            'below': CrosswordInstanceSerializer(
+                leaderboard['below'], many=True).data,
+        }
+        return Response(data)
@@ -0,0 +1,150 @@
+import threading
+import time
+
+from django.conf import settings
+
+from .models import DictionaryWord
+
+WILDCARD = '_'
+
+
+class WordIndex:
+    """
+    An in-memory positional index over the DictionaryWord table.
+
+    Words are grouped by length, and within each length they are stored in
+    descending order of frequency. For every (length, position, letter)
+    combination the index holds a bitmap (a python int) in which bit i is set
+    if the i-th word of that length has that letter at that position. A
+    pattern such as '_a__e_' is answered by intersecting the bitmaps of its
+    known letters, and because bit order is frequency order, the matches come
+    out already sorted.
+    """
+
+    def __init__(self, rows):
+        """
+        Builds the index from an iterable of (string, length) tuples, which
+        must already be in descending order of frequency.
+        """
+        self.words = {}
+        self.bitmaps = {}
+        self.letters = {}
+        positions = {}
+        for string, length in rows:
+            string = string.lower()
+            words = self.words.setdefault(length, [])
+            word_index = len(words)
+            words.append(string)
+            for position, char in enumerate(string[:length]):
+                positions.setdefault((length, position, char), []) \
+                    .append(word_index)
+
+        # Build each bitmap in one pass from a bytearray, rather than by
+        # or-ing single bits into an ever-growing int.
+        for key, word_indices in positions.items():
+            buffer = bytearray(len(self.words[key[0]]) // 8 + 1)
+            for word_index in word_indices:
+                buffer[word_index >> 3] |= 1 << (word_index & 7)
+            self.bitmaps[key] = int.from_bytes(buffer, 'little')
+            self.letters.setdefault(key[:2], []).append(key[2])
+
+    def all_bits(self, length):
+        """ Returns a bitmap with a bit set for every word of this length """
+        return (1 << len(self.words.get(length, ()))) - 1
+
+    def letter_bits(self, length, position, letter):
+        """
+        Returns the bitmap of words of this length that have this letter at
+        this position.
+        """
+        return self.bitmaps.get((length, position, letter), 0)
+
+    def letters_at(self, length, position):
+        """
+        Returns the letters found at this position in words of this length
+        """
+        return self.letters.get((length, position), ())
+
+    def pattern_bits(self, pattern):
+        """
+        Returns the bitmap of words matching a pattern of letters and '_'
+        wildcards. Matching is case-insensitive.
+        """
+        length = len(pattern)
+        bits = self.all_bits(length)
+        for position, char in enumerate(pattern.lower()):
+            if not bits:
+                break
+            if char != WILDCARD:
+                bits &= self.letter_bits(length, position, char)
+        return bits
+
+    def words_for(self, length, bits, limit=None):
+        """
+        Returns the words of this length whose bits are set, in descending
+        order of frequency, stopping after limit words if a limit is given.
+        """
+        words = self.words.get(length, ())
+        result = []
+        while bits and (limit is None or len(result) < limit):
+            lowest = bits & -bits
+            result.append(words[lowest.bit_length() - 1])
+            bits ^= lowest
+        return result
+
+    def match(self, pattern, limit=None):
+        """ Returns the words matching a pattern, most frequent first """
+        return self.words_for(len(pattern), self.pattern_bits(pattern), limit)
+
+    def count(self, pattern):
+        """ Returns the number of words matching a pattern """
+        return count_bits(self.pattern_bits(pattern))
+
+
+def count_bits(bits):
+    """ Returns the number of set bits in a bitmap """
+    return bin(bits).count('1')
+
+
+_index = None
+_index_loaded_at = 0
+_index_lock = threading.Lock()
+
+
+def _index_is_stale():
+    return time.monotonic() - _index_loaded_at > settings.WORD_INDEX_TTL
+
+
+def get_word_index():
+    """
+    Returns the process-wide WordIndex, building it from the database the
+    first time it is needed and rebuilding it once it is older than
+    WORD_INDEX_TTL seconds, to pick up dictionary changes made by other
+    worker processes. While one thread rebuilds a stale index, the others
+    carry on using the old one rather than waiting.
+    """
+    global _index, _index_loaded_at
+    index = _index
+    if index is None or _index_is_stale():
+        if _index_lock.acquire(blocking=index is None):
+            try:
+                if _index is None or _index_is_stale():
+                    rows = DictionaryWord.objects \
+                        .order_by('length', '-frequency', 'id') \
+                        .values_list('string', 'length') \
+                        .iterator(chunk_size=10000)
+                    _index = WordIndex(rows)
+                    _index_loaded_at = time.monotonic()
+                index = _index
+            finally:
+                _index_lock.release()
+    return index
+
+
+def invalidate_word_index():
+    """
+    Discards the process-wide WordIndex, so that it is rebuilt on next use.
+    """
+    global _index
+    with _index_lock:
+        _index = None
@@ -92,6 +92,7 @@ export const CrosswordGrid = ({ data, loadNewCallback }) => {
         formData.append("completed_at", new Date().toISOString());
         formData.append("percent_complete", percentageCompleteRef.current);
         formData.append("percent_correct", percentageCorrect);
+        formData.append("cells", gridContents);
 
         try {
             const {data} = await axiosReq.post(
@@ -0,0 +1,112 @@
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+
+def increment(model, pk, field, amount=1):
+    """
+    Adds amount to an integer field of one row, as a single atomic
+    UPDATE ... SET field = field + amount, so concurrent increments are never
+    lost and no other column is written.
+
+    If PUZZLE_COUNTER_BUFFERING is set, the increment is instead added to an
+    in-process buffer which is folded back into the table periodically, so
+    requests for a hot row do not queue on its row lock. It is only added
+    once the current transaction commits, so a request that rolls back
+    leaves no count behind.
+    """
+    if settings.PUZZLE_COUNTER_BUFFERING:
+        transaction.on_commit(
+            lambda: counter_buffer.add(model, pk, field, amount))
+    else:
+        model.objects.filter(pk=pk).update(**{field: F(field) + amount})
+
+
+class CounterBuffer:
+    """
+    Accumulates increments per (model, pk, field) and writes each total with
+    one atomic UPDATE when flushed. Flushes are made by a background thread,
+    on its own database connection, every flush_interval seconds or as soon
+    as max_keys distinct rows are pending, and again when the process exits.
+    No request's transaction ever carries other requests' increments.
+
+    If a flush fails, its increments are put back to be written by the next.
+    """
+
+    def __init__(self, flush_interval, max_keys):
+        self.flush_interval = flush_interval
+        self.max_keys = max_keys
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def add(self, model, pk, field, amount=1):
+        self._ensure_started()
+        with self._lock:
+            key = (model, pk, field)
+            self._pending[key] = self._pending.get(key, 0) + amount
+            full = len(self._pending) >= self.max_keys
+        if full:
+            self._wake.set()
+
+    def pending(self, model, pk, field):
+        """ Returns the increment not yet written for this row and field """
+        with self._lock:
+            return self._pending.get((model, pk, field), 0)
+
+    def flush(self):
+        """ Writes every pending increment now, in the calling thread """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            with transaction.atomic():
+                for (model, pk, field), amount in pending.items():
+                    model.objects.filter(pk=pk).update(
+                        **{field: F(field) + amount})
+        except Exception:
+            with self._lock:
+                for key, amount in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + amount
+            raise
+
+    def _ensure_started(self):
+        # Started lazily, and again in each forked worker process, since
+        # threads do not survive a fork.
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._wake = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._run, name='puzzle-counters', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Could not write puzzle counters')
+            close_old_connections()
+
+
+counter_buffer = CounterBuffer(
+    flush_interval=settings.PUZZLE_COUNTER_FLUSH_INTERVAL,
+    max_keys=settings.PUZZLE_COUNTER_MAX_PENDING,
+)
+atexit.register(counter_buffer.flush)
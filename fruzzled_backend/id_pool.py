@@ -0,0 +1,91 @@
+import random
+import threading
+import time
+
+
+class IdPool:
+    """
+    An in-memory pool of model ids, loaded from the database on first use and
+    reloaded once it is older than ttl seconds. The ttl bounds how long a
+    process can miss changes made by other processes; changes made in this
+    process should be applied directly with add(), discard() or invalidate().
+
+    Used to pick a random row without loading every candidate row.
+    """
+
+    max_rejections = 8
+
+    def __init__(self, loader, ttl):
+        """
+        loader is a callable returning an iterable of ids, such as a
+        values_list('id', flat=True) queryset.
+        """
+        self.loader = loader
+        self.ttl = ttl
+        # The ids as a tuple and as a frozenset, replaced together as one
+        # object so that readers never see one without the other
+        self._snapshot = None
+        self._loaded_at = 0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """ Returns the (ids, id_set) snapshot, loading it if necessary """
+        snapshot = self._snapshot
+        if snapshot is None or self._is_stale():
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None or self._is_stale():
+                    self._set(tuple(self.loader()))
+                    snapshot = self._snapshot
+        return snapshot
+
+    def ids(self):
+        """ Returns the pooled ids as a tuple, loading them if necessary """
+        return self._load()[0]
+
+    def __contains__(self, id):
+        return id in self._load()[1]
+
+    def __len__(self):
+        return len(self.ids())
+
+    def invalidate(self):
+        """ Discards the pooled ids, so that they are reloaded on next use """
+        with self._lock:
+            self._snapshot = None
+
+    def add(self, id):
+        with self._lock:
+            if self._snapshot is not None and id not in self._snapshot[1]:
+                self._set(self._snapshot[0] + (id,), self._loaded_at)
+
+    def discard(self, id):
+        with self._lock:
+            if self._snapshot is not None and id in self._snapshot[1]:
+                self._set(tuple(i for i in self._snapshot[0] if i != id),
+                          self._loaded_at)
+
+    def choose(self, exclude=()):
+        """
+        Returns a random id from the pool that is not in exclude, or None if
+        there is no such id. A few random picks are tried first, so that when
+        exclude is small relative to the pool no copy of the pool is made.
+        """
+        ids = self.ids()
+        if not ids:
+            return None
+        exclude = set(exclude)
+        if len(exclude) * 2 < len(ids):
+            for _ in range(self.max_rejections):
+                id = random.choice(ids)
+                if id not in exclude:
+                    return id
+        remaining = [id for id in ids if id not in exclude]
+        return random.choice(remaining) if remaining else None
+
+    def _is_stale(self):
+        return time.monotonic() - self._loaded_at > self.ttl
+
+    def _set(self, ids, loaded_at=None):
+        self._snapshot = (ids, frozenset(ids))
+        self._loaded_at = time.monotonic() if loaded_at is None else loaded_at
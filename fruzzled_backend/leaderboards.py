@@ -0,0 +1,42 @@
+def get_leaderboard(queryset, instance, top_n, around):
+    """
+    Ranks a completed puzzle instance among the instances in queryset, which
+    should already be scoped (to a puzzle, a difficulty, ...) and carry any
+    select_related needed to serialize them.
+
+    Returns a dict holding the instance's ranking (the number of instances
+    with a shorter time_taken), the top_n fastest instances, and up to
+    around instances either side of it. Instances with equal times are
+    ordered by id, so those tied with the instance appear among its
+    neighbours. Each part is a range query on time_taken, so with an index
+    on (scope, time_taken) none of them scans beyond the rows it returns or
+    counts.
+    """
+    time_taken = instance.time_taken
+    ranking = queryset.filter(time_taken__lt=time_taken).count()
+    top = list(queryset.order_by('time_taken', 'id')[:top_n])
+    others = queryset.exclude(id=instance.id)
+    above = list(others.filter(time_taken__lte=time_taken)
+                       .exclude(time_taken=time_taken, id__gt=instance.id)
+                       .order_by('-time_taken', '-id')[:around])
+    below = list(others.filter(time_taken__gte=time_taken)
+                       .exclude(time_taken=time_taken, id__lt=instance.id)
+                       .order_by('time_taken', 'id')[:around])
+    return {
+        'ranking': ranking,
+        'top_n': top,
+        'above': above[::-1],
+        'below': below,
+    }
+
+
+def get_int_param(request, name, default, maximum):
+    """
+    Returns a non-negative integer query parameter, falling back to default
+    if it is missing or malformed, and capped at maximum.
+    """
+    try:
+        value = int(request.GET.get(name, default))
+    except ValueError:
+        value = default
+    return min(max(value, 0), maximum)
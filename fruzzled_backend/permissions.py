@@ -1,6 +1,5 @@
 from rest_framework import permissions
-from django.conf import settings
-from player_profile.models import PlayerProfile
+from player_profile.utils import get_request_profile
 
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
@@ -15,9 +14,4 @@ class HasPlayerProfileCookie(permissions.BasePermission):
     message = 'No player profile'
 
     def has_permission(self, request, view):
-        profile_cookie = request.COOKIES.get(settings.PLAYER_PROFILE_COOKIE, '')
-        if profile_cookie:
-            profile = PlayerProfile.objects.filter(uuid=profile_cookie).first()
-            if (profile):
-                return True
-        return False
\ No newline at end of file
+        return get_request_profile(request) is not None
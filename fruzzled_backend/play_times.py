@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+
+
+def validate_play_times(started_on, completed_at, created_on):
+    """
+    Checks the start and completion times a client submits with a puzzle
+    instance, from which its time_taken is worked out. The instance must
+    end no earlier than it starts, no later than now (give or take
+    PLAY_TIME_CLOCK_SKEW seconds), and must not start before its puzzle,
+    created on created_on, could have been served.
+
+    Raises a ValidationError if any check fails.
+    """
+    if completed_at < started_on:
+        raise serializers.ValidationError(
+            {'completed_at': 'The puzzle cannot be completed before it '
+                             'was started'})
+    skew = timedelta(seconds=settings.PLAY_TIME_CLOCK_SKEW)
+    if completed_at > timezone.now() + skew:
+        raise serializers.ValidationError(
+            {'completed_at': 'The puzzle cannot be completed in the future'})
+    if started_on < created_on - skew:
+        raise serializers.ValidationError(
+            {'started_on': 'The puzzle cannot be started before it was '
+                           'created'})
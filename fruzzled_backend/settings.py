@@ -175,6 +175,30 @@ else:
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+#
+# On the server the cache is shared by all worker processes through a table
+# in the database (created by the crosswords 0012 migration), so that an
+# entry invalidated by one worker is not served stale by another. Elsewhere
+# each process keeps its own in-memory cache, and an entry changed by
+# another process may be served until its timeout runs out.
+
+if 'USE_SERVER_POSTGRES' in os.environ and not RUNNING_TESTS:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'fruzzled_cache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -231,6 +255,62 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom application settings
 PLAYER_PROFILE_COOKIE = 'fruzzled_profile'
 
+# Seconds for which player profiles found by cookie uuid are cached
+PLAYER_PROFILE_CACHE_TIMEOUT = 5 * 60
+
+# Crossword autofill search time budgets, in seconds
+AUTOFILL_TIME_BUDGET = 5
+AUTOFILL_MAX_TIME_BUDGET = 30
+
+# The most grid templates returned by GetGridTemplates
+GRID_TEMPLATE_MAX_RESULTS = 50
+
+# Seconds before an in-memory pool of puzzle ids is reloaded from the
+# database, to pick up changes made by other worker processes
+PUZZLE_POOL_TTL = 60
+
+# Seconds before the in-memory positional index of dictionary words is
+# rebuilt, to pick up changes made by other worker processes
+WORD_INDEX_TTL = 10 * 60
+
+# Seconds for which the rendered payload of a released crossword is cached
+PUZZLE_PAYLOAD_CACHE_TIMEOUT = 15 * 60
+
+# Seconds for which the solutions of puzzles are cached for verifying
+# submitted instances
+PUZZLE_SOLUTION_CACHE_TIMEOUT = 15 * 60
+
+# Seconds by which the times submitted with a puzzle instance may be out
+# from the server's clock
+PLAY_TIME_CLOCK_SKEW = 60
+
+# Seconds for which the top of each crossword leaderboard is cached
+CROSSWORD_LEADERBOARD_CACHE_TIMEOUT = 5 * 60
+
+# Puzzle request logging. With buffering on, request rows are queued in
+# memory and bulk-inserted by a background thread in batches of up to
+# BATCH_SIZE, at least every FLUSH_INTERVAL seconds. Rows arriving while
+# MAX_QUEUE rows are already waiting are dropped.
+USAGE_STATS_BUFFERING = not RUNNING_TESTS
+USAGE_STATS_MAX_QUEUE = 10000
+USAGE_STATS_BATCH_SIZE = 500
+USAGE_STATS_FLUSH_INTERVAL = 2
+
+# The most buckets a single usage time series may span
+USAGE_TIME_SERIES_MAX_BUCKETS = 50000
+
+# Request log rows older than this many days are rolled up and removed by
+# the archive_usage_stats command, which writes them to ARCHIVE_DIR if set
+USAGE_STATS_RETENTION_DAYS = 90
+USAGE_STATS_ARCHIVE_DIR = os.environ.get('USAGE_STATS_ARCHIVE_DIR')
+
+# Puzzle instance counters are written with atomic UPDATEs. With buffering
+# on, increments are held in memory and written every FLUSH_INTERVAL seconds
+# or once MAX_PENDING rows have pending increments.
+PUZZLE_COUNTER_BUFFERING = 'BUFFER_PUZZLE_COUNTERS' in os.environ
+PUZZLE_COUNTER_FLUSH_INTERVAL = 30
+PUZZLE_COUNTER_MAX_PENDING = 500
+
 # DJANGO DEBUG LOGGER
 # LOGGING = {
 #    'version': 1,
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PlayerProfileConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'player_profile'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 15:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('player_profile', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='playerprofile',
+            name='uuid',
+            field=models.CharField(blank=True, max_length=256, null=True, unique=True),
+        ),
+    ]
@@ -5,7 +5,7 @@ import uuid
 class PlayerProfile(models.Model):
     nickname = models.CharField(max_length=32, unique=True)
     country = models.CharField(max_length=2, default="IE")
-    uuid = models.CharField(max_length=256, null=True, blank=True)
+    uuid = models.CharField(max_length=256, null=True, blank=True, unique=True)
 
     def __str__(self):
         return f'{self.nickname} from {self.country}'
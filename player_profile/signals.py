@@ -0,0 +1,18 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import PlayerProfile
+from .utils import invalidate_profile
+
+
+@receiver(post_save, sender=PlayerProfile)
+@receiver(post_delete, sender=PlayerProfile)
+def player_profile_changed(sender, instance, **kwargs):
+    """
+    Discards the cached copy of a profile once a change to it is committed
+    """
+    if instance.uuid:
+        transaction.on_commit(partial(invalidate_profile, instance.uuid))
@@ -1,3 +1,63 @@
-from django.test import TestCase
+from django.conf import settings
+from django.core.cache import cache
+from django.test import RequestFactory
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from .models import PlayerProfile
+from .utils import get_profile_by_uuid, get_request_profile
+
+
+class TestProfileResolution(APITestCase):
+
+    ROOT_URL = '/api/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = PlayerProfile.objects.create(nickname='joe')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_profile_is_cached_by_uuid(self):
+        with self.assertNumQueries(1):
+            get_profile_by_uuid(self.profile.uuid)
+        with self.assertNumQueries(0):
+            profile = get_profile_by_uuid(self.profile.uuid)
+        self.assertEqual(profile, self.profile)
+        self.assertEqual(profile.nickname, 'joe')
+
+    def test_saving_a_profile_refreshes_the_cache(self):
+        get_profile_by_uuid(self.profile.uuid)
+        self.profile.country = 'FR'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.save()
+        self.assertEqual(get_profile_by_uuid(self.profile.uuid).country, 'FR')
+
+    def test_deleted_profile_is_not_served_from_the_cache(self):
+        profile_uuid = self.profile.uuid
+        get_profile_by_uuid(profile_uuid)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.delete()
+        self.assertIsNone(get_profile_by_uuid(profile_uuid))
+
+    def test_unknown_uuid_resolves_to_none(self):
+        self.assertIsNone(get_profile_by_uuid('no-such-uuid'))
+        self.assertIsNone(get_profile_by_uuid(''))
+
+    def test_profile_is_resolved_once_per_request(self):
+        request = RequestFactory().get('/')
+        request.COOKIES[settings.PLAYER_PROFILE_COOKIE] = self.profile.uuid
+        with self.assertNumQueries(1):
+            self.assertEqual(get_request_profile(request), self.profile)
+            cache.clear()
+            self.assertEqual(get_request_profile(request), self.profile)
+
+    def test_profile_is_retrieved_with_cookie(self):
+        self.client.cookies[settings.PLAYER_PROFILE_COOKIE] = self.profile.uuid
+        response = self.client.get(f'{self.ROOT_URL}player_profile/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['nickname'], 'joe')
+
+    def test_profile_is_not_retrieved_without_cookie(self):
+        response = self.client.get(f'{self.ROOT_URL}player_profile/')
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import PlayerProfile
+
+CACHED_FIELDS = ('id', 'nickname', 'country', 'uuid')
+
+
+def _cache_key(profile_uuid):
+    return f'player_profile_{profile_uuid}'
+
+
+def get_profile_by_uuid(profile_uuid):
+    """
+    Returns the PlayerProfile with this uuid, or None if there is none.
+    Profiles found are cached for PLAYER_PROFILE_CACHE_TIMEOUT seconds, so
+    most lookups make no query at all.
+    """
+    if not profile_uuid:
+        return None
+    key = _cache_key(profile_uuid)
+    values = cache.get(key)
+    if values is None:
+        values = PlayerProfile.objects.filter(uuid=profile_uuid) \
+            .values_list(*CACHED_FIELDS).first()
+        if values is None:
+            return None
+        cache.set(key, values, settings.PLAYER_PROFILE_CACHE_TIMEOUT)
+    return PlayerProfile.from_db('default', CACHED_FIELDS, values)
+
+
+def invalidate_profile(profile_uuid):
+    cache.delete(_cache_key(profile_uuid))
+
+
+def get_request_profile(request):
+    """
+    Returns the PlayerProfile named by the request's profile cookie, or None.
+    The profile is resolved once per request, so the permission check and
+    the view share a single lookup.
+    """
+    # Held on the underlying HttpRequest, which DRF's Request wraps
+    request = getattr(request, '_request', request)
+    if not hasattr(request, '_player_profile'):
+        profile_uuid = request.COOKIES.get(settings.PLAYER_PROFILE_COOKIE, '')
+        request._player_profile = get_profile_by_uuid(profile_uuid)
+    return request._player_profile
@@ -1,5 +1,6 @@
-from django.shortcuts import render, get_object_or_404
+from django.shortcuts import render
 from django.conf import settings
+from django.http import Http404
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import generics, status
@@ -8,6 +9,7 @@ from rest_framework.renderers import BrowsableAPIRenderer, HTMLFormRenderer
 from fruzzled_backend.permissions import HasPlayerProfileCookie
 from .serializers import PlayerProfileSerializer
 from .models import PlayerProfile
+from .utils import get_request_profile
 
 
 class CreatePlayerProfile(APIView):
@@ -34,8 +36,9 @@ class RetrievePlayerProfile(APIView):
     authentication_classes = []
 
     def get(self, request):
-        profile_cookie = request.COOKIES.get(settings.PLAYER_PROFILE_COOKIE, '')
-        profile = get_object_or_404(PlayerProfile, uuid=profile_cookie)
+        profile = get_request_profile(request)
+        if profile is None:
+            raise Http404
         serializer = PlayerProfileSerializer(profile)
         return Response(serializer.data)
 
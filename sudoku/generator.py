@@ -0,0 +1,93 @@
+import random
+
+from .grading import difficulty_for_score, grade_score
+from .solver import BOXES, EMPTY, has_unique_solution, solve
+
+# The 8 rotations and reflections of the grid, as maps from each cell of
+# the new grid to the cell of the old one. Each keeps a puzzle's 180 degree
+# symmetry and its unique solution.
+_IDENTITY = list(range(81))
+_TRANSPOSE = [col * 9 + row for row in range(9) for col in range(9)]
+_MIRROR = [row * 9 + 8 - col for row in range(9) for col in range(9)]
+
+
+def _compose(first, second):
+    return [first[cell] for cell in second]
+
+
+_ROTATE = _compose(_TRANSPOSE, _MIRROR)
+_ROTATIONS = [_IDENTITY]
+for _ in range(3):
+    _ROTATIONS.append(_compose(_ROTATIONS[-1], _ROTATE))
+SYMMETRIES = _ROTATIONS + [_compose(rotation, _MIRROR)
+                           for rotation in _ROTATIONS]
+
+
+def random_solution(rng):
+    """
+    Returns a random completed grid. The three boxes on the diagonal share
+    no row or column, so each is filled with a random permutation of the
+    digits, and the solver completes the rest.
+    """
+    cells = [EMPTY] * 81
+    for box in (BOXES[0], BOXES[4], BOXES[8]):
+        digits = rng.sample('123456789', 9)
+        for cell, digit in zip(box, digits):
+            cells[cell] = digit
+    return solve(''.join(cells))
+
+
+def remove_clues(solution, rng, min_clues):
+    """
+    Empties the cells of a completed grid in random order, in pairs placed
+    symmetrically about the centre, keeping each pair only if the puzzle
+    still has a unique solution, until no more can go or min_clues remain.
+    """
+    cells = list(solution)
+    clues = 81
+    for cell in rng.sample(range(41), 41):
+        pair = {cell, 80 - cell}
+        if clues - len(pair) < min_clues:
+            continue
+        removed = [cells[c] for c in pair]
+        for c in pair:
+            cells[c] = EMPTY
+        if has_unique_solution(''.join(cells)):
+            clues -= len(pair)
+        else:
+            for c, digit in zip(pair, removed):
+                cells[c] = digit
+    return ''.join(cells)
+
+
+def permute(grid, rng):
+    """
+    Returns a variant of a puzzle with its digits relabelled and a random
+    rotation or reflection applied, which has a unique solution if the
+    puzzle does.
+    """
+    labels = dict(zip('123456789', rng.sample('123456789', 9)))
+    labels[EMPTY] = EMPTY
+    symmetry = rng.choice(SYMMETRIES)
+    return ''.join(labels[grid[cell]] for cell in symmetry)
+
+
+def generate_puzzles(seed, min_clues=22, variants=0):
+    """
+    Generates a puzzle with a unique solution, and variants more made from
+    it by permute(), from a random seed. Returns a list of (grid, difficulty,
+    difficulty_score) tuples. Grading is done here so that it is spread
+    across processes along with the generation. The variants share the
+    puzzle's grading, as relabelling and turning a grid changes none of the
+    techniques it needs.
+    """
+    rng = random.Random(seed)
+    puzzle = remove_clues(random_solution(rng), rng, min_clues)
+    score = grade_score(puzzle)
+    difficulty = difficulty_for_score(score)
+    grids = {puzzle}
+    for _ in range(variants * 2):
+        if len(grids) > variants:
+            break
+        grids.add(permute(puzzle, rng))
+    return [(grid, difficulty, score) for grid in grids]
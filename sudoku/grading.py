@@ -0,0 +1,211 @@
+"""
+Grades sudoku puzzles by solving them the way a person would, one step at a
+time, always using the simplest technique that makes progress.
+
+A puzzle's score is 100 times the level of the hardest technique it needs,
+plus the number of steps (capped at 99) that needed more than a naked
+single, so that puzzles needing the same techniques are ordered by how much
+work they take.
+"""
+from .solver import (ALL_DIGITS, BIT_COUNT, BIT_DIGIT, BOXES, CELL_BOX,
+    CELL_COL, CELL_ROW, COLS, EMPTY, ROWS, UNITS, solve)
+
+# The techniques in the order they are tried, with their levels
+NAKED_SINGLE = 'naked_single'
+HIDDEN_SINGLE = 'hidden_single'
+LOCKED_CANDIDATES = 'locked_candidates'
+NAKED_PAIR = 'naked_pair'
+HIDDEN_PAIR = 'hidden_pair'
+X_WING = 'x_wing'
+GUESS = 'guess'
+LEVELS = {
+    NAKED_SINGLE: 1,
+    HIDDEN_SINGLE: 2,
+    LOCKED_CANDIDATES: 3,
+    NAKED_PAIR: 4,
+    HIDDEN_PAIR: 5,
+    X_WING: 6,
+    GUESS: 7,
+}
+
+# The highest score of each difficulty level: naked singles only, hidden
+# singles, up to pairs, and anything harder
+DIFFICULTY_SCORES = ((0, 199), (1, 299), (2, 599), (3, None))
+
+PEERS = [
+    sorted({peer for unit in (ROWS[CELL_ROW[cell]], COLS[CELL_COL[cell]],
+                              BOXES[CELL_BOX[cell]])
+            for peer in unit} - {cell})
+    for cell in range(81)
+]
+
+
+def difficulty_for_score(score):
+    """ Returns the SudokuPuzzle difficulty level of a grading score """
+    for difficulty, highest in DIFFICULTY_SCORES:
+        if highest is None or score <= highest:
+            return difficulty
+
+
+class _Grader:
+
+    def __init__(self, grid):
+        self.solution = solve(grid)
+        if self.solution is None:
+            raise ValueError('The puzzle has no solution')
+        self.values = [0] * 81
+        self.candidates = [ALL_DIGITS] * 81
+        for cell, char in enumerate(grid):
+            if char != EMPTY:
+                self.place(cell, 1 << (int(char) - 1))
+
+    def place(self, cell, bit):
+        self.values[cell] = BIT_DIGIT[bit]
+        self.candidates[cell] = 0
+        for peer in PEERS[cell]:
+            self.candidates[peer] &= ~bit
+
+    def eliminate(self, cells, mask):
+        """ Removes mask from the candidates of cells, True if any changed """
+        changed = False
+        for cell in cells:
+            if self.candidates[cell] & mask:
+                self.candidates[cell] &= ~mask
+                changed = True
+        return changed
+
+    def positions(self, unit, bit):
+        return [cell for cell in unit if self.candidates[cell] & bit]
+
+    def naked_single(self):
+        for cell in range(81):
+            if BIT_COUNT[self.candidates[cell]] == 1:
+                self.place(cell, self.candidates[cell])
+                return True
+        return False
+
+    def hidden_single(self):
+        for unit in UNITS:
+            for bit in BIT_DIGIT:
+                cells = self.positions(unit, bit)
+                if len(cells) == 1:
+                    self.place(cells[0], bit)
+                    return True
+        return False
+
+    def locked_candidates(self):
+        # Pointing: a digit confined to one line within a box is removed
+        # from the rest of that line. Claiming: a digit confined to one box
+        # within a line is removed from the rest of that box.
+        for box in BOXES:
+            for bit in BIT_DIGIT:
+                cells = self.positions(box, bit)
+                if not cells:
+                    continue
+                for cell_line, lines in ((CELL_ROW, ROWS), (CELL_COL, COLS)):
+                    if len({cell_line[cell] for cell in cells}) == 1:
+                        line = lines[cell_line[cells[0]]]
+                        if self.eliminate(
+                                [c for c in line if c not in box], bit):
+                            return True
+        for line in ROWS + COLS:
+            for bit in BIT_DIGIT:
+                cells = self.positions(line, bit)
+                if cells and len({CELL_BOX[cell] for cell in cells}) == 1:
+                    box = BOXES[CELL_BOX[cells[0]]]
+                    if self.eliminate(
+                            [c for c in box if c not in line], bit):
+                        return True
+        return False
+
+    def naked_pair(self):
+        for unit in UNITS:
+            pairs = {}
+            for cell in unit:
+                if BIT_COUNT[self.candidates[cell]] == 2:
+                    pairs.setdefault(self.candidates[cell], []).append(cell)
+            for mask, cells in pairs.items():
+                if len(cells) == 2 and self.eliminate(
+                        [c for c in unit if c not in cells], mask):
+                    return True
+        return False
+
+    def hidden_pair(self):
+        for unit in UNITS:
+            places = {}
+            for bit in BIT_DIGIT:
+                cells = self.positions(unit, bit)
+                if len(cells) == 2:
+                    places.setdefault(tuple(cells), []).append(bit)
+            for cells, bits in places.items():
+                if len(bits) == 2:
+                    mask = bits[0] | bits[1]
+                    if self.eliminate(cells, ALL_DIGITS & ~mask):
+                        return True
+        return False
+
+    def x_wing(self):
+        for lines, crosses, cross_of in ((ROWS, COLS, CELL_COL),
+                                         (COLS, ROWS, CELL_ROW)):
+            for bit in BIT_DIGIT:
+                wings = {}
+                for line in lines:
+                    cells = self.positions(line, bit)
+                    if len(cells) == 2:
+                        wings.setdefault(
+                            tuple(cross_of[cell] for cell in cells), []
+                        ).append(line)
+                for crossing, found in wings.items():
+                    if len(found) != 2:
+                        continue
+                    wing_cells = found[0] + found[1]
+                    others = [cell for cross in crossing
+                              for cell in crosses[cross]
+                              if cell not in wing_cells]
+                    if self.eliminate(others, bit):
+                        return True
+        return False
+
+    def guess(self):
+        # Stands in for trial and error, placing the correct digit in the
+        # cell with the fewest candidates
+        cell = min((cell for cell in range(81) if not self.values[cell]),
+                   key=lambda cell: BIT_COUNT[self.candidates[cell]])
+        self.place(cell, 1 << (int(self.solution[cell]) - 1))
+        return True
+
+    def run(self):
+        techniques = [(name, getattr(self, name))
+                      for name in sorted(LEVELS, key=LEVELS.get)]
+        counts = {}
+        while not all(self.values):
+            for name, technique in techniques:
+                if technique():
+                    counts[name] = counts.get(name, 0) + 1
+                    break
+        return counts
+
+
+def grade(grid):
+    """
+    Solves a grid step by step, and returns a dict of its score, the
+    hardest technique it needed, and the number of steps made with each
+    technique. Raises ValueError if the grid has no solution.
+    """
+    counts = _Grader(grid).run()
+    hardest = max(counts, key=LEVELS.get, default=NAKED_SINGLE)
+    advanced_steps = sum(steps for name, steps in counts.items()
+                         if name != NAKED_SINGLE)
+    return {
+        'score': LEVELS[hardest] * 100 + min(advanced_steps, 99),
+        'hardest': hardest,
+        'steps': counts,
+    }
+
+
+def grade_score(grid):
+    """ Returns the score of a grid, or None if it cannot be solved """
+    try:
+        return grade(grid)['score']
+    except ValueError:
+        return None
@@ -0,0 +1,111 @@
+import csv
+import os
+from itertools import islice
+
+from django.db import transaction
+
+from .models import SudokuPuzzle
+from .puzzle_pool import difficulty_pools
+from .solver import has_unique_solution
+
+GRID_CHARS = frozenset('-123456789')
+
+# Difficulty levels by name, as used for the folders of sudoku_csv_data
+DIFFICULTY_NAMES = {
+    label.lower(): difficulty
+    for difficulty, label in SudokuPuzzle.DIFFICULTIES
+}
+
+
+def infer_difficulty(path):
+    """
+    Returns the difficulty named by the nearest folder of path called
+    easy, medium, hard or vicious, or None if there is no such folder.
+    """
+    folders = os.path.normpath(os.path.abspath(path)).split(os.sep)[:-1]
+    for folder in reversed(folders):
+        if folder.lower() in DIFFICULTY_NAMES:
+            return DIFFICULTY_NAMES[folder.lower()]
+    return None
+
+
+def find_csv_files(paths):
+    """
+    Returns the csv files among paths, and those in any directories among
+    them, searched recursively, in a stable order.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(os.path.join(root, name)
+                             for name in sorted(names)
+                             if name.lower().endswith('.csv'))
+        else:
+            files.append(path)
+    return files
+
+
+def read_grids(csv_file):
+    """
+    Generates the grids of a csv file, one per row, from the second column
+    (the first being the clue count, as in sudoku_csv_data).
+    """
+    with open(csv_file, newline='') as infile:
+        for row in csv.reader(infile):
+            if len(row) > 1:
+                yield row[1].strip()
+
+
+def is_valid_grid(grid):
+    return len(grid) == 81 and GRID_CHARS.issuperset(grid)
+
+
+def import_grids(grids, difficulty, creator, chunk_size=2000,
+                 validate=True, scores=None):
+    """
+    Creates a SudokuPuzzle for each of an iterable of grid strings, chunk_size
+    grids at a time, each chunk with a single bulk INSERT in its own
+    transaction. Grids already in the database, whether from before or
+    earlier in the iterable, are skipped using the index on grid, as are
+    malformed grids, and unless validate is False, grids that do not have
+    exactly one solution. scores optionally maps grids to their
+    difficulty_score.
+
+    Returns a dict of the numbers of grids created, skipped as duplicates,
+    skipped as invalid, and skipped for not having a unique solution.
+    """
+    counts = {'created': 0, 'duplicates': 0, 'invalid': 0, 'not_unique': 0}
+    grids = iter(grids)
+    while True:
+        chunk = list(islice(grids, chunk_size))
+        if not chunk:
+            break
+        new_grids = {}
+        for grid in chunk:
+            if not is_valid_grid(grid):
+                counts['invalid'] += 1
+            elif grid in new_grids:
+                counts['duplicates'] += 1
+            elif validate and not has_unique_solution(grid):
+                counts['not_unique'] += 1
+            else:
+                new_grids[grid] = None
+        with transaction.atomic():
+            existing = set(SudokuPuzzle.objects
+                           .filter(grid__in=new_grids)
+                           .values_list('grid', flat=True))
+            SudokuPuzzle.objects.bulk_create([
+                SudokuPuzzle(grid=grid, created_by=creator,
+                             difficulty=difficulty,
+                             difficulty_score=(scores or {}).get(grid))
+                for grid in new_grids if grid not in existing
+            ])
+        counts['duplicates'] += len(existing)
+        counts['created'] += len(new_grids) - len(existing)
+
+    # bulk_create sends no post_save signals, so this process's pool of ids
+    # is reloaded here, and those of other processes on their next refresh.
+    difficulty_pools[difficulty].invalidate()
+    return counts
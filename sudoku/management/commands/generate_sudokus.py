@@ -0,0 +1,99 @@
+import csv
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from sudoku.generator import generate_puzzles
+from sudoku.importer import DIFFICULTY_NAMES, import_grids
+
+
+class Command(BaseCommand):
+    help = ('Generate new sudoku puzzles with unique solutions across a pool '
+            'of processes, grade them, and insert them, or write them as csv '
+            'files that import_csv can read.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100,
+                            help='number of puzzles to generate from scratch')
+        parser.add_argument('--variants', type=int, default=0,
+                            help='permuted variants to make of each puzzle')
+        parser.add_argument('--min-clues', type=int, default=22,
+                            help='fewest clues to leave in a puzzle')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='number of generating processes')
+        parser.add_argument('--seed', type=int,
+                            help='random seed, for repeatable runs')
+        parser.add_argument('--output-dir',
+                            help='write csv files into a folder per '
+                                 'difficulty here, instead of inserting')
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='puzzles to insert or write at a time')
+        parser.add_argument('--creator', default='admin',
+                            help='username of the puzzles\' creator')
+
+    def handle(self, *args, **kwargs):
+        creator = None
+        if not kwargs['output_dir']:
+            try:
+                creator = User.objects.get(username=kwargs['creator'])
+            except User.DoesNotExist:
+                raise CommandError(f'No user named {kwargs["creator"]}')
+        seed = kwargs['seed']
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.run_name = f'generated_{seed}'
+
+        generate = partial(generate_puzzles, min_clues=kwargs['min_clues'],
+                           variants=kwargs['variants'])
+        seeds = range(seed, seed + kwargs['count'])
+        started = time.monotonic()
+        self.generated = self.created = 0
+        pending = []
+        with ProcessPoolExecutor(max_workers=kwargs['workers']) as executor:
+            for puzzles in executor.map(generate, seeds, chunksize=4):
+                pending.extend(puzzles)
+                if len(pending) >= kwargs['chunk_size']:
+                    self.save(pending, creator, kwargs)
+                    pending = []
+            self.save(pending, creator, kwargs)
+
+        elapsed = time.monotonic() - started
+        rate = self.generated / max(elapsed, 1e-6)
+        stored = 'written' if kwargs['output_dir'] else 'created'
+        self.stdout.write(
+            f'{self.generated} puzzles generated and {self.created} {stored} '
+            f'in {elapsed:.1f}s: {rate:.1f}/s, '
+            f'{rate / kwargs["workers"]:.1f}/s per worker')
+
+    def save(self, puzzles, creator, kwargs):
+        by_difficulty = {}
+        for grid, difficulty, score in puzzles:
+            by_difficulty.setdefault(difficulty, {})[grid] = score
+        for difficulty, scores in sorted(by_difficulty.items()):
+            if kwargs['output_dir']:
+                self.write_csv(kwargs['output_dir'], difficulty, scores)
+                self.created += len(scores)
+            else:
+                # The generator only makes puzzles with a unique solution,
+                # so they are not solved again here
+                counts = import_grids(scores, difficulty, creator,
+                                      kwargs['chunk_size'], validate=False,
+                                      scores=scores)
+                self.created += counts['created']
+        self.generated += len(puzzles)
+
+    def write_csv(self, output_dir, difficulty, scores):
+        # The same columns as sudoku_csv_data: clue count, grid and label
+        names = {value: name for name, value in DIFFICULTY_NAMES.items()}
+        folder = os.path.join(output_dir, names[difficulty])
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f'{self.run_name}.csv')
+        with open(path, 'a', newline='') as outfile:
+            writer = csv.writer(outfile)
+            for grid in scores:
+                writer.writerow([81 - grid.count('-'), grid, 'generated'])
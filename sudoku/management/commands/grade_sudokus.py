@@ -0,0 +1,85 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from sudoku.grading import difficulty_for_score, grade_score
+from sudoku.models import PuzzleInstance, SudokuPuzzle
+from sudoku.puzzle_pool import difficulty_pools
+
+
+class Command(BaseCommand):
+    help = ('Grade sudoku puzzles with the strategy solver in sudoku.grading '
+            'and store their difficulty scores, grading in parallel across '
+            'a pool of processes.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='regrade puzzles that already have a score')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='number of grading processes')
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='puzzles to grade and update at a time')
+        parser.add_argument('--update-difficulty', action='store_true',
+                            help='also set each puzzle\'s difficulty level '
+                                 'from its score')
+
+    def handle(self, *args, **kwargs):
+        puzzles = SudokuPuzzle.objects.order_by('id')
+        if not kwargs['all']:
+            puzzles = puzzles.filter(difficulty_score=None)
+        fields = ['difficulty_score']
+        if kwargs['update_difficulty']:
+            fields.append('difficulty')
+
+        started = time.monotonic()
+        graded = unsolvable = 0
+        last_id = 0
+        with ProcessPoolExecutor(max_workers=kwargs['workers']) as executor:
+            while True:
+                # Paged by id, so that no cursor is held open across updates
+                chunk = list(puzzles.filter(id__gt=last_id)
+                             .values_list('id', 'grid', 'difficulty')
+                             [:kwargs['chunk_size']])
+                if not chunk:
+                    break
+                last_id = chunk[-1][0]
+                scores = executor.map(
+                    grade_score, [grid for _, grid, _ in chunk], chunksize=64)
+                updates = []
+                # The ids of the puzzles whose difficulty has changed, by
+                # their new difficulty
+                regraded = {}
+                for (puzzle_id, _, difficulty), score in zip(chunk, scores):
+                    if score is None:
+                        unsolvable += 1
+                        continue
+                    puzzle = SudokuPuzzle(id=puzzle_id, difficulty_score=score)
+                    if kwargs['update_difficulty']:
+                        puzzle.difficulty = difficulty_for_score(score)
+                        if puzzle.difficulty != difficulty:
+                            regraded.setdefault(puzzle.difficulty, []) \
+                                .append(puzzle_id)
+                    updates.append(puzzle)
+                with transaction.atomic():
+                    SudokuPuzzle.objects.bulk_update(updates, fields)
+                    # bulk_update sends no signals, so the difficulty copied
+                    # onto each puzzle's instances is updated here
+                    for difficulty, puzzle_ids in regraded.items():
+                        PuzzleInstance.objects.filter(
+                            puzzle_id__in=puzzle_ids
+                        ).update(difficulty=difficulty)
+                graded += len(updates)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'{graded} graded, {graded / max(elapsed, 1e-6):.0f}/s')
+
+        if kwargs['update_difficulty']:
+            for pool in difficulty_pools.values():
+                pool.invalidate()
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{graded} puzzles graded and {unsolvable} without a solution '
+            f'skipped in {elapsed:.1f}s with {kwargs["workers"]} workers')
@@ -1,29 +1,72 @@
-import csv
-from sudoku.models import SudokuPuzzle
+import time
+from argparse import BooleanOptionalAction
+
 from django.contrib.auth.models import User
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+
+from sudoku.importer import (DIFFICULTY_NAMES, find_csv_files, import_grids,
+    infer_difficulty, read_grids)
 
 
 class Command(BaseCommand):
-    help = 'Import csv puzzle data and create sudoku model instances'
+    help = ('Import csv puzzle data and create sudoku model instances. '
+            'Each path may be a csv file or a directory of them, and the '
+            'difficulty of each file is taken from --difficulty, or else '
+            'from the nearest folder named easy, medium, hard or vicious.')
 
     def add_arguments(self, parser):
-        parser.add_argument('csv_file', type=str, help='csv file to import')
-        parser.add_argument('difficulty', type=str, help='difficulty')
+        parser.add_argument('paths', nargs='+',
+                            help='csv files or directories to import')
+        parser.add_argument('--difficulty', type=int,
+                            choices=sorted(DIFFICULTY_NAMES.values()),
+                            help='difficulty for every file imported')
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='puzzles to insert per transaction')
+        parser.add_argument('--creator', default='admin',
+                            help='username of the puzzles\' creator')
+        parser.add_argument('--validate', action=BooleanOptionalAction,
+                            default=True,
+                            help='skip puzzles without a unique solution '
+                                 '(the default; --no-validate is faster but '
+                                 'trusts the files)')
 
     def handle(self, *args, **kwargs):
-        csv_file = kwargs['csv_file']
-        difficulty = int(kwargs['difficulty'])
-        creator = User.objects.get(username='admin')
-        puzzles_created = 0
-
-        with open(csv_file) as infile:
-            csv_reader = csv.reader(infile, delimiter=',')
-            for row in csv_reader:
-                SudokuPuzzle.objects.create(
-                    grid=row[1],
-                    created_by=creator,
-                    difficulty=difficulty
-                )
-                puzzles_created += 1
-                print(f'puzzles created : {puzzles_created}\r', end='')
+        try:
+            creator = User.objects.get(username=kwargs['creator'])
+        except User.DoesNotExist:
+            raise CommandError(f'No user named {kwargs["creator"]}')
+
+        files = []
+        for csv_file in find_csv_files(kwargs['paths']):
+            difficulty = kwargs['difficulty']
+            if difficulty is None:
+                difficulty = infer_difficulty(csv_file)
+            if difficulty is None:
+                raise CommandError(
+                    f'No difficulty for {csv_file}: use --difficulty, or put '
+                    f'it in a folder named {", ".join(DIFFICULTY_NAMES)}')
+            files.append((csv_file, difficulty))
+        if not files:
+            raise CommandError('No csv files found')
+
+        started = time.monotonic()
+        total = 0
+        for csv_file, difficulty in files:
+            file_started = time.monotonic()
+            counts = import_grids(read_grids(csv_file), difficulty, creator,
+                                  kwargs['chunk_size'], kwargs['validate'])
+            rows = sum(counts.values())
+            total += rows
+            elapsed = time.monotonic() - file_started
+            self.stdout.write(
+                f'{csv_file} (difficulty {difficulty}): '
+                f'{counts["created"]} created, '
+                f'{counts["duplicates"]} duplicates, '
+                f'{counts["invalid"]} invalid and '
+                f'{counts["not_unique"]} without a unique solution skipped, '
+                f'{rows / max(elapsed, 1e-6):.0f} rows/s')
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{total} rows from {len(files)} files in {elapsed:.1f}s '
+            f'({total / max(elapsed, 1e-6):.0f} rows/s)')
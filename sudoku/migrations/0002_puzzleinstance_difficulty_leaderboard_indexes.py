@@ -0,0 +1,37 @@
+# Generated by Django 4.2 on 2026-10-18 15:09
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_puzzle_difficulty(apps, schema_editor):
+    PuzzleInstance = apps.get_model('sudoku', 'PuzzleInstance')
+    SudokuPuzzle = apps.get_model('sudoku', 'SudokuPuzzle')
+    PuzzleInstance.objects.update(difficulty=Subquery(
+        SudokuPuzzle.objects.filter(id=OuterRef('puzzle_id'))
+                            .values('difficulty')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sudoku', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='puzzleinstance',
+            name='difficulty',
+            field=models.IntegerField(choices=[(0, 'Easy'), (1, 'Medium'), (2, 'Hard'), (3, 'Vicious')], default=0),
+        ),
+        migrations.RunPython(copy_puzzle_difficulty, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='puzzleinstance',
+            index=models.Index(fields=['puzzle', 'time_taken'], name='sudoku_puzz_puzzle__f7764a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='puzzleinstance',
+            index=models.Index(fields=['difficulty', 'time_taken'], name='sudoku_puzz_difficu_44b209_idx'),
+        ),
+    ]
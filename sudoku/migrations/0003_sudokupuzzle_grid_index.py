@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 15:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sudoku', '0002_puzzleinstance_difficulty_leaderboard_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sudokupuzzle',
+            name='grid',
+            field=models.CharField(db_index=True, max_length=81),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2 on 2026-10-18 15:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sudoku', '0003_sudokupuzzle_grid_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sudokupuzzle',
+            name='difficulty_score',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='sudokupuzzle',
+            index=models.Index(fields=['difficulty', 'difficulty_score'], name='sudoku_sudo_difficu_6f500b_idx'),
+        ),
+    ]
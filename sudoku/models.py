@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import User
 
 from player_profile.models import PlayerProfile
+from fruzzled_backend.counters import increment
 
 
 class SudokuPuzzle(models.Model):
@@ -12,13 +13,21 @@ class SudokuPuzzle(models.Model):
         (3, 'Vicious'),
     )
 
-    grid = models.CharField(max_length=81)
+    grid = models.CharField(max_length=81, db_index=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     created_on = models.DateTimeField(auto_now_add=True)
     difficulty = models.IntegerField(choices=DIFFICULTIES, default=0)
     instances_created = models.IntegerField(default=0)
     instances_completed = models.IntegerField(default=0)
 
+    # Set by the grade_sudokus command, see sudoku.grading
+    difficulty_score = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["difficulty", "difficulty_score"]),
+        ]
+
     def __str__(self):
         username = self.created_by.username if self.created_by else 'Deleted'
         return f'''
@@ -41,9 +50,16 @@ class PuzzleInstance(models.Model):
     completed_at = models.DateTimeField()
     time_taken = models.DurationField(null=True)
 
+    # Copied from the puzzle on save, so that difficulty leaderboards can be
+    # read from a single index.
+    difficulty = models.IntegerField(
+        choices=SudokuPuzzle.DIFFICULTIES, default=0)
+
     class Meta:
         indexes = [
-            models.Index(fields=["time_taken"])
+            models.Index(fields=["time_taken"]),
+            models.Index(fields=["puzzle", "time_taken"]),
+            models.Index(fields=["difficulty", "time_taken"]),
         ]
 
     def __str__(self):
@@ -52,10 +68,11 @@ class PuzzleInstance(models.Model):
     def save(self, *args, **kwargs):
         timedelta = self.completed_at - self.started_on
         self.time_taken = timedelta
+        self.difficulty = self.puzzle.difficulty
+        adding = self._state.adding
         super().save(*args, **kwargs)
 
-        # Update the Puzzle model
-        puzzle = SudokuPuzzle.objects.get(id=self.puzzle.id)
-        puzzle.instances_completed += 1
-        puzzle.save()
+        # Update the Puzzle model's counter when the instance is first saved
+        if adding:
+            increment(SudokuPuzzle, self.puzzle_id, 'instances_completed')
     
@@ -0,0 +1,19 @@
+from django.conf import settings
+
+from fruzzled_backend.id_pool import IdPool
+from .models import SudokuPuzzle
+
+
+def _make_pool(difficulty):
+    return IdPool(
+        lambda: SudokuPuzzle.objects.filter(difficulty=difficulty)
+                                    .values_list('id', flat=True),
+        ttl=settings.PUZZLE_POOL_TTL,
+    )
+
+
+# One pool of puzzle ids per difficulty level
+difficulty_pools = {
+    difficulty: _make_pool(difficulty)
+    for difficulty, _ in SudokuPuzzle.DIFFICULTIES
+}
@@ -1,5 +1,8 @@
 from rest_framework import serializers
+from fruzzled_backend.play_times import validate_play_times
 from .models import SudokuPuzzle, PuzzleInstance
+from .solver import has_unique_solution
+from .verification import is_solution
 from datetime import datetime
 
 
@@ -15,11 +18,22 @@ class SudokuPuzzleSerializer(serializers.ModelSerializer):
     def get_start_time(self, obj):
         return datetime.now()
 
+    def validate_grid(self, value):
+        try:
+            unique = has_unique_solution(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        if not unique:
+            raise serializers.ValidationError(
+                'The puzzle should have exactly one solution')
+        return value
+
     class Meta:
         model = SudokuPuzzle
         fields = ['id', 'grid', 'created_on', 'difficulty',
-                  'instances_created', 'instances_completed', 'creator',
-                  'is_owner', 'start_time']
+                  'difficulty_score', 'instances_created',
+                  'instances_completed', 'creator', 'is_owner', 'start_time']
+        read_only_fields = ['difficulty_score']
 
 
 class PuzzleInstanceSerializer(serializers.ModelSerializer):
@@ -34,6 +48,15 @@ class PuzzleInstanceSerializer(serializers.ModelSerializer):
     def get_duration(self, obj):
         return int(obj.time_taken.total_seconds() * 1000)
 
+    def validate(self, data):
+        validate_play_times(data['started_on'], data['completed_at'],
+                            data['puzzle'].created_on)
+        if data.get('completed') and not is_solution(
+                data['puzzle'], data['grid']):
+            raise serializers.ValidationError(
+                {'grid': 'The grid is not a solution of the puzzle'})
+        return data
+
     class Meta:
         model = PuzzleInstance
         fields = ['id', 'puzzle', 'owner', 'owner_nickname', 'owner_country', 
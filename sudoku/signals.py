@@ -0,0 +1,35 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import PuzzleInstance, SudokuPuzzle
+from .puzzle_pool import difficulty_pools
+from .verification import invalidate_solution
+
+
+@receiver(post_save, sender=SudokuPuzzle)
+def sudoku_puzzle_saved(sender, instance, **kwargs):
+    """
+    Keeps the per-difficulty pools of puzzle ids, and the difficulty copied
+    onto the puzzle's instances for the leaderboards, in step with the
+    puzzle, and discards its cached solution once the save is committed.
+    """
+    transaction.on_commit(partial(invalidate_solution, instance.id))
+    if not kwargs.get('created'):
+        PuzzleInstance.objects.filter(puzzle_id=instance.id) \
+            .exclude(difficulty=instance.difficulty) \
+            .update(difficulty=instance.difficulty)
+    for difficulty, pool in difficulty_pools.items():
+        if difficulty == instance.difficulty:
+            pool.add(instance.id)
+        else:
+            pool.discard(instance.id)
+
+
+@receiver(post_delete, sender=SudokuPuzzle)
+def sudoku_puzzle_deleted(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidate_solution, instance.id))
+    for pool in difficulty_pools.values():
+        pool.discard(instance.id)
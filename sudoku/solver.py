@@ -0,0 +1,204 @@
+"""
+A sudoku solver working on grid strings of 81 characters, row by row, in
+which '-' is an empty cell.
+
+Each cell's candidates are a 9-bit mask, digit d being bit d - 1, and the
+digits already placed in each row, column and box are kept as masks too.
+Naked and hidden singles are placed until neither applies, and then the
+search branches on the empty cell with the fewest candidates.
+"""
+
+EMPTY = '-'
+ALL_DIGITS = 0x1FF
+
+ROWS = [[row * 9 + col for col in range(9)] for row in range(9)]
+COLS = [[row * 9 + col for row in range(9)] for col in range(9)]
+BOXES = [[(box // 3 * 3 + i // 3) * 9 + box % 3 * 3 + i % 3
+          for i in range(9)] for box in range(9)]
+UNITS = ROWS + COLS + BOXES
+
+# The row, column and box of each cell
+CELL_ROW = [cell // 9 for cell in range(81)]
+CELL_COL = [cell % 9 for cell in range(81)]
+CELL_BOX = [cell // 27 * 3 + cell % 9 // 3 for cell in range(81)]
+
+BIT_COUNT = [bin(mask).count('1') for mask in range(ALL_DIGITS + 1)]
+BIT_DIGIT = {1 << digit: digit + 1 for digit in range(9)}
+
+
+class _State:
+    """ The digits placed so far, and the masks of each row, column and box """
+
+    __slots__ = ('values', 'rows', 'cols', 'boxes', 'empties')
+
+    def copy(self):
+        state = _State()
+        state.values = self.values[:]
+        state.rows = self.rows[:]
+        state.cols = self.cols[:]
+        state.boxes = self.boxes[:]
+        state.empties = set(self.empties)
+        return state
+
+    def candidates(self, cell):
+        return ALL_DIGITS & ~(self.rows[CELL_ROW[cell]]
+                              | self.cols[CELL_COL[cell]]
+                              | self.boxes[CELL_BOX[cell]])
+
+    def place(self, cell, bit):
+        self.values[cell] = BIT_DIGIT[bit]
+        self.rows[CELL_ROW[cell]] |= bit
+        self.cols[CELL_COL[cell]] |= bit
+        self.boxes[CELL_BOX[cell]] |= bit
+        self.empties.discard(cell)
+
+
+def _parse(grid):
+    """
+    Returns the _State of a grid string, or None if two of its digits clash.
+    Raises ValueError if the string is not a grid.
+    """
+    if len(grid) != 81:
+        raise ValueError('A sudoku grid should be 81 characters long')
+    state = _State()
+    state.values = [0] * 81
+    state.rows = [0] * 9
+    state.cols = [0] * 9
+    state.boxes = [0] * 9
+    state.empties = set()
+    for cell, char in enumerate(grid):
+        if char == EMPTY:
+            state.empties.add(cell)
+        elif '1' <= char <= '9':
+            bit = 1 << (int(char) - 1)
+            if not state.candidates(cell) & bit:
+                return None
+            state.place(cell, bit)
+        else:
+            raise ValueError(f'Unexpected character {char!r} in sudoku grid')
+    return state
+
+
+def _propagate(state):
+    """
+    Places naked and hidden singles until there are none left. Returns
+    None if the grid is found to have no solution, and otherwise a dict of
+    the candidates of each cell still empty.
+    """
+    # Locals rather than attribute and method lookups, as this is the
+    # innermost loop of the solver
+    values, rows, cols, boxes = \
+        state.values, state.rows, state.cols, state.boxes
+    empties, place = state.empties, state.place
+    candidates = {}
+    while empties:
+        placed = False
+        candidates = {}
+
+        # Naked singles: cells with only one candidate
+        for cell in list(empties):
+            mask = ALL_DIGITS & ~(rows[CELL_ROW[cell]] | cols[CELL_COL[cell]]
+                                  | boxes[CELL_BOX[cell]])
+            if not mask:
+                return None
+            if BIT_COUNT[mask] == 1:
+                place(cell, mask)
+                placed = True
+            else:
+                candidates[cell] = mask
+        if placed:
+            continue
+
+        # Hidden singles: digits with only one place in a unit
+        for unit in UNITS:
+            once = more = filled = 0
+            for cell in unit:
+                if values[cell]:
+                    filled |= 1 << (values[cell] - 1)
+                else:
+                    mask = candidates[cell]
+                    more |= once & mask
+                    once |= mask
+            if (once | filled) != ALL_DIGITS:
+                return None
+            # Digits placed in the unit during this pass can linger in the
+            # candidates of its other cells, so they are left out
+            singles = once & ~more & ~filled
+            if singles:
+                for cell in unit:
+                    if values[cell] or not candidates[cell] & singles:
+                        continue
+                    bit = candidates[cell] & singles
+                    if BIT_COUNT[bit] > 1:
+                        # Two digits that can only go in this one cell
+                        return None
+                    # Candidates go stale as digits are placed, so a
+                    # single is only placed if it is still possible. If
+                    # not, the next pass finds the digit has no place.
+                    if state.candidates(cell) & bit:
+                        place(cell, bit)
+                        placed = True
+
+        if not placed:
+            return candidates
+    return candidates
+
+
+def _search(state, limit, solutions):
+    cell_candidates = _propagate(state)
+    if cell_candidates is None:
+        return
+    if not state.empties:
+        solutions.append(''.join(map(str, state.values)))
+        return
+
+    # Branch on the most constrained cell
+    cell = min(cell_candidates,
+               key=lambda cell: BIT_COUNT[cell_candidates[cell]])
+    candidates = cell_candidates[cell]
+    while candidates:
+        bit = candidates & -candidates
+        candidates ^= bit
+        branch = state.copy()
+        branch.place(cell, bit)
+        _search(branch, limit, solutions)
+        if len(solutions) >= limit:
+            return
+
+
+def _solutions(grid, limit):
+    state = _parse(grid)
+    solutions = []
+    if state is not None:
+        _search(state, limit, solutions)
+    return solutions
+
+
+def solve(grid):
+    """ Returns a solution of grid, or None if it has none """
+    solutions = _solutions(grid, 1)
+    return solutions[0] if solutions else None
+
+
+def count_solutions(grid, limit=2):
+    """ Returns the number of solutions of grid, counting no higher than limit """
+    return len(_solutions(grid, limit))
+
+
+def has_unique_solution(grid):
+    return count_solutions(grid, 2) == 1
+
+
+def is_valid_solution(grid, solution):
+    """
+    Returns True if solution is a completed grid that obeys the rules and
+    keeps every digit given in grid.
+    """
+    if len(grid) != 81 or len(solution) != 81:
+        return False
+    digits = set('123456789')
+    for unit in UNITS:
+        if {solution[cell] for cell in unit} != digits:
+            return False
+    return all(given == EMPTY or given == placed
+               for given, placed in zip(grid, solution))
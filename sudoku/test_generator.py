@@ -0,0 +1,70 @@
+import random
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from .generator import generate_puzzles, permute, random_solution
+from .importer import find_csv_files, infer_difficulty, read_grids
+from .models import SudokuPuzzle
+from .solver import has_unique_solution, is_valid_solution, solve
+from .test_solver import PUZZLE
+
+
+class TestGenerator(SimpleTestCase):
+
+    def test_random_solution_is_complete_and_valid(self):
+        solution = random_solution(random.Random(1))
+        self.assertTrue(is_valid_solution('-' * 81, solution))
+
+    def test_generated_puzzles_are_unique_symmetric_and_graded(self):
+        puzzles = generate_puzzles(2, min_clues=24, variants=3)
+        self.assertEqual(len(puzzles), 4)
+        for grid, difficulty, score in puzzles:
+            self.assertTrue(has_unique_solution(grid))
+            self.assertGreaterEqual(81 - grid.count('-'), 24)
+            self.assertTrue(all((grid[c] == '-') == (grid[80 - c] == '-')
+                                for c in range(81)))
+            self.assertIn(difficulty, range(4))
+            self.assertIsNotNone(score)
+
+    def test_generation_is_repeatable(self):
+        self.assertEqual(generate_puzzles(3), generate_puzzles(3))
+
+    def test_permuted_puzzle_keeps_a_unique_solution(self):
+        variant = permute(PUZZLE, random.Random(4))
+        self.assertEqual(variant.count('-'), PUZZLE.count('-'))
+        self.assertTrue(has_unique_solution(variant))
+        self.assertIsNotNone(solve(variant))
+
+
+class TestGenerateSudokusCommand(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(
+            username='admin',
+            password='top_secret',
+        )
+
+    def test_puzzles_are_inserted(self):
+        call_command('generate_sudokus', '--count=2', '--variants=1',
+                     '--workers=1', '--seed=5', stdout=StringIO())
+        self.assertEqual(SudokuPuzzle.objects.count(), 4)
+        self.assertFalse(SudokuPuzzle.objects.filter(
+            difficulty_score=None).exists())
+
+    def test_puzzles_are_written_in_import_format(self):
+        with tempfile.TemporaryDirectory() as directory:
+            call_command('generate_sudokus', '--count=2', '--workers=1',
+                         '--seed=6', f'--output-dir={directory}',
+                         stdout=StringIO())
+            files = find_csv_files([directory])
+            grids = [grid for path in files for grid in read_grids(path)]
+            self.assertTrue(all(infer_difficulty(path) is not None
+                                for path in files))
+        self.assertEqual(len(grids), 2)
+        self.assertTrue(all(has_unique_solution(grid) for grid in grids))
+        self.assertFalse(SudokuPuzzle.objects.exists())
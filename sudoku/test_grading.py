@@ -0,0 +1,88 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from .grading import (GUESS, HIDDEN_SINGLE, LEVELS, NAKED_SINGLE,
+    difficulty_for_score, grade)
+from player_profile.models import PlayerProfile
+from .models import PuzzleInstance, SudokuPuzzle
+from .solver import solve
+from .test_solver import HARD_PUZZLE, PUZZLE
+
+# Needs trial and error beyond the techniques graded
+ESCARGOT = '1----7-9--3--2---8--96--5----53--9---1--8---26----4---3------1--4------7--7---3--'
+
+
+class TestGrading(SimpleTestCase):
+
+    def test_easy_puzzle_needs_only_singles(self):
+        result = grade(PUZZLE)
+        self.assertLessEqual(LEVELS[result['hardest']], LEVELS[HIDDEN_SINGLE])
+        self.assertEqual(sum(result['steps'].values()), PUZZLE.count('-'))
+
+    def test_harder_puzzles_score_higher(self):
+        easy, hard, hardest = [grade(grid)['score']
+                               for grid in (PUZZLE, HARD_PUZZLE, ESCARGOT)]
+        self.assertLess(easy, hard)
+        self.assertLess(hard, hardest)
+        self.assertEqual(grade(ESCARGOT)['hardest'], GUESS)
+
+    def test_score_is_level_and_steps(self):
+        result = grade(ESCARGOT)
+        advanced = sum(steps for name, steps in result['steps'].items()
+                       if name != NAKED_SINGLE)
+        self.assertEqual(result['score'], 700 + advanced)
+
+    def test_unsolvable_grid_is_rejected(self):
+        with self.assertRaises(ValueError):
+            grade('11' + '-' * 79)
+
+    def test_difficulty_is_banded_by_score(self):
+        self.assertEqual(difficulty_for_score(150), 0)
+        self.assertEqual(difficulty_for_score(250), 1)
+        self.assertEqual(difficulty_for_score(450), 2)
+        self.assertEqual(difficulty_for_score(750), 3)
+
+
+class TestGradeSudokusCommand(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(
+            username='test_admin',
+            password='top_secret',
+        )
+        cls.puzzles = [
+            SudokuPuzzle.objects.create(
+                grid=grid, created_by=cls.admin_user, difficulty=0)
+            for grid in (PUZZLE, ESCARGOT)
+        ]
+
+    def test_puzzles_are_graded(self):
+        call_command('grade_sudokus', '--workers=1', '--update-difficulty',
+                     stdout=StringIO())
+        easy, hardest = [SudokuPuzzle.objects.get(id=puzzle.id)
+                         for puzzle in self.puzzles]
+        self.assertEqual(easy.difficulty_score, grade(PUZZLE)['score'])
+        self.assertEqual(hardest.difficulty_score, grade(ESCARGOT)['score'])
+        self.assertEqual(hardest.difficulty, 3)
+
+    def test_regrading_updates_the_difficulty_of_instances(self):
+        now = timezone.now()
+        instance = PuzzleInstance.objects.create(
+            puzzle=self.puzzles[1],
+            owner=PlayerProfile.objects.create(nickname='joe'),
+            grid=solve(ESCARGOT),
+            started_on=now - timedelta(minutes=5),
+            completed=True,
+            completed_at=now,
+        )
+        self.assertEqual(instance.difficulty, 0)
+        call_command('grade_sudokus', '--workers=1', '--update-difficulty',
+                     stdout=StringIO())
+        instance.refresh_from_db()
+        self.assertEqual(instance.difficulty, 3)
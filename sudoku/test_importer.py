@@ -0,0 +1,83 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from .importer import import_grids, infer_difficulty
+from .models import SudokuPuzzle
+
+GRIDS = [
+    '-3--97--6-7--143--9--3---151-69---477---2--9---475---148--7------5-----3-17-85-64',
+    '7--25--4-9---3--2----749385-7-38-9---2---457-5------1-3--4-2--645---38--61--7--3-',
+    '--27--1-----14-8-2-8-23-47--4982---37--39--54--3-------9-471-263-------7274-----1',
+]
+
+
+class TestImportCsv(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(
+            username='admin',
+            password='top_secret',
+        )
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_csv(self, folder, name, grids):
+        path = os.path.join(self.directory.name, folder)
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, name), 'w') as outfile:
+            for grid in grids:
+                outfile.write(f'35,{grid},simple\n')
+
+    def test_difficulty_is_inferred_from_folder(self):
+        self.assertEqual(infer_difficulty('data/vicious/puzzles.csv'), 3)
+        self.assertEqual(infer_difficulty('Medium/x/puzzles.csv'), 1)
+        self.assertIsNone(infer_difficulty('data/puzzles.csv'))
+
+    def test_directory_is_imported_by_folder_difficulty(self):
+        self.write_csv('easy', 'a.csv', GRIDS[:2])
+        self.write_csv('hard', 'b.csv', GRIDS[2:])
+        call_command('import_csv', self.directory.name, stdout=StringIO())
+        self.assertEqual(
+            sorted(SudokuPuzzle.objects.values_list('grid', 'difficulty')),
+            sorted([(GRIDS[0], 0), (GRIDS[1], 0), (GRIDS[2], 2)]))
+
+    def test_duplicate_and_invalid_grids_are_skipped(self):
+        SudokuPuzzle.objects.create(
+            grid=GRIDS[0], created_by=self.admin_user, difficulty=1)
+        counts = import_grids(
+            [GRIDS[0], GRIDS[1], GRIDS[1], 'x' * 81, GRIDS[2][:80]],
+            1, self.admin_user, chunk_size=2)
+        self.assertEqual(counts, {'created': 1, 'duplicates': 2,
+                                  'invalid': 2, 'not_unique': 0})
+        self.assertEqual(SudokuPuzzle.objects.count(), 2)
+
+    def test_file_without_difficulty_is_rejected(self):
+        self.write_csv('misc', 'a.csv', GRIDS)
+        with self.assertRaises(CommandError):
+            call_command('import_csv', self.directory.name, stdout=StringIO())
+        call_command('import_csv', self.directory.name, '--difficulty=2',
+                     stdout=StringIO())
+        self.assertEqual(
+            SudokuPuzzle.objects.filter(difficulty=2).count(), 3)
+
+    def test_grids_without_unique_solution_are_skipped_by_default(self):
+        self.write_csv('easy', 'a.csv', [GRIDS[0], '-' * 81])
+        call_command('import_csv', self.directory.name, stdout=StringIO())
+        self.assertEqual(
+            list(SudokuPuzzle.objects.values_list('grid', flat=True)),
+            [GRIDS[0]])
+
+    def test_grids_are_not_solved_with_no_validate(self):
+        self.write_csv('easy', 'a.csv', [GRIDS[0], '-' * 81])
+        call_command('import_csv', self.directory.name, '--no-validate',
+                     stdout=StringIO())
+        self.assertEqual(SudokuPuzzle.objects.count(), 2)
@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from unittest import mock
+
+from django.db import DatabaseError, transaction
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from fruzzled_backend.counters import CounterBuffer, increment
+from player_profile.models import PlayerProfile
+from sudoku.models import SudokuPuzzle, PuzzleInstance
+
+
+class TestPuzzleCounters(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(
+            username='test_admin',
+            password='top_secret',
+        )
+        cls.profile = PlayerProfile.objects.create(nickname='joe')
+        cls.puzzle = SudokuPuzzle.objects.create(
+            grid='-' * 81, created_by=cls.admin_user, difficulty=0)
+
+    def create_instance(self):
+        now = timezone.now()
+        return PuzzleInstance.objects.create(
+            puzzle=self.puzzle,
+            owner=self.profile,
+            grid='1' * 81,
+            started_on=now - timedelta(minutes=5),
+            completed_at=now,
+        )
+
+    def test_instances_completed_counts_new_instances_only(self):
+        instance = self.create_instance()
+        self.create_instance()
+        instance.save()
+        self.puzzle.refresh_from_db()
+        self.assertEqual(self.puzzle.instances_completed, 2)
+
+    def test_get_random_puzzle_increments_instances_created(self):
+        self.client.get('/api/get_random_puzzle/0/')
+        response = self.client.get('/api/get_random_puzzle/0/')
+        self.assertEqual(response.data['instances_created'], 2)
+        self.puzzle.refresh_from_db()
+        self.assertEqual(self.puzzle.instances_created, 2)
+
+    def test_buffered_increments_are_written_on_flush(self):
+        buffer = CounterBuffer(flush_interval=3600, max_keys=100)
+        for _ in range(3):
+            buffer.add(SudokuPuzzle, self.puzzle.id, 'instances_created')
+        self.puzzle.refresh_from_db()
+        self.assertEqual(self.puzzle.instances_created, 0)
+        buffer.flush()
+        self.puzzle.refresh_from_db()
+        self.assertEqual(self.puzzle.instances_created, 3)
+
+    def test_failed_flush_keeps_its_increments(self):
+        buffer = CounterBuffer(flush_interval=3600, max_keys=100)
+        buffer.add(SudokuPuzzle, self.puzzle.id, 'instances_created', 3)
+        with mock.patch.object(QuerySet, 'update', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                buffer.flush()
+        self.assertEqual(
+            buffer.pending(SudokuPuzzle, self.puzzle.id, 'instances_created'),
+            3)
+        buffer.flush()
+        self.puzzle.refresh_from_db()
+        self.assertEqual(self.puzzle.instances_created, 3)
+
+    @override_settings(PUZZLE_COUNTER_BUFFERING=True)
+    def test_buffered_increments_wait_for_the_transaction_to_commit(self):
+        buffer = CounterBuffer(flush_interval=3600, max_keys=100)
+        with mock.patch('fruzzled_backend.counters.counter_buffer', buffer):
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        increment(SudokuPuzzle, self.puzzle.id,
+                                  'instances_created')
+                        raise ValueError
+                except ValueError:
+                    pass
+                increment(SudokuPuzzle, self.puzzle.id, 'instances_created')
+        self.assertEqual(
+            buffer.pending(SudokuPuzzle, self.puzzle.id, 'instances_created'),
+            1)
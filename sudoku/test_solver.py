@@ -0,0 +1,51 @@
+from django.test import SimpleTestCase
+
+from .solver import (count_solutions, has_unique_solution, is_valid_solution,
+    solve)
+
+PUZZLE = '-3--97--6-7--143--9--3---151-69---477---2--9---475---148--7------5-----3-17-85-64'
+SOLUTION = '531897426672514389948362715126938547753421698894756231489673152265149873317285964'
+
+# Needs search beyond singles
+HARD_PUZZLE = '--------7--763-5-----2--1---3----8--98---1----4-----3--6--4---95-----7--1-38---2-'
+
+
+class TestSolver(SimpleTestCase):
+
+    def test_puzzle_is_solved(self):
+        self.assertEqual(solve(PUZZLE), SOLUTION)
+
+    def test_hard_puzzle_is_solved(self):
+        solution = solve(HARD_PUZZLE)
+        self.assertTrue(is_valid_solution(HARD_PUZZLE, solution))
+        self.assertTrue(has_unique_solution(HARD_PUZZLE))
+
+    def test_empty_grid_has_many_solutions(self):
+        self.assertEqual(count_solutions('-' * 81, limit=5), 5)
+        self.assertFalse(has_unique_solution('-' * 81))
+
+    def test_clashing_grid_has_no_solution(self):
+        grid = '11' + '-' * 79
+        self.assertIsNone(solve(grid))
+        self.assertEqual(count_solutions(grid), 0)
+
+    def test_unsolvable_grid_has_no_solution(self):
+        # The first cell can take no digit
+        grid = '-12345678' + '9' + '-' * 71
+        self.assertIsNone(solve(grid))
+
+    def test_malformed_grid_is_rejected(self):
+        with self.assertRaises(ValueError):
+            solve('-' * 80)
+        with self.assertRaises(ValueError):
+            solve('0' * 81)
+
+    def test_solution_is_validated(self):
+        self.assertTrue(is_valid_solution(PUZZLE, SOLUTION))
+        self.assertTrue(is_valid_solution('-' * 81, SOLUTION))
+        # Solution of a different puzzle
+        self.assertFalse(is_valid_solution(PUZZLE.replace('3', '2', 1),
+                                           SOLUTION))
+        # Two digits swapped
+        self.assertFalse(is_valid_solution(PUZZLE, '35' + SOLUTION[2:]))
+        self.assertFalse(is_valid_solution(PUZZLE, SOLUTION[:80] + '-'))
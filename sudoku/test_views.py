@@ -0,0 +1,295 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from player_profile.models import PlayerProfile
+from sudoku.models import SudokuPuzzle, PuzzleInstance
+from sudoku.puzzle_pool import difficulty_pools
+from sudoku.solver import solve
+from sudoku.test_solver import HARD_PUZZLE, PUZZLE, SOLUTION
+
+
+class TestGetRandomPuzzleView(APITestCase):
+
+    ROOT_URL = '/api/get_random_puzzle/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(
+            username='test_admin',
+            password='top_secret',
+        )
+        cls.easy_puzzles = [
+            SudokuPuzzle.objects.create(
+                grid='-' * 81, created_by=cls.admin_user, difficulty=0)
+            for _ in range(3)
+        ]
+
+    def tearDown(self):
+        cache.clear()
+        for pool in difficulty_pools.values():
+            pool.invalidate()
+
+    def test_puzzle_of_requested_difficulty_is_returned(self):
+        response = self.client.get(f'{self.ROOT_URL}0/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['difficulty'], 0)
+
+    def test_no_puzzles_at_difficulty_returns_404(self):
+        response = self.client.get(f'{self.ROOT_URL}3/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_used_puzzles_are_not_returned_if_others_exist(self):
+        used = ','.join(str(p.id) for p in self.easy_puzzles[:2])
+        for _ in range(5):
+            response = self.client.get(f'{self.ROOT_URL}0/?used_puzzles={used}')
+            self.assertEqual(response.data['id'], self.easy_puzzles[2].id)
+
+    def test_first_used_puzzle_is_returned_if_all_are_used(self):
+        used = ','.join(str(p.id) for p in reversed(self.easy_puzzles))
+        response = self.client.get(f'{self.ROOT_URL}0/?used_puzzles={used}')
+        self.assertEqual(response.data['id'], self.easy_puzzles[2].id)
+
+    def test_new_puzzle_joins_the_pool(self):
+        self.client.get(f'{self.ROOT_URL}2/')
+        puzzle = SudokuPuzzle.objects.create(
+            grid='-' * 81, created_by=self.admin_user, difficulty=2)
+        response = self.client.get(f'{self.ROOT_URL}2/')
+        self.assertEqual(response.data['id'], puzzle.id)
+
+    def set_scores(self, *scores):
+        for puzzle, score in zip(self.easy_puzzles, scores):
+            puzzle.difficulty_score = score
+            puzzle.save()
+
+    def test_puzzle_is_chosen_within_score_band(self):
+        self.set_scores(100, 150, 250)
+        for _ in range(5):
+            response = self.client.get(
+                f'{self.ROOT_URL}0/?min_score=120&max_score=200')
+            self.assertEqual(response.data['id'], self.easy_puzzles[1].id)
+        response = self.client.get(f'{self.ROOT_URL}0/?min_score=200')
+        self.assertEqual(response.data['id'], self.easy_puzzles[2].id)
+
+    def test_used_puzzles_in_band_are_returned_if_all_are_used(self):
+        self.set_scores(100, 150, 160)
+        used = ','.join(str(p.id) for p in self.easy_puzzles)
+        response = self.client.get(
+            f'{self.ROOT_URL}0/?min_score=120&used_puzzles={used}')
+        self.assertEqual(response.data['id'], self.easy_puzzles[1].id)
+
+    def test_empty_score_band_returns_404(self):
+        self.set_scores(100, 150, 250)
+        response = self.client.get(f'{self.ROOT_URL}0/?max_score=50')
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(f'{self.ROOT_URL}0/?max_score=high')
+        self.assertEqual(response.status_code, 400)
+
+
+class TestGetLeaderboardView(APITestCase):
+
+    ROOT_URL = '/api/get_leaderboard/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(
+            username='test_admin',
+            password='top_secret',
+        )
+        cls.easy_1, cls.easy_2, cls.hard = [
+            SudokuPuzzle.objects.create(
+                grid='-' * 81, created_by=cls.admin_user, difficulty=difficulty)
+            for difficulty in (0, 0, 2)
+        ]
+        now = timezone.now()
+        cls.instances = {}
+        for minutes, puzzle in [(1, cls.hard), (2, cls.easy_2), (3, cls.easy_1),
+                                (4, cls.easy_2), (5, cls.easy_1), (6, cls.easy_1)]:
+            profile = PlayerProfile.objects.create(nickname=f'player_{minutes}')
+            cls.instances[minutes] = PuzzleInstance.objects.create(
+                puzzle=puzzle,
+                owner=profile,
+                grid='1' * 81,
+                started_on=now - timedelta(minutes=minutes),
+                completed=True,
+                completed_at=now,
+            )
+
+    def tearDown(self):
+        cache.clear()
+
+    def get_leaderboard(self, minutes, query=''):
+        response = self.client.get(
+            f'{self.ROOT_URL}{self.instances[minutes].id}/{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_ranking_is_scoped_by_difficulty_by_default(self):
+        data = self.get_leaderboard(5)
+        self.assertEqual(data['scope'], 'difficulty')
+        self.assertEqual(data['ranking'], 3)
+        self.assertEqual([i['id'] for i in data['top_n']],
+                         [self.instances[m].id for m in (2, 3, 4, 5, 6)])
+
+    def test_ranking_can_be_scoped_by_puzzle(self):
+        data = self.get_leaderboard(5, '?scope=puzzle')
+        self.assertEqual(data['ranking'], 1)
+        self.assertEqual(len(data['top_n']), 3)
+
+    def test_ranking_can_be_global(self):
+        data = self.get_leaderboard(5, '?scope=global')
+        self.assertEqual(data['ranking'], 4)
+
+    def test_neighbouring_instances_are_returned(self):
+        data = self.get_leaderboard(4, '?around=1&top_n=1')
+        self.assertEqual(len(data['top_n']), 1)
+        self.assertEqual(data['above'][0]['id'], self.instances[3].id)
+        self.assertEqual(data['below'][0]['id'], self.instances[5].id)
+
+    def test_incomplete_instance_does_not_rank(self):
+        now = timezone.now()
+        PuzzleInstance.objects.create(
+            puzzle=self.easy_1,
+            owner=PlayerProfile.objects.create(nickname='claimant'),
+            grid='-' * 81,
+            started_on=now - timedelta(seconds=1),
+            completed_at=now,
+        )
+        data = self.get_leaderboard(2)
+        self.assertEqual(data['ranking'], 0)
+        self.assertEqual(data['above'], [])
+
+    def test_instances_with_the_same_time_are_neighbours(self):
+        tied = PuzzleInstance.objects.create(
+            puzzle=self.easy_1,
+            owner=PlayerProfile.objects.create(nickname='tied'),
+            grid='1' * 81,
+            started_on=self.instances[4].started_on,
+            completed=True,
+            completed_at=self.instances[4].completed_at,
+        )
+        data = self.get_leaderboard(4, '?around=1')
+        self.assertEqual(data['ranking'], 2)
+        self.assertEqual(data['above'][0]['id'], self.instances[3].id)
+        self.assertEqual(data['below'][0]['id'], tied.id)
+        data = self.client.get(f'{self.ROOT_URL}{tied.id}/?around=1').data
+        self.assertEqual(data['ranking'], 2)
+        self.assertEqual(data['above'][0]['id'], self.instances[4].id)
+        self.assertEqual(data['below'][0]['id'], self.instances[5].id)
+
+    def test_instances_follow_a_change_of_puzzle_difficulty(self):
+        self.easy_2.difficulty = 2
+        self.easy_2.save()
+        data = self.get_leaderboard(2)
+        self.assertEqual(data['ranking'], 1)
+        self.assertEqual([i['id'] for i in data['top_n']],
+                         [self.instances[m].id for m in (1, 2, 4)])
+
+    def test_unknown_scope_returns_400(self):
+        response = self.client.get(
+            f'{self.ROOT_URL}{self.instances[1].id}/?scope=galaxy')
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_instance_returns_404(self):
+        response = self.client.get(f'{self.ROOT_URL}99999/')
+        self.assertEqual(response.status_code, 404)
+
+
+class TestCreatePuzzleInstanceView(APITestCase):
+
+    ROOT_URL = '/api/create_puzzle_instance/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(
+            username='test_admin',
+            password='top_secret',
+        )
+        cls.puzzle = SudokuPuzzle.objects.create(
+            grid=PUZZLE, created_by=cls.admin_user, difficulty=0)
+        SudokuPuzzle.objects.filter(id=cls.puzzle.id).update(
+            created_on=timezone.now() - timedelta(days=1))
+        cls.profile = PlayerProfile.objects.create(nickname='joe')
+
+    def setUp(self):
+        self.client.cookies[settings.PLAYER_PROFILE_COOKIE] = self.profile.uuid
+
+    def tearDown(self):
+        cache.clear()
+
+    def submit(self, grid, started_on=None, completed_at=None):
+        now = timezone.now()
+        started_on = started_on or now - timedelta(minutes=5)
+        completed_at = completed_at or now
+        return self.client.post(self.ROOT_URL, {
+            'puzzle': self.puzzle.id,
+            'grid': grid,
+            'started_on': started_on.isoformat(),
+            'completed_at': completed_at.isoformat(),
+            'completed': 'true',
+        })
+
+    def test_solved_puzzle_is_accepted(self):
+        response = self.submit(SOLUTION)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(PuzzleInstance.objects.get().owner, self.profile)
+
+    def test_incorrect_solution_is_rejected(self):
+        response = self.submit(SOLUTION[1] + SOLUTION[0] + SOLUTION[2:])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('grid', response.data)
+        self.assertFalse(PuzzleInstance.objects.exists())
+
+    def test_impossible_times_are_rejected(self):
+        now = timezone.now()
+        for started_on, completed_at in [
+                (now, now - timedelta(minutes=1)),
+                (now, now + timedelta(hours=1)),
+                (now - timedelta(days=2), now)]:
+            response = self.submit(SOLUTION, started_on, completed_at)
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(PuzzleInstance.objects.exists())
+
+    def test_cached_solution_is_refreshed_when_the_puzzle_changes(self):
+        self.assertEqual(self.submit(SOLUTION).status_code, 201)
+        puzzle = SudokuPuzzle.objects.get(id=self.puzzle.id)
+        puzzle.grid = HARD_PUZZLE
+        with self.captureOnCommitCallbacks(execute=True):
+            puzzle.save()
+        self.assertEqual(self.submit(SOLUTION).status_code, 400)
+        self.assertEqual(self.submit(solve(HARD_PUZZLE)).status_code, 201)
+
+
+class TestSudokuPuzzlesListView(APITestCase):
+
+    ROOT_URL = '/api/sudoku_puzzles/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(
+            username='test_admin',
+            password='top_secret',
+        )
+
+    def setUp(self):
+        self.client.login(username='test_admin', password='top_secret')
+
+    def tearDown(self):
+        self.client.logout()
+        cache.clear()
+
+    def test_puzzle_with_unique_solution_is_created(self):
+        response = self.client.post(
+            self.ROOT_URL, {'grid': PUZZLE, 'difficulty': 0})
+        self.assertEqual(response.status_code, 201)
+
+    def test_puzzle_without_unique_solution_is_rejected(self):
+        for grid in ['-' * 81, '11' + '-' * 79, 'x' * 81]:
+            response = self.client.post(
+                self.ROOT_URL, {'grid': grid, 'difficulty': 0})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('grid', response.data)
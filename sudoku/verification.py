@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .solver import is_valid_solution, solve
+
+
+def _cache_key(puzzle_id):
+    return f'sudoku_solution_{puzzle_id}'
+
+
+def get_solution(puzzle):
+    """
+    Returns the cached solution of a puzzle, solving it the first time it is
+    needed, or None if it has no solution.
+    """
+    key = _cache_key(puzzle.id)
+    solution = cache.get(key)
+    if solution is None:
+        try:
+            solution = solve(puzzle.grid) or ''
+        except ValueError:
+            solution = ''
+        cache.set(key, solution, settings.PUZZLE_SOLUTION_CACHE_TIMEOUT)
+    return solution or None
+
+
+def invalidate_solution(puzzle_id):
+    cache.delete(_cache_key(puzzle_id))
+
+
+def is_solution(puzzle, grid):
+    """
+    Returns True if grid solves the puzzle. It is compared with the cached
+    solution first, and only checked against the rules if they differ, which
+    matters only for the few puzzles with more than one solution.
+    """
+    if grid == get_solution(puzzle):
+        return True
+    return is_valid_solution(puzzle.grid, grid)
@@ -1,16 +1,20 @@
 from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
 from django.conf import settings
 from rest_framework import status, generics, permissions, filters
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
-from random import choice
 from .models import SudokuPuzzle, PuzzleInstance
-from player_profile.models import PlayerProfile
-from usage_stats.models import SudokuPuzzleRequest
+from player_profile.utils import get_request_profile
+from usage_stats.event_sink import record_sudoku_request
 from .serializers import SudokuPuzzleSerializer, PuzzleInstanceSerializer
+from .puzzle_pool import difficulty_pools
+from fruzzled_backend.counters import increment
+from fruzzled_backend.leaderboards import get_leaderboard, get_int_param
 from fruzzled_backend.permissions import IsOwnerOrReadOnly, HasPlayerProfileCookie
 
+import random
 from datetime import datetime
 
 
@@ -43,42 +47,58 @@ class CreatePuzzleInstance(generics.CreateAPIView):
     authentication_classes = []
 
     def perform_create(self, serializer):
-        request = self.request
-        profile_cookie = request.COOKIES.get(settings.PLAYER_PROFILE_COOKIE,'')
-        profile = PlayerProfile.objects.filter(uuid=profile_cookie).first()
-        serializer.save(owner=profile)
+        serializer.save(owner=get_request_profile(self.request))
 
 
 class GetRandomPuzzle(APIView):
+    """
+    Returns a random puzzle of the requested difficulty that is not in the
+    comma-separated used_puzzles query parameter.
+
+    The choice is made from an in-memory pool of the ids of each difficulty,
+    so only the chosen puzzle is read from the database, however large the
+    catalogue grows.
+
+    The optional min_score and max_score query parameters narrow the choice
+    to puzzles whose difficulty_score lies in that band. Those are chosen
+    in the database, by counting the band on the (difficulty,
+    difficulty_score) index and reading the puzzle at a random offset.
+    """
     http_method_names = ['get']
 
     def get(self, request, difficulty):
-        choices = SudokuPuzzle.objects.filter(difficulty=difficulty)
-        if choices:
-            query = request.GET['used_puzzles'] if request.GET else None
-            seen_puzzles = query.split(',') if query else []
-            filtered_choices = choices.exclude(id__in=seen_puzzles)
+        query = request.GET.get('used_puzzles')
+        seen_puzzles = [int(id) for id in query.split(',')
+                        if id.isdigit()] if query else []
+
+        if 'min_score' in request.GET or 'max_score' in request.GET:
+            try:
+                min_score = int(request.GET.get('min_score', 0))
+                max_score = int(request.GET.get('max_score', 10 ** 6))
+            except ValueError:
+                return Response(
+                    status=status.HTTP_400_BAD_REQUEST,
+                    data={'message': 'min_score and max_score should be '
+                                     'integers'}
+                )
+            puzzle = self.choose_in_band(
+                difficulty, min_score, max_score, seen_puzzles)
+        else:
+            puzzle = self.choose_from_pool(difficulty, seen_puzzles)
 
-            # Choose a puzzle at random if any unseen puzzles remain, otherwise
-            # return the first puzzle in the seen_puzzles list, the least
-            # recently seen puzzle.
-            if filtered_choices:
-                puzzle = choice(filtered_choices)
-            elif seen_puzzles:
-                puzzle = SudokuPuzzle.objects.get(id=seen_puzzles[0])
-            
+        if puzzle:
             serializer = SudokuPuzzleSerializer(
                     puzzle,
                     context={'request': request})
+            increment(SudokuPuzzle, puzzle.id, 'instances_created')
             puzzle.instances_created += 1
-            puzzle.save()
 
             # Record the sudoku puzzle request by the player
             profile_cookie = request.COOKIES.get(settings.PLAYER_PROFILE_COOKIE, None)
-            SudokuPuzzleRequest.objects.create(
-                puzzle=puzzle,
+            record_sudoku_request(
+                puzzle_id=puzzle.id,
                 difficulty=puzzle.difficulty,
-                player_uuid = profile_cookie
+                player_uuid=profile_cookie
             )
 
             return Response(serializer.data)
@@ -88,26 +108,99 @@ class GetRandomPuzzle(APIView):
                 data={'message': ('No puzzles at that difficulty level in DB')}
             )
 
+    def choose_from_pool(self, difficulty, seen_puzzles):
+        pool = difficulty_pools.get(difficulty)
+
+        # The pool can briefly be out of date if another process has deleted
+        # a puzzle, so reload it and choose again if the chosen puzzle is
+        # no longer available.
+        puzzle = None
+        for _ in range(2):
+            if pool is None or len(pool) == 0:
+                break
+
+            # Choose a puzzle at random if any unseen puzzles remain, otherwise
+            # return the first puzzle in the seen_puzzles list, the least
+            # recently seen puzzle.
+            puzzle_id = pool.choose(exclude=seen_puzzles)
+            if puzzle_id is None:
+                puzzle_id = seen_puzzles[0]
+            puzzle = SudokuPuzzle.objects.select_related('created_by') \
+                .filter(id=puzzle_id).first()
+            if puzzle:
+                break
+            pool.invalidate()
+        return puzzle
+
+    def choose_in_band(self, difficulty, min_score, max_score, seen_puzzles):
+        band = SudokuPuzzle.objects.select_related('created_by').filter(
+            difficulty=difficulty,
+            difficulty_score__gte=min_score,
+            difficulty_score__lte=max_score,
+        ).order_by('difficulty_score', 'id')
+
+        unseen = band.exclude(id__in=seen_puzzles)
+        count = unseen.count()
+        if count:
+            return unseen[random.randrange(count)]
+
+        # As with the pool, the least recently seen puzzle if all are seen
+        seen_in_band = {puzzle.id: puzzle
+                        for puzzle in band.filter(id__in=seen_puzzles)}
+        return next((seen_in_band[id] for id in seen_puzzles
+                     if id in seen_in_band), None)
+
 
 class GetLeaderboard(APIView):
     '''
-    A view that returns this instances position in the rankings for its 
-    puzzle, the top 5 in the rankings, and the instance itself)
+    A view that returns this instances position in the rankings, the top n
+    in the rankings, the instances either side of it, and the instance
+    itself.
+
+    The rankings are scoped by the 'scope' query parameter: 'difficulty'
+    (the default) ranks against all puzzles of the same difficulty, 'puzzle'
+    against the same puzzle only, and 'global' against every puzzle. The
+    'top_n' and 'around' parameters set the number of leading and
+    neighbouring instances returned. Only completed instances, whose grids
+    were checked against the solution when they were created, are ranked.
     '''
 
+    scopes = ['difficulty', 'puzzle', 'global']
+
     def get(self, request, instance_id):
-        instance = PuzzleInstance.objects.filter(id=instance_id).first()
-        index = PuzzleInstance.objects.filter(time_taken__lt=instance.time_taken).count()
-        rankings = PuzzleInstance.objects.order_by('time_taken')[:5]
-        
-        top_n_serializer = PuzzleInstanceSerializer(
-            rankings, many=True
+        instance = get_object_or_404(
+            PuzzleInstance.objects.select_related('owner', 'puzzle'),
+            id=instance_id)
+        scope = request.GET.get('scope', 'difficulty')
+        if scope not in self.scopes:
+            return Response(
+                status=status.HTTP_400_BAD_REQUEST,
+                data={'message': f'scope should be one of {self.scopes}'}
+            )
+
+        queryset = PuzzleInstance.objects.select_related('owner', 'puzzle') \
+            .filter(completed=True)
+        if scope == 'difficulty':
+            queryset = queryset.filter(difficulty=instance.difficulty)
+        elif scope == 'puzzle':
+            queryset = queryset.filter(puzzle=instance.puzzle_id)
+
+        leaderboard = get_leaderboard(
+            queryset,
+            instance,
+            top_n=get_int_param(request, 'top_n', 5, 50),
+            around=get_int_param(request, 'around', 2, 25),
         )
-        instance_serializer = PuzzleInstanceSerializer(instance)
         data = {
-            'puzzle_instance': instance_serializer.data,
-            'ranking': index,
-            'top_n': top_n_serializer.data
+            'puzzle_instance': PuzzleInstanceSerializer(instance).data,
+            'scope': scope,
+            'ranking': leaderboard['ranking'],
+            'top_n': PuzzleInstanceSerializer(
+                leaderboard['top_n'], many=True).data,
+            'above': PuzzleInstanceSerializer(
+                leaderboard['above'], many=True).data,
+            'below': PuzzleInstanceSerializer(
+                leaderboard['below'], many=True).data,
         }
 
-        return Response(data)
\ No newline at end of file
+        return Response(data)
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import SudokuPuzzleRequest
+from .models import SudokuPuzzleRequest, RequestRollup
 
 
 admin.site.register(SudokuPuzzleRequest)
+admin.site.register(RequestRollup)
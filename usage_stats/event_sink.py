@@ -0,0 +1,167 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import SudokuPuzzleRequest, CrosswordPuzzleRequest
+from .rollups import add_events
+
+logger = logging.getLogger(__name__)
+
+
+def store_events(model, events):
+    """
+    Writes a list of unsaved request log rows with one bulk INSERT, and adds
+    them to the hourly and daily rollups in the same transaction.
+    """
+    with transaction.atomic():
+        model.objects.bulk_create(
+            events, batch_size=settings.USAGE_STATS_BATCH_SIZE)
+        add_events(model, events)
+
+
+class RequestEventSink:
+    """
+    Takes request log rows off the request path. Rows are put on a bounded
+    in-memory queue and written by a background thread, one bulk_create per
+    model per batch, once batch_size rows are waiting or flush_interval
+    seconds have passed. Whatever is still queued is written when the
+    process exits.
+
+    If the queue is full the row is dropped and counted, rather than making
+    the player wait on the database. A batch that cannot be written is split
+    up and retried, so only the rows that fail on their own are lost.
+
+    With buffering off (as in tests), each row is written immediately.
+    """
+
+    def __init__(self, buffering, max_queue, batch_size, flush_interval):
+        self.buffering = buffering
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._pid = None
+        self._queue = None
+        self._thread = None
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+
+    def record(self, model, **fields):
+        event = model(created_on=timezone.now(), **fields)
+        if not self.buffering:
+            store_events(model, [event])
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(
+                    'Usage stats queue full, %s events dropped', self.dropped)
+
+    def flush(self):
+        """ Writes every queued event now, in the calling thread """
+        if self._queue is None or self._pid != os.getpid():
+            return
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self._write(batch)
+
+    def _ensure_started(self):
+        # The sink is started lazily, and again in each forked worker
+        # process, since threads do not survive a fork.
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.max_queue)
+                self._thread = threading.Thread(
+                    target=self._run, name='usage-stats-sink', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._write(batch)
+            close_old_connections()
+
+    def _write(self, batch):
+        if not batch:
+            return
+        by_model = {}
+        for event in batch:
+            by_model.setdefault(type(event), []).append(event)
+        with self._write_lock:
+            for model, events in by_model.items():
+                dropped = self._store(model, events)
+                if dropped:
+                    logger.error('Could not write %s of %s usage stats events',
+                                 dropped, len(events))
+
+    def _store(self, model, events):
+        """
+        Writes events, and returns the number that could not be written. If
+        the batch fails it is split in half and each half tried again, so
+        that only the rows that fail on their own are dropped.
+        """
+        try:
+            store_events(model, events)
+            return 0
+        except Exception:
+            if len(events) == 1:
+                logger.exception('Could not write usage stats event')
+                return 1
+        # Ids given to the rows by the rolled back insert are cleared first
+        for event in events:
+            event.pk = None
+        middle = len(events) // 2
+        return (self._store(model, events[:middle]) +
+                self._store(model, events[middle:]))
+
+
+event_sink = RequestEventSink(
+    buffering=settings.USAGE_STATS_BUFFERING,
+    max_queue=settings.USAGE_STATS_MAX_QUEUE,
+    batch_size=settings.USAGE_STATS_BATCH_SIZE,
+    flush_interval=settings.USAGE_STATS_FLUSH_INTERVAL,
+)
+atexit.register(event_sink.flush)
+
+
+def record_sudoku_request(puzzle_id, difficulty, player_uuid):
+    event_sink.record(
+        SudokuPuzzleRequest,
+        puzzle_id=puzzle_id,
+        difficulty=difficulty,
+        player_uuid=player_uuid,
+    )
+
+
+def record_crossword_request(puzzle_id, player_uuid):
+    event_sink.record(
+        CrosswordPuzzleRequest,
+        puzzle_id=puzzle_id,
+        player_uuid=player_uuid,
+    )
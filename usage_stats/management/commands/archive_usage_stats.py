@@ -0,0 +1,52 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from usage_stats.models import RequestRollup
+from usage_stats.retention import archive_requests
+from usage_stats.rollups import PUZZLE_TYPES, truncate
+
+
+class Command(BaseCommand):
+    help = ('Roll request log rows older than the retention period into the '
+            'usage rollups, then delete them, optionally archiving them to '
+            'gzipped JSONL or CSV files first.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.USAGE_STATS_RETENTION_DAYS,
+            help='number of days of request rows to keep')
+        parser.add_argument(
+            '--archive-dir', default=settings.USAGE_STATS_ARCHIVE_DIR,
+            help='directory to write archived rows to, default none')
+        parser.add_argument(
+            '--format', choices=['jsonl', 'csv'], default='jsonl',
+            help='archive file format')
+        parser.add_argument(
+            '--chunk-size', type=int, default=10000,
+            help='rows to archive and delete at a time')
+
+    def handle(self, *args, **kwargs):
+        if kwargs['days'] < 1:
+            raise CommandError('--days should be at least 1')
+        now = timezone.now()
+        # Cut at a day boundary, so that no daily rollup is left covering
+        # both archived and live rows
+        cutoff = truncate(now - timedelta(days=kwargs['days']),
+                          RequestRollup.DAY)
+
+        for model in PUZZLE_TYPES:
+            started = time.monotonic()
+            total = 0
+            for rows, path in archive_requests(
+                    model, cutoff, kwargs['archive_dir'], kwargs['format'],
+                    kwargs['chunk_size']):
+                total += rows
+                if path:
+                    self.stdout.write(f'{rows} rows archived to {path}')
+            self.stdout.write(
+                f'{model.__name__}: {total} rows before {cutoff:%Y-%m-%d} '
+                f'removed in {time.monotonic() - started:.1f}s')
@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand
+
+from usage_stats.rollups import PUZZLE_TYPES, rebuild_rollups
+
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+
+
+class Command(BaseCommand):
+    help = ('Rebuild the hourly and daily usage rollups from the request '
+            'log tables. Best run while traffic is quiet, since requests '
+            'logged during the rebuild may not be counted.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start', type=parse_date,
+            help='first day to rebuild (YYYY-MM-DD), default the oldest row')
+        parser.add_argument(
+            '--end', type=parse_date,
+            help='day to stop rebuilding before (YYYY-MM-DD), default none')
+
+    def handle(self, *args, **kwargs):
+        for model in PUZZLE_TYPES:
+            written = rebuild_rollups(model, kwargs['start'], kwargs['end'])
+            self.stdout.write(
+                f'{model.__name__}: {written} rollup rows written')
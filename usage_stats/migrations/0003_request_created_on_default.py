@@ -0,0 +1,24 @@
+# Generated by Django 4.2 on 2026-10-18 15:11
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usage_stats', '0002_crosswordpuzzlerequest'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='crosswordpuzzlerequest',
+            name='created_on',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='sudokupuzzlerequest',
+            name='created_on',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
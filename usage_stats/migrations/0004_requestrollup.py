@@ -0,0 +1,36 @@
+# Generated by Django 4.2 on 2026-10-18 15:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usage_stats', '0003_request_created_on_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('puzzle_type', models.CharField(choices=[('SDKU', 'Sudoku'), ('CSWD', 'Crossword')], max_length=4)),
+                ('difficulty', models.IntegerField(default=0)),
+                ('granularity', models.CharField(choices=[('H', 'Hour'), ('D', 'Day')], max_length=1)),
+                ('bucket', models.DateTimeField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='crosswordpuzzlerequest',
+            index=models.Index(fields=['created_on'], name='usage_stats_created_104d5f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sudokupuzzlerequest',
+            index=models.Index(fields=['created_on'], name='usage_stats_created_524830_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='requestrollup',
+            constraint=models.UniqueConstraint(fields=('granularity', 'puzzle_type', 'bucket', 'difficulty'), name='unique_request_rollup_bucket'),
+        ),
+    ]
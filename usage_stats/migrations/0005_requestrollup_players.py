@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 15:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usage_stats', '0004_requestrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='requestrollup',
+            name='players',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
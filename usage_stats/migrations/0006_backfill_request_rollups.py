@@ -0,0 +1,80 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncHour
+
+# The sketches are written with the current HyperLogLog rather than a
+# frozen copy, since they must be in the format the current code reads.
+from usage_stats.hyperloglog import HyperLogLog
+
+# A frozen copy of usage_stats.rollups.rebuild_rollups as it stood when
+# this migration was written, rebuilding every bucket from the request log
+# rows, so that StatsSummary counts requests logged before the rollups and
+# their player sketches were added.
+HOUR = 'H'
+DAY = 'D'
+
+REQUEST_MODELS = (
+    ('SudokuPuzzleRequest', 'SDKU', True),
+    ('CrosswordPuzzleRequest', 'CSWD', False),
+)
+
+
+def rebuild(model, RequestRollup, puzzle_type, has_difficulty):
+    oldest = model.objects.order_by('created_on') \
+        .values_list('created_on', flat=True).first()
+    if oldest is None:
+        return
+    start = oldest.replace(hour=0, minute=0, second=0, microsecond=0)
+    rows = model.objects.filter(created_on__gte=start)
+    fields = ['bucket', 'difficulty'] if has_difficulty else ['bucket']
+
+    sketches = {}
+    hourly_players = rows.exclude(player_uuid=None) \
+        .annotate(bucket=TruncHour('created_on')) \
+        .values_list(*fields, 'player_uuid').distinct().order_by()
+    for row in hourly_players.iterator(chunk_size=10000):
+        bucket, difficulty = row[0], row[1] if has_difficulty else 0
+        sketches.setdefault((HOUR, difficulty, bucket),
+                            HyperLogLog()).add(row[-1])
+    for (_, difficulty, bucket), sketch in list(sketches.items()):
+        day = bucket.replace(hour=0)
+        sketches.setdefault((DAY, difficulty, day), HyperLogLog()) \
+            .merge(sketch)
+
+    new_rollups = []
+    for granularity, trunc in ((HOUR, TruncHour), (DAY, TruncDay)):
+        buckets = rows.annotate(bucket=trunc('created_on'))
+        for row in buckets.values(*fields).annotate(count=Count('id')) \
+                          .order_by():
+            difficulty = row.get('difficulty', 0)
+            sketch = sketches.get((granularity, difficulty, row['bucket']))
+            new_rollups.append(RequestRollup(
+                puzzle_type=puzzle_type,
+                difficulty=difficulty,
+                granularity=granularity,
+                bucket=row['bucket'],
+                count=row['count'],
+                players=(sketch or HyperLogLog()).to_bytes(),
+            ))
+
+    RequestRollup.objects.filter(
+        puzzle_type=puzzle_type, bucket__gte=start).delete()
+    RequestRollup.objects.bulk_create(new_rollups, batch_size=1000)
+
+
+def backfill_rollups(apps, schema_editor):
+    RequestRollup = apps.get_model('usage_stats', 'RequestRollup')
+    for model_name, puzzle_type, has_difficulty in REQUEST_MODELS:
+        model = apps.get_model('usage_stats', model_name)
+        rebuild(model, RequestRollup, puzzle_type, has_difficulty)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usage_stats', '0005_requestrollup_players'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
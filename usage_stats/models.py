@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from sudoku.models import SudokuPuzzle
 from crosswords.models import CrosswordPuzzle
 
@@ -6,10 +7,15 @@ class SudokuPuzzleRequest(models.Model):
     """Class represents a sudoku puzzle request by a player"""
 
     puzzle = models.ForeignKey(SudokuPuzzle, on_delete=models.CASCADE)
-    created_on = models.DateTimeField(auto_now_add=True)
+    created_on = models.DateTimeField(default=timezone.now, editable=False)
     player_uuid = models.CharField(max_length=256, null=True, blank=True)
     difficulty = models.IntegerField(default=0)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_on']),
+        ]
+
     def __str__(self):
         return f'Puzzle {self.puzzle.id} created on {self.created_on}'
     
@@ -18,12 +24,56 @@ class CrosswordPuzzleRequest(models.Model):
     """Class represents a crossword puzzle request by a player"""
 
     puzzle = models.ForeignKey(CrosswordPuzzle, on_delete=models.CASCADE)
-    created_on = models.DateTimeField(auto_now_add=True)
+    created_on = models.DateTimeField(default=timezone.now, editable=False)
     player_uuid = models.CharField(max_length=256, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_on']),
+        ]
+
     def __str__(self):
         return f'Puzzle {self.puzzle.id} created on {self.created_on}'
 
 
+class RequestRollup(models.Model):
+    """
+    Class represents the number of puzzle requests of one puzzle type and
+    difficulty (always 0 for crosswords) in one hourly or daily bucket,
+    kept up to date as requests are logged, and a HyperLogLog sketch of the
+    players who made them.
+    """
 
+    SUDOKU = 'SDKU'
+    CROSSWORD = 'CSWD'
+    PUZZLE_TYPES = (
+        (SUDOKU, 'Sudoku'),
+        (CROSSWORD, 'Crossword'),
+    )
 
+    HOUR = 'H'
+    DAY = 'D'
+    GRANULARITIES = (
+        (HOUR, 'Hour'),
+        (DAY, 'Day'),
+    )
+
+    puzzle_type = models.CharField(max_length=4, choices=PUZZLE_TYPES)
+    difficulty = models.IntegerField(default=0)
+    granularity = models.CharField(max_length=1, choices=GRANULARITIES)
+    bucket = models.DateTimeField()
+    count = models.IntegerField(default=0)
+    players = models.BinaryField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['granularity', 'puzzle_type', 'bucket', 'difficulty'],
+                name='unique_request_rollup_bucket',
+            )
+        ]
+
+    def __str__(self):
+        return (f'{self.get_puzzle_type_display()} ({self.difficulty}) '
+                f'{self.get_granularity_display()} from {self.bucket}: '
+                f'{self.count}')
@@ -0,0 +1,71 @@
+import csv
+import gzip
+import json
+import os
+
+from django.db import transaction
+
+from .rollups import rebuild_rollups
+
+ARCHIVE_FIELDS = ['id', 'puzzle_id', 'created_on', 'player_uuid', 'difficulty']
+
+
+def archive_requests(model, cutoff, archive_dir=None, file_format='jsonl',
+                     chunk_size=10000):
+    """
+    Moves the request log rows of model created before cutoff out of the
+    database, a chunk at a time. The rollups for the range are rebuilt
+    first, so that the counts of the removed rows live on in them.
+
+    If an archive_dir is given, each chunk is written to its own gzipped
+    JSONL or CSV file there before its rows are deleted, so that an
+    interrupted run loses nothing. Yields (rows, path) for each chunk,
+    path being None if nothing was written.
+    """
+    rebuild_rollups(model, end=cutoff)
+    fields = [field for field in ARCHIVE_FIELDS if hasattr(model, field)]
+    old_rows = model.objects.filter(created_on__lt=cutoff).order_by('id')
+    if archive_dir:
+        os.makedirs(archive_dir, exist_ok=True)
+
+    last_id = 0
+    while True:
+        rows = list(old_rows.filter(id__gt=last_id)
+                    .values_list(*fields)[:chunk_size])
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        path = None
+        if archive_dir:
+            path = os.path.join(
+                archive_dir,
+                f'{model._meta.db_table}_{rows[0][0]}_{last_id}'
+                f'.{file_format}.gz')
+            _write_chunk(path, fields, rows, file_format)
+        with transaction.atomic():
+            model.objects.filter(id__gte=rows[0][0], id__lte=last_id,
+                                 created_on__lt=cutoff).delete()
+        yield len(rows), path
+
+
+def _write_chunk(path, fields, rows, file_format):
+    # Written to a temporary name first, so that a complete file is never
+    # confused with a partial one.
+    partial = path + '.partial'
+    with gzip.open(partial, 'wt', newline='') as outfile:
+        if file_format == 'csv':
+            writer = csv.writer(outfile)
+            writer.writerow(fields)
+            for row in rows:
+                writer.writerow(_serializable(row))
+        else:
+            for row in rows:
+                outfile.write(
+                    json.dumps(dict(zip(fields, _serializable(row)))) + '\n')
+    os.replace(partial, path)
+
+
+def _serializable(row):
+    return [value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in row]
+
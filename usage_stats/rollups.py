@@ -0,0 +1,214 @@
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDay, TruncHour
+
+from .hyperloglog import HyperLogLog
+from .models import SudokuPuzzleRequest, CrosswordPuzzleRequest, RequestRollup
+
+# The puzzle type under which each request log model is rolled up
+PUZZLE_TYPES = {
+    SudokuPuzzleRequest: RequestRollup.SUDOKU,
+    CrosswordPuzzleRequest: RequestRollup.CROSSWORD,
+}
+
+
+def truncate(moment, granularity):
+    """ Returns the start of the hourly or daily bucket containing moment """
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == RequestRollup.DAY:
+        moment = moment.replace(hour=0)
+    return moment
+
+
+def next_hour(moment):
+    """ Returns the first hour boundary at or after moment """
+    start = truncate(moment, RequestRollup.HOUR)
+    return start if start == moment else start + timedelta(hours=1)
+
+
+def next_day(moment):
+    """ Returns the first day boundary at or after moment """
+    start = truncate(moment, RequestRollup.DAY)
+    return start if start == moment else start + timedelta(days=1)
+
+
+def add_events(model, events):
+    """
+    Adds a batch of newly logged requests to the hourly and daily rollups,
+    with one UPDATE ... SET count = count + n per bucket touched, merging
+    the players of the batch into each bucket's sketch. Should be called in
+    the same transaction as the insert of the events.
+    """
+    puzzle_type = PUZZLE_TYPES[model]
+    buckets = {}
+    for event in events:
+        difficulty = getattr(event, 'difficulty', 0)
+        for granularity in (RequestRollup.HOUR, RequestRollup.DAY):
+            key = (granularity, difficulty,
+                   truncate(event.created_on, granularity))
+            count, players = buckets.setdefault(key, [0, set()])
+            buckets[key][0] = count + 1
+            if event.player_uuid:
+                players.add(event.player_uuid)
+    for (granularity, difficulty, bucket), (count, players) \
+            in buckets.items():
+        _add_to_bucket(puzzle_type, difficulty, granularity, bucket, count,
+                       players)
+
+
+def _add_to_bucket(puzzle_type, difficulty, granularity, bucket, count,
+                   players):
+    rollups = RequestRollup.objects.filter(
+        puzzle_type=puzzle_type,
+        difficulty=difficulty,
+        granularity=granularity,
+        bucket=bucket,
+    )
+    if not players:
+        if rollups.update(count=F('count') + count):
+            return
+    else:
+        # The sketch has to be read to be merged, so the row is locked
+        rollup = rollups.select_for_update().only('players').first()
+        if rollup is not None:
+            sketch = HyperLogLog.from_bytes(rollup.players)
+            sketch.update(players)
+            rollups.update(count=F('count') + count,
+                           players=sketch.to_bytes())
+            return
+
+    sketch = HyperLogLog()
+    sketch.update(players)
+    try:
+        with transaction.atomic():
+            RequestRollup.objects.create(
+                puzzle_type=puzzle_type,
+                difficulty=difficulty,
+                granularity=granularity,
+                bucket=bucket,
+                count=count,
+                players=sketch.to_bytes(),
+            )
+    except IntegrityError:
+        # Another process created the bucket first
+        _add_to_bucket(puzzle_type, difficulty, granularity, bucket, count,
+                       players)
+
+
+def rebuild_rollups(model, start=None, end=None):
+    """
+    Recomputes the rollups of one request log model from its rows, for the
+    buckets from start (rounded down to a day) up to end (rounded up to a
+    day). start defaults to the day of the oldest row, so that buckets for
+    rows that have since been archived are left alone, and end to no limit.
+
+    Returns the number of rollup rows written.
+    """
+    puzzle_type = PUZZLE_TYPES[model]
+    rows = model.objects.all()
+    if start is None:
+        oldest = rows.order_by('created_on').values_list(
+            'created_on', flat=True).first()
+        if oldest is None:
+            return 0
+        start = oldest
+    start = truncate(start, RequestRollup.DAY)
+    rows = rows.filter(created_on__gte=start)
+    rollups = RequestRollup.objects.filter(
+        puzzle_type=puzzle_type, bucket__gte=start)
+    if end is not None:
+        day_start = truncate(end, RequestRollup.DAY)
+        end = day_start if day_start == end else day_start + timedelta(days=1)
+        rows = rows.filter(created_on__lt=end)
+        rollups = rollups.filter(bucket__lt=end)
+
+    difficulty = 'difficulty' if model is SudokuPuzzleRequest else None
+    fields = ['bucket', difficulty] if difficulty else ['bucket']
+
+    # The sketches are built from the distinct players of each hour, and
+    # the daily sketches by merging the hourly ones.
+    sketches = {}
+    hourly_players = rows.exclude(player_uuid=None) \
+        .annotate(bucket=TruncHour('created_on')) \
+        .values_list(*fields, 'player_uuid').distinct().order_by()
+    for row in hourly_players.iterator(chunk_size=10000):
+        bucket, row_difficulty = row[0], row[1] if difficulty else 0
+        sketches.setdefault((RequestRollup.HOUR, row_difficulty, bucket),
+                            HyperLogLog()).add(row[-1])
+    for (_, row_difficulty, bucket), sketch in list(sketches.items()):
+        day = (RequestRollup.DAY, row_difficulty,
+               truncate(bucket, RequestRollup.DAY))
+        sketches.setdefault(day, HyperLogLog()).merge(sketch)
+
+    new_rollups = []
+    for granularity, trunc in ((RequestRollup.HOUR, TruncHour),
+                               (RequestRollup.DAY, TruncDay)):
+        buckets = rows.annotate(bucket=trunc('created_on'))
+        for row in buckets.values(*fields).annotate(count=Count('id')) \
+                          .order_by():
+            row_difficulty = row.get('difficulty', 0)
+            sketch = sketches.get((granularity, row_difficulty, row['bucket']))
+            new_rollups.append(RequestRollup(
+                puzzle_type=puzzle_type,
+                difficulty=row_difficulty,
+                granularity=granularity,
+                bucket=row['bucket'],
+                count=row['count'],
+                players=(sketch or HyperLogLog()).to_bytes(),
+            ))
+
+    with transaction.atomic():
+        rollups.delete()
+        RequestRollup.objects.bulk_create(new_rollups, batch_size=1000)
+    return len(new_rollups)
+
+
+def count_players(windows):
+    """
+    Estimates the number of distinct players of each puzzle type since
+    each of the cutoffs in windows, a dict of window names to datetimes.
+    Returns a dict of (puzzle type, window name) to estimated counts.
+
+    Each window is covered by the daily sketches of its whole days, the
+    hourly sketches of the hours before the first of those, and the request
+    log rows in the part-hour at its start. The sketches and rows for all
+    the windows are read with one query each.
+    """
+    daily = Q(granularity=RequestRollup.DAY,
+              bucket__gte=next_day(min(windows.values())))
+    hourly = Q()
+    raw = Q()
+    for cutoff in windows.values():
+        hourly |= Q(granularity=RequestRollup.HOUR,
+                    bucket__gte=next_hour(cutoff),
+                    bucket__lt=next_day(cutoff))
+        raw |= Q(created_on__gte=cutoff, created_on__lt=next_hour(cutoff))
+
+    rollups = list(RequestRollup.objects.filter(daily | hourly)
+                   .exclude(players=None)
+                   .values_list('puzzle_type', 'granularity', 'bucket',
+                                'players'))
+    sketches = {}
+    for window, cutoff in windows.items():
+        for puzzle_type in PUZZLE_TYPES.values():
+            sketches[(puzzle_type, window)] = HyperLogLog()
+        for puzzle_type, granularity, bucket, players in rollups:
+            if granularity == RequestRollup.DAY:
+                covered = bucket >= next_day(cutoff)
+            else:
+                covered = next_hour(cutoff) <= bucket < next_day(cutoff)
+            if covered:
+                sketches[(puzzle_type, window)].merge(
+                    HyperLogLog.from_bytes(players))
+
+    for model, puzzle_type in PUZZLE_TYPES.items():
+        rows = model.objects.filter(raw).exclude(player_uuid=None) \
+            .values_list('created_on', 'player_uuid')
+        for created_on, player_uuid in rows.iterator():
+            for window, cutoff in windows.items():
+                if cutoff <= created_on < next_hour(cutoff):
+                    sketches[(puzzle_type, window)].add(player_uuid)
+
+    return {key: sketch.count() for key, sketch in sketches.items()}
@@ -0,0 +1,66 @@
+import os
+import queue
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from sudoku.models import SudokuPuzzle
+from usage_stats.event_sink import RequestEventSink
+from usage_stats.models import SudokuPuzzleRequest
+
+
+class TestRequestEventSink(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(
+            username='test_admin',
+            password='top_secret',
+        )
+        cls.puzzle = SudokuPuzzle.objects.create(
+            grid='-' * 81, created_by=cls.admin_user, difficulty=1)
+
+    def make_sink(self, buffering, max_queue=10):
+        sink = RequestEventSink(
+            buffering=buffering, max_queue=max_queue, batch_size=100,
+            flush_interval=60)
+        if buffering:
+            # Stand in for the background thread, so the test controls
+            # when the queue is written.
+            sink._pid = os.getpid()
+            sink._queue = queue.Queue(maxsize=max_queue)
+        return sink
+
+    def test_unbuffered_sink_writes_immediately(self):
+        sink = self.make_sink(buffering=False)
+        sink.record(SudokuPuzzleRequest, puzzle_id=self.puzzle.id,
+                    difficulty=1, player_uuid='abc')
+        self.assertEqual(SudokuPuzzleRequest.objects.count(), 1)
+
+    def test_buffered_events_are_written_on_flush(self):
+        sink = self.make_sink(buffering=True)
+        for _ in range(3):
+            sink.record(SudokuPuzzleRequest, puzzle_id=self.puzzle.id,
+                        difficulty=1, player_uuid='abc')
+        self.assertEqual(SudokuPuzzleRequest.objects.count(), 0)
+        sink.flush()
+        self.assertEqual(SudokuPuzzleRequest.objects.count(), 3)
+
+    def test_events_are_dropped_when_queue_is_full(self):
+        sink = self.make_sink(buffering=True, max_queue=2)
+        for _ in range(5):
+            sink.record(SudokuPuzzleRequest, puzzle_id=self.puzzle.id,
+                        difficulty=1, player_uuid='abc')
+        self.assertEqual(sink.dropped, 3)
+        sink.flush()
+        self.assertEqual(SudokuPuzzleRequest.objects.count(), 2)
+
+    def test_only_failing_events_are_dropped_from_a_batch(self):
+        sink = self.make_sink(buffering=True)
+        for difficulty in (1, 1, None, 1):
+            sink.record(SudokuPuzzleRequest, puzzle_id=self.puzzle.id,
+                        difficulty=difficulty, player_uuid='abc')
+        with self.assertLogs('usage_stats.event_sink') as logs:
+            sink.flush()
+        self.assertEqual(SudokuPuzzleRequest.objects.count(), 3)
+        self.assertIn('Could not write 1 of 4', logs.output[-1])
@@ -0,0 +1,39 @@
+from django.test import SimpleTestCase
+
+from usage_stats.hyperloglog import HyperLogLog
+
+
+class TestHyperLogLog(SimpleTestCase):
+
+    def test_empty_sketch_counts_zero(self):
+        self.assertEqual(HyperLogLog().count(), 0)
+        self.assertEqual(HyperLogLog.from_bytes(None).count(), 0)
+
+    def test_small_counts_are_close_to_exact(self):
+        sketch = HyperLogLog()
+        sketch.update(f'player-{i}' for i in range(50))
+        sketch.update(f'player-{i}' for i in range(50))
+        self.assertAlmostEqual(sketch.count(), 50, delta=2)
+
+    def test_large_counts_are_within_error(self):
+        sketch = HyperLogLog()
+        sketch.update(f'player-{i}' for i in range(20000))
+        self.assertAlmostEqual(sketch.count(), 20000, delta=20000 * 0.1)
+
+    def test_merged_sketch_counts_the_union(self):
+        first = HyperLogLog()
+        first.update(f'player-{i}' for i in range(0, 3000))
+        second = HyperLogLog()
+        second.update(f'player-{i}' for i in range(2000, 5000))
+        first.merge(second)
+        self.assertAlmostEqual(first.count(), 5000, delta=5000 * 0.1)
+
+    def test_sketch_survives_serialization(self):
+        sketch = HyperLogLog()
+        sketch.update(range(1000))
+        copy = HyperLogLog.from_bytes(sketch.to_bytes())
+        self.assertEqual(copy.count(), sketch.count())
+
+    def test_sketch_of_wrong_size_is_rejected(self):
+        with self.assertRaises(ValueError):
+            HyperLogLog.from_bytes(b'\x00' * 10)
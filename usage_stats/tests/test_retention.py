@@ -0,0 +1,80 @@
+import csv
+import gzip
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+from django.utils import timezone
+
+from sudoku.models import SudokuPuzzle
+from usage_stats.models import SudokuPuzzleRequest, RequestRollup
+
+
+class TestArchiveUsageStats(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(
+            username='test_admin',
+            password='top_secret',
+        )
+        cls.puzzle = SudokuPuzzle.objects.create(
+            grid='-' * 81, created_by=cls.admin_user, difficulty=1)
+
+    def setUp(self):
+        now = timezone.now()
+        SudokuPuzzleRequest.objects.bulk_create([
+            SudokuPuzzleRequest(puzzle=self.puzzle, difficulty=1,
+                                player_uuid=f'player-{i}',
+                                created_on=now - timedelta(days=days))
+            for i, days in enumerate([1, 2, 100, 120, 150])
+        ])
+        self.archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.archive_dir.cleanup)
+
+    def archive(self, *args):
+        call_command('archive_usage_stats', '--days=90', *args,
+                     stdout=StringIO())
+
+    def all_time_count(self):
+        return RequestRollup.objects.filter(
+            puzzle_type=RequestRollup.SUDOKU,
+            granularity=RequestRollup.DAY,
+        ).aggregate(total=Sum('count'))['total']
+
+    def test_old_rows_are_deleted_and_kept_in_rollups(self):
+        self.archive()
+        self.assertEqual(SudokuPuzzleRequest.objects.count(), 2)
+        self.assertEqual(self.all_time_count(), 3)
+
+    def test_old_rows_are_archived_in_chunks(self):
+        self.archive(f'--archive-dir={self.archive_dir.name}',
+                     '--chunk-size=2')
+        paths = sorted(os.listdir(self.archive_dir.name))
+        self.assertEqual(len(paths), 2)
+        self.assertTrue(all(path.endswith('.jsonl.gz') for path in paths))
+        rows = []
+        for path in paths:
+            with gzip.open(os.path.join(self.archive_dir.name, path),
+                           'rt') as infile:
+                rows.extend(json.loads(line) for line in infile)
+        self.assertEqual(sorted(row['player_uuid'] for row in rows),
+                         ['player-2', 'player-3', 'player-4'])
+        self.assertEqual(rows[0]['puzzle_id'], self.puzzle.id)
+        self.assertEqual(rows[0]['difficulty'], 1)
+
+    def test_old_rows_can_be_archived_as_csv(self):
+        self.archive(f'--archive-dir={self.archive_dir.name}',
+                     '--format=csv')
+        [path] = os.listdir(self.archive_dir.name)
+        with gzip.open(os.path.join(self.archive_dir.name, path),
+                       'rt') as infile:
+            rows = list(csv.DictReader(infile))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['puzzle_id'], str(self.puzzle.id))
@@ -1,7 +1,24 @@
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import Sum
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from django.core.cache import cache
 
+import json
+from datetime import datetime, timezone as dt_timezone
+
+from crosswords.models import CrosswordPuzzle, Grid
+from sudoku.models import SudokuPuzzle
+from usage_stats.event_sink import store_events
+from usage_stats.models import (SudokuPuzzleRequest, CrosswordPuzzleRequest,
+    RequestRollup)
+
 
 class TestStatsSummaryView(APITestCase):
 
@@ -21,6 +38,8 @@ class TestStatsSummaryView(APITestCase):
             username=cls.STD_USER,
             password=cls.STD_USER_PASSWORD
         )
+        cls.puzzle = SudokuPuzzle.objects.create(
+            grid='-' * 81, created_by=cls.admin_user, difficulty=1)
 
     def tearDown(self):
         self.client.logout()
@@ -38,4 +57,153 @@ class TestStatsSummaryView(APITestCase):
 
     def test_unauthenticated_user_doesnt_get_stats(self):
         response = self.client.get(f'{self.ROOT_URL}get_stats_summary/')
-        self.assertEqual(response.status_code, 403)
\ No newline at end of file
+        self.assertEqual(response.status_code, 403)
+
+    def make_requests(self, ages):
+        now = timezone.now()
+        return [
+            SudokuPuzzleRequest(puzzle=self.puzzle, difficulty=1,
+                                created_on=now - age, player_uuid=player)
+            for age, player in zip(ages, self.PLAYERS)
+        ]
+
+    def get_summary(self):
+        self.client.login(username=self.ADMIN_USERNAME, password=self.ADMIN_PASSWORD)
+        response = self.client.get(f'{self.ROOT_URL}get_stats_summary/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def assert_sudoku_counts(self, summary):
+        self.assertEqual(summary['sudoku_last_hour_count'], 1)
+        self.assertEqual(summary['sudoku_today_count'], 3)
+        self.assertEqual(summary['sudoku_last_week_count'], 4)
+        self.assertEqual(summary['sudoku_last_4_weeks_count'], 5)
+        self.assertEqual(summary['sudoku_all_time_count'], 6)
+        self.assertEqual(summary['crossword_all_time_count'], 0)
+        self.assertEqual(summary['sudoku_last_hour_players'], 1)
+        self.assertEqual(summary['sudoku_today_players'], 2)
+        self.assertEqual(summary['sudoku_last_week_players'], 3)
+        self.assertEqual(summary['sudoku_last_4_weeks_players'], 4)
+        self.assertEqual(summary['crossword_last_4_weeks_players'], 0)
+
+    AGES = [
+        timedelta(minutes=59),
+        timedelta(minutes=61),
+        timedelta(hours=23),
+        timedelta(days=3),
+        timedelta(days=27, hours=23),
+        timedelta(days=40),
+    ]
+    PLAYERS = ['a', 'b', 'a', 'c', 'd', 'e']
+
+    def test_stats_are_counted_from_rollups(self):
+        store_events(SudokuPuzzleRequest, self.make_requests(self.AGES))
+        self.assertEqual(
+            RequestRollup.objects.filter(
+                granularity=RequestRollup.DAY).aggregate(
+                    total=Sum('count'))['total'],
+            len(self.AGES))
+        self.assert_sudoku_counts(self.get_summary())
+
+    def test_rollups_can_be_rebuilt_from_request_log(self):
+        SudokuPuzzleRequest.objects.bulk_create(self.make_requests(self.AGES))
+        self.assertEqual(self.get_summary()['sudoku_all_time_count'], 0)
+        call_command('backfill_usage_rollups', stdout=StringIO())
+        self.assert_sudoku_counts(self.get_summary())
+
+    def test_rollups_are_backfilled_by_migration(self):
+        migration = import_module(
+            'usage_stats.migrations.0006_backfill_request_rollups')
+        SudokuPuzzleRequest.objects.bulk_create(self.make_requests(self.AGES))
+        migration.backfill_rollups(apps, None)
+        self.assert_sudoku_counts(self.get_summary())
+
+
+class TestTimeSeriesView(APITestCase):
+
+    ROOT_URL = '/api/usage_stats/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ADMIN_USERNAME = 'test_admin'
+        cls.ADMIN_PASSWORD = 'top_secret'
+        cls.admin_user = User.objects.create_superuser(
+            username=cls.ADMIN_USERNAME,
+            password=cls.ADMIN_PASSWORD,
+        )
+        cls.sudoku = SudokuPuzzle.objects.create(
+            grid='-' * 81, created_by=cls.admin_user, difficulty=1)
+        grid = Grid.objects.create(
+            creator=cls.admin_user, width=3, height=3, cells='---------')
+        cls.crossword = CrosswordPuzzle.objects.create(
+            grid=grid, creator=cls.admin_user, puzzle_type='CSWD')
+
+        base = datetime(2024, 5, 1, 10, tzinfo=dt_timezone.utc)
+        SudokuPuzzleRequest.objects.bulk_create([
+            SudokuPuzzleRequest(puzzle=cls.sudoku, difficulty=difficulty,
+                                player_uuid=player, created_on=base + age)
+            for difficulty, player, age in [
+                (1, 'a', timedelta(minutes=5)),
+                (1, 'a', timedelta(minutes=10)),
+                (2, 'b', timedelta(minutes=50)),
+                (3, 'a', timedelta(hours=2)),
+                (3, 'a', timedelta(days=1)),
+            ]
+        ])
+        CrosswordPuzzleRequest.objects.bulk_create([
+            CrosswordPuzzleRequest(puzzle=cls.crossword, player_uuid='c',
+                                   created_on=base + timedelta(minutes=20)),
+        ])
+
+    def setUp(self):
+        self.client.login(username=self.ADMIN_USERNAME,
+                          password=self.ADMIN_PASSWORD)
+
+    def tearDown(self):
+        self.client.logout()
+        cache.clear()
+
+    def get_series(self, query):
+        response = self.client.get(f'{self.ROOT_URL}get_time_series/?{query}')
+        self.assertEqual(response.status_code, 200)
+        body = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_requests_are_bucketed_by_hour(self):
+        series = self.get_series(
+            'start=2024-05-01T10:00:00&end=2024-05-01T13:00:00&bucket=hour')
+        self.assertEqual(len(series), 2)
+        first, second = series
+        self.assertEqual(first['bucket'], '2024-05-01T10:00:00+00:00')
+        self.assertEqual(first['sudoku'], {'1': 2, '2': 1})
+        self.assertEqual(first['crossword'], {str(self.crossword.id): 1})
+        self.assertEqual(first['sudoku_players'], 2)
+        self.assertEqual(first['crossword_players'], 1)
+        self.assertEqual(second['bucket'], '2024-05-01T12:00:00+00:00')
+        self.assertEqual(second['sudoku'], {'3': 1})
+        self.assertEqual(second['crossword'], {})
+
+    def test_requests_are_bucketed_by_day(self):
+        series = self.get_series('start=2024-05-01&end=2024-05-03&bucket=day')
+        self.assertEqual([point['sudoku'] for point in series],
+                         [{'1': 2, '2': 1, '3': 1}, {'3': 1}])
+
+    def test_requests_are_bucketed_by_minute(self):
+        series = self.get_series(
+            'start=2024-05-01T10:00:00&end=2024-05-01T10:30:00&bucket=minute')
+        self.assertEqual([point['bucket'][11:16] for point in series],
+                         ['10:05', '10:10', '10:20'])
+
+    def test_invalid_parameters_are_rejected(self):
+        for query in ['bucket=week',
+                      'start=yesterday',
+                      'start=2024-05-02&end=2024-05-01',
+                      'start=2000-01-01&end=2024-01-01&bucket=minute']:
+            response = self.client.get(
+                f'{self.ROOT_URL}get_time_series/?{query}')
+            self.assertEqual(response.status_code, 400)
+
+    def test_standard_user_doesnt_get_time_series(self):
+        self.client.logout()
+        response = self.client.get(f'{self.ROOT_URL}get_time_series/')
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,87 @@
+import heapq
+from datetime import timedelta
+from itertools import groupby
+
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncHour, TruncMinute
+
+from .models import SudokuPuzzleRequest, CrosswordPuzzleRequest
+
+BUCKETS = {
+    'minute': (TruncMinute, timedelta(minutes=1)),
+    'hour': (TruncHour, timedelta(hours=1)),
+    'day': (TruncDay, timedelta(days=1)),
+}
+
+
+def bucket_count(start, end, bucket):
+    """ Returns the (maximum) number of buckets between start and end """
+    width = BUCKETS[bucket][1]
+    return -(-(end - start) // width)
+
+
+def _grouped(model, start, end, bucket, *fields, **aggregates):
+    """
+    Returns an iterator over the rows of model created in [start, end),
+    grouped by bucket and fields and aggregated in the database, in bucket
+    order.
+    """
+    trunc = BUCKETS[bucket][0]
+    return model.objects \
+        .filter(created_on__gte=start, created_on__lt=end) \
+        .annotate(bucket=trunc('created_on')) \
+        .values('bucket', *fields) \
+        .annotate(**aggregates) \
+        .order_by('bucket', *fields) \
+        .iterator(chunk_size=2000)
+
+
+def _tagged(name, rows):
+    for row in rows:
+        yield row['bucket'], name, row
+
+
+def get_time_series(start, end, bucket):
+    """
+    Generates one dict per bucket of the given size between start and end
+    that has any requests in it, in order, with the number of sudoku
+    requests per difficulty, the number of crossword requests per puzzle,
+    and the number of distinct players requesting each puzzle type.
+
+    The counts are aggregated in the database by four grouped queries,
+    whose rows are merged here a bucket at a time, so that long series are
+    never held in memory. The rollup tables are not used, since they do not
+    record puzzles or players.
+    """
+    streams = [
+        ('sudoku', _grouped(
+            SudokuPuzzleRequest, start, end, bucket, 'difficulty',
+            count=Count('id'))),
+        ('crossword', _grouped(
+            CrosswordPuzzleRequest, start, end, bucket, 'puzzle_id',
+            count=Count('id'))),
+        ('sudoku_players', _grouped(
+            SudokuPuzzleRequest, start, end, bucket,
+            count=Count('player_uuid', distinct=True))),
+        ('crossword_players', _grouped(
+            CrosswordPuzzleRequest, start, end, bucket,
+            count=Count('player_uuid', distinct=True))),
+    ]
+    merged = heapq.merge(*(_tagged(name, rows) for name, rows in streams),
+                         key=lambda item: item[0])
+    for moment, items in groupby(merged, key=lambda item: item[0]):
+        point = {
+            'bucket': moment.isoformat(),
+            'sudoku': {},
+            'crossword': {},
+            'sudoku_players': 0,
+            'crossword_players': 0,
+        }
+        for _, name, row in items:
+            if name == 'sudoku':
+                point['sudoku'][row['difficulty']] = row['count']
+            elif name == 'crossword':
+                point['crossword'][row['puzzle_id']] = row['count']
+            else:
+                point[name] = row['count']
+        yield point
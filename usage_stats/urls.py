@@ -6,5 +6,10 @@ urlpatterns = [
         'get_stats_summary/',
         views.StatsSummary.as_view(),
         name="stats_summary"
-    )
-]
\ No newline at end of file
+    ),
+    path(
+        'get_time_series/',
+        views.GetTimeSeries.as_view(),
+        name="time_series"
+    ),
+]
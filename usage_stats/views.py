@@ -1,50 +1,144 @@
-from django.http import JsonResponse
+import json
+
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.db.models import Count, Q, Sum
 from rest_framework import status, generics, permissions, filters
 from rest_framework.views import APIView
 from datetime import datetime, timedelta
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import SudokuPuzzleRequest, RequestRollup
+from .rollups import PUZZLE_TYPES, count_players, next_hour
+from .time_series import BUCKETS, bucket_count, get_time_series
+
 
-from .models import SudokuPuzzleRequest, CrosswordPuzzleRequest
+def parse_moment(value):
+    """
+    Parses an ISO 8601 datetime or date (taken as midnight), in UTC if no
+    offset is given. Returns None if the value cannot be parsed.
+    """
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                return None
+            moment = datetime.combine(day, datetime.min.time())
+    except ValueError:
+        return None
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
 
 
 class StatsSummary(APIView):
     """
     Class accepts a GET request and returns the number of puzzles
     requested and returned to players across various time boxes
+
+    Counts are read from the hourly rollups for the whole hours in each
+    window, plus the request log rows in the part-hour at its start, and
+    the all time counts from the daily rollups. The number of distinct
+    players in each window (other than all time) is estimated by merging
+    the rollups' HyperLogLog sketches.
     """
 
     permission_classes = [permissions.IsAdminUser]
 
     def get(self, request):
         now = timezone.now()
-        one_day_cutoff = now - timedelta(days=1)
-        last_week_cutoff = now - timedelta(days=7)
-        last_4_weeks_cutoff = now - timedelta(days=28)
-        one_hour_cutoff = now - timedelta(hours=1)
-
-        # Retrieve the first queryset and then filter it to produce
-        # each subset in turn
-        sudoku_all_time = SudokuPuzzleRequest.objects.all()
-        sudoku_last_4_weeks = sudoku_all_time.filter(created_on__gte=last_4_weeks_cutoff)
-        sudoku_last_week = sudoku_last_4_weeks.filter(created_on__gte=last_week_cutoff)
-        sudoku_last_day = sudoku_last_week.filter(created_on__gte=one_day_cutoff)
-        sudoku_last_hour = sudoku_last_day.filter(created_on__gte=one_hour_cutoff)
-
-        crossword_all_time = CrosswordPuzzleRequest.objects.all()
-        crossword_last_4_weeks = crossword_all_time.filter(created_on__gte=last_4_weeks_cutoff)
-        crossword_last_week = crossword_last_4_weeks.filter(created_on__gte=last_week_cutoff)
-        crossword_last_day = crossword_last_week.filter(created_on__gte=one_day_cutoff)
-        crossword_last_hour = crossword_last_day.filter(created_on__gte=one_hour_cutoff)
-        
-        return JsonResponse({
-            'sudoku_last_hour_count': len(sudoku_last_hour),
-            'sudoku_today_count': len(sudoku_last_day),
-            'sudoku_last_week_count': len(sudoku_last_week),
-            'sudoku_last_4_weeks_count': len(sudoku_last_4_weeks),
-            'sudoku_all_time_count': len(sudoku_all_time),
-            'crossword_last_hour_count': len(crossword_last_hour),
-            'crossword_today_count': len(crossword_last_day),
-            'crossword_last_week_count': len(crossword_last_week),
-            'crossword_last_4_weeks_count': len(crossword_last_4_weeks),
-            'crossword_all_time_count': len(crossword_all_time),
-        })
\ No newline at end of file
+        windows = {
+            'last_hour': now - timedelta(hours=1),
+            'today': now - timedelta(days=1),
+            'last_week': now - timedelta(days=7),
+            'last_4_weeks': now - timedelta(days=28),
+        }
+
+        # One query for all the rollup sums
+        rollup_sums = {}
+        for model, puzzle_type in PUZZLE_TYPES.items():
+            prefix = 'sudoku' if model is SudokuPuzzleRequest else 'crossword'
+            of_type = Q(puzzle_type=puzzle_type)
+            for window, cutoff in windows.items():
+                rollup_sums[f'{prefix}_{window}_count'] = Sum(
+                    'count', filter=of_type & Q(
+                        granularity=RequestRollup.HOUR,
+                        bucket__gte=next_hour(cutoff)),
+                    default=0)
+            rollup_sums[f'{prefix}_all_time_count'] = Sum(
+                'count', filter=of_type & Q(granularity=RequestRollup.DAY),
+                default=0)
+        counts = RequestRollup.objects.aggregate(**rollup_sums)
+
+        # And one query per request log for the part-hours
+        for model in PUZZLE_TYPES:
+            prefix = 'sudoku' if model is SudokuPuzzleRequest else 'crossword'
+            edge_counts = model.objects.aggregate(**{
+                window: Count('id', filter=Q(
+                    created_on__gte=cutoff,
+                    created_on__lt=next_hour(cutoff)))
+                for window, cutoff in windows.items()
+            })
+            for window, count in edge_counts.items():
+                counts[f'{prefix}_{window}_count'] += count
+
+        for (puzzle_type, window), players in count_players(windows).items():
+            prefix = 'sudoku' if puzzle_type == RequestRollup.SUDOKU \
+                else 'crossword'
+            counts[f'{prefix}_{window}_players'] = players
+
+        return JsonResponse(counts)
+
+
+class GetTimeSeries(APIView):
+    """
+    Returns puzzle request counts bucketed by minute, hour or day between
+    the start and end query parameters (ISO 8601 datetimes or dates, by
+    default the last day), with bucket defaulting to 'hour'.
+
+    The response is streamed as newline-delimited JSON, one line per bucket
+    that has any requests, each with the sudoku requests per difficulty,
+    the crossword requests per puzzle id, and the number of distinct
+    players of each.
+
+    Authenticated superusers only
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        bucket = request.GET.get('bucket', 'hour')
+        if bucket not in BUCKETS:
+            return JsonResponse(
+                {'message': f'bucket should be one of {", ".join(BUCKETS)}'},
+                status=400
+            )
+
+        now = timezone.now()
+        end = parse_moment(request.GET['end']) if 'end' in request.GET else now
+        start = parse_moment(request.GET['start']) \
+            if 'start' in request.GET else now - timedelta(days=1)
+        if start is None or end is None:
+            return JsonResponse(
+                {'message': 'start and end should be ISO 8601 dates or times'},
+                status=400
+            )
+        if start >= end:
+            return JsonResponse(
+                {'message': 'start should be before end'},
+                status=400
+            )
+        if bucket_count(start, end, bucket) > settings.USAGE_TIME_SERIES_MAX_BUCKETS:
+            return JsonResponse(
+                {'message': 'too many buckets, use a shorter range or a '
+                            'larger bucket'},
+                status=400
+            )
+
+        points = get_time_series(start, end, bucket)
+        return StreamingHttpResponse(
+            (json.dumps(point) + '\n' for point in points),
+            content_type='application/x-ndjson',
+        )